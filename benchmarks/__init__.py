@@ -0,0 +1,8 @@
+"""Benchmarks for the ingestion and serving paths of the application.
+
+The benchmarks run against the Postgres database given by the
+PG_DATABASE_URL environment variable, and create and drop their own tables,
+so point it at a scratch database. Each module can be run directly, e.g.:
+
+    python -m benchmarks.bench_write_to_db
+"""
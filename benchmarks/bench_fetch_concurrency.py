@@ -0,0 +1,58 @@
+"""Benchmarks ingest cycle time against the number of Search Fields.
+
+Tweets are fetched from a local FakeSearchAPI server with a fixed latency per
+request, once sequentially (one worker, as get_data_periodic used to run) and
+once with ingest_concurrently at the given concurrency. Tweets are written
+to the database as they are fetched, as in get_data_periodic.
+"""
+import argparse
+import json
+
+from nba_ws import db
+from nba_ws.common.fetch import ingest_concurrently
+from nba_ws.models import SearchCursor, SearchField, Tweet
+
+from benchmarks.common import FakeSearchAPI, bench_app, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--tweets-per-author', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument(
+        '--fields', type=int, action='append', dest='field_counts'
+    )
+    args = parser.parse_args()
+
+    with FakeSearchAPI(args.tweets_per_author, latency=args.latency) as api, \
+            bench_app() as app:
+        app.config['TWITTER_API_URL'] = api.url
+        app.config['TWITTER_POOL_SIZE'] = args.concurrency
+        field_counts = args.field_counts or (1, 4, 16, 64)
+        search_fields = [
+            SearchField(json.dumps({'q': {'author': author}}), author)
+            for author in (f'author{i}' for i in range(max(field_counts)))
+        ]
+        db.session.add_all(search_fields)
+        db.session.commit()
+        for field_count in field_counts:
+            jobs = [
+                (sf.id, json.loads(sf.search_field), 0)
+                for sf in search_fields[:field_count]
+            ]
+            for workers in (1, args.concurrency):
+                api.requests = 0
+                Tweet.query.delete()
+                SearchCursor.query.delete()
+                db.session.commit()
+                with timed(f'{field_count} field(s), {workers} worker(s)'):
+                    results = ingest_concurrently(jobs, workers, 'bench-token')
+                    tweets = sum(
+                        counts['inserted'] for _, counts in results
+                    )
+                print(f'  {tweets} tweets, {api.requests} requests')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""Benchmarks the serialization of tweet listings.
+
+Compares the previous path, where json_data and search_params were stored as
+json strings decoded by clean_tweet and re-encoded by jsonify, with the
+native jsonb path, serialized with the json module and with orjson (when it
+is installed). No database is needed, rows are built in memory.
+"""
+import argparse
+from datetime import datetime
+import json
+from types import SimpleNamespace
+
+from flask import jsonify
+
+from config import TestingConfig
+from nba_ws import create_app
+from nba_ws.common import util
+from nba_ws.common.util import clean_tweet, json_response
+
+from benchmarks.common import fake_tweets, timed
+
+
+def legacy_clean_tweet(tweet_row):
+    tweet = clean_tweet(tweet_row)
+    tweet['json_data'] = json.loads(tweet_row.json_data)
+    tweet['search_params'] = json.loads(tweet_row.search_params)
+    return tweet
+
+
+def make_rows(count, encode):
+    now = datetime.utcnow()
+    return [
+        SimpleNamespace(
+            id=i, tweet_id=tweet['json_data']['id'],
+            author=tweet['json_data']['user']['screen_name'],
+            author_id=tweet['json_data']['user']['id'],
+            tweet_text=tweet['json_data']['text'], tweet_date=now,
+            json_data=encode(tweet['json_data']),
+            search_params=encode(tweet['search_params']),
+            datetime_added=now
+        ) for i, tweet in enumerate(fake_tweets(count), 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    args = parser.parse_args()
+    legacy_rows = make_rows(args.rows, json.dumps)
+    rows = make_rows(args.rows, lambda obj: obj)
+
+    app = create_app(TestingConfig)
+    with app.test_request_context():
+        with timed('json strings, json.loads + jsonify', args.rows):
+            jsonify({
+                'tweets': [legacy_clean_tweet(row) for row in legacy_rows]
+            })
+        orjson = util.orjson
+        util.orjson = None
+        with timed('jsonb objects, json module', args.rows):
+            json_response({'tweets': [clean_tweet(row) for row in rows]})
+        util.orjson = orjson
+        if orjson is not None:
+            with timed('jsonb objects, orjson', args.rows):
+                json_response({'tweets': [clean_tweet(row) for row in rows]})
+
+
+if __name__ == '__main__':
+    main()
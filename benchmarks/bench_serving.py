@@ -0,0 +1,143 @@
+"""Load tests the web tier with sync and gevent gunicorn workers.
+
+Loads --rows synthetic tweets, then starts gunicorn with gunicorn.conf.py
+once per worker class and sends GET requests to --path from a growing
+number of concurrent clients for --duration seconds each. Prints the
+requests/sec, p50 and p99 latency of every step, to show how both serving
+modes scale as clients are added. The gevent runs need the gevent and
+psycogreen packages.
+"""
+import argparse
+import math
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from benchmarks.bench_text_search import load_tweets
+from benchmarks.common import bench_app
+
+
+def percentile(values, q):
+    """Returns the q-th quantile of sorted values (nearest rank)."""
+    rank = math.ceil(q * len(values))
+    return values[min(len(values), max(rank, 1)) - 1]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(worker_class, workers, port):
+    """Starts gunicorn and waits until it accepts requests.
+
+    Returns:
+        subprocess.Popen instance of the gunicorn master.
+    """
+    env = dict(
+        os.environ, APP_SETTINGS='config.ProductionConfig',
+        GUNICORN_WORKER_CLASS=worker_class, WEB_CONCURRENCY=str(workers)
+    )
+    # gunicorn 20.0 has no __main__ module, run the script installed next
+    # to the interpreter
+    gunicorn = os.path.join(os.path.dirname(sys.executable), 'gunicorn')
+    server = subprocess.Popen([
+        gunicorn, '-c', 'gunicorn.conf.py',
+        '-b', f'127.0.0.1:{port}', '--log-level', 'warning', 'run:app'
+    ], env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError(f'gunicorn ({worker_class}) did not start')
+
+
+def load(url, clients, duration):
+    """Sends requests to url from clients threads for duration seconds.
+
+    Returns:
+        Tuple of the sorted latencies of the successful requests and the
+        number of failed requests.
+    """
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client():
+        session = requests.Session()
+        timings, failed = [], 0
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                ok = session.get(url, timeout=60).status_code == 200
+            except requests.RequestException:
+                ok = False
+            if ok:
+                timings.append(time.perf_counter() - start)
+            else:
+                failed += 1
+        with lock:
+            latencies.extend(timings)
+            errors[0] += failed
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies), errors[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=500000)
+    parser.add_argument('--path', default='/todo/api/v1.0/tweets?limit=100')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument(
+        '--worker-class', action='append', dest='worker_classes'
+    )
+    parser.add_argument(
+        '--clients', type=int, action='append', dest='client_counts'
+    )
+    args = parser.parse_args()
+
+    with bench_app():
+        load_tweets(args.rows)
+        for worker_class in args.worker_classes or ('sync', 'gevent'):
+            port = free_port()
+            server = start_server(worker_class, args.workers, port)
+            try:
+                url = f'http://127.0.0.1:{port}{args.path}'
+                # warm up the connections and caches of the workers
+                load(url, args.workers, 1)
+                for clients in args.client_counts or (1, 8, 32, 128):
+                    latencies, errors = load(url, clients, args.duration)
+                    if not latencies:
+                        print(f'{worker_class}, {clients} client(s): '
+                              f'{errors} errors')
+                        continue
+                    print(
+                        f'{worker_class}, {clients} client(s): '
+                        f'{len(latencies) / args.duration:,.0f} req/sec, '
+                        f'p50 {percentile(latencies, 0.5) * 1000:.1f}ms, '
+                        f'p99 {percentile(latencies, 0.99) * 1000:.1f}ms, '
+                        f'{errors} errors'
+                    )
+            finally:
+                server.terminate()
+                server.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Benchmarks TweetSearchAPI latency over a large synthetic tweet table.
+
+Loads --rows synthetic tweets (a few million by default) with generate_series
+and times full-text queries of different selectivity through the API, with
+and without an author filter.
+"""
+import argparse
+import json
+import statistics
+import time
+
+from nba_ws import db
+
+from benchmarks.common import AUTHORS, WORDS, bench_app
+
+QUERIES = ('trade', 'Lakers', '"out for season"', 'Warriors -Bucks', 'zzz')
+
+
+def load_tweets(rows):
+    words = ', '.join(f"'{word}'" for word in WORDS)
+    authors = ', '.join(f"'{author}'" for author in AUTHORS)
+    db.session.execute(f"""
+        INSERT INTO "nba-ws-tweet" (
+            tweet_id, author, author_id, tweet_text, tweet_date,
+            json_data, datetime_added
+        )
+        SELECT g,
+            (ARRAY[{authors}])[1 + g % {len(AUTHORS)}],
+            1 + g % {len(AUTHORS)},
+            (ARRAY[{words}])[1 + g % {len(WORDS)}] || ' ' ||
+            (ARRAY[{words}])[1 + (g / 7) % {len(WORDS)}] || ' ' ||
+            (ARRAY[{words}])[1 + (g / 131) % {len(WORDS)}] || ' sources',
+            timestamp '2015-01-01' + g * interval '1 minute',
+            '{{}}'::jsonb,
+            timestamp '2015-01-01' + g * interval '1 minute'
+        FROM generate_series(1, :rows) g
+    """, {'rows': rows})
+    db.session.commit()
+    db.session.execute('ANALYZE "nba-ws-tweet"')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=3000000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with bench_app() as app:
+        start = time.perf_counter()
+        load_tweets(args.rows)
+        print(f'loaded {args.rows} tweets in '
+              f'{time.perf_counter() - start:.1f}s')
+        client = app.test_client()
+        for q in QUERIES:
+            for author in (None, [AUTHORS[0]]):
+                body = {}
+                if author:
+                    body = {
+                        'data': json.dumps({'author': author}),
+                        'content_type': 'application/json'
+                    }
+                timings = []
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    response = client.get(
+                        '/todo/api/v1.0/tweets/search',
+                        query_string={'q': q, 'limit': 20}, **body
+                    )
+                    timings.append((time.perf_counter() - start) * 1000)
+                    assert response.status_code in (200, 404)
+                timings.sort()
+                print(
+                    f'q={q!r} author={author}: '
+                    f'p50 {statistics.median(timings):.1f}ms, '
+                    f'p95 {timings[int(len(timings) * 0.95) - 1]:.1f}ms'
+                )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Benchmarks SearchTweet.write_to_db against the previous ORM write path.
+
+The ORM path builds one Tweet object per status and commits them with
+db.session.add_all, the bulk path is SearchTweet.write_to_db. Both paths
+write the same tweets into an empty table, then the bulk path writes them
+again to measure the cost of skipping tweets which are already stored.
+"""
+import argparse
+
+from nba_ws import db
+from nba_ws.common.util import SearchTweet
+from nba_ws.models import Tweet
+
+from benchmarks.common import bench_app, fake_tweets, timed
+
+
+def orm_write(search_obj, tweets):
+    tweet_rows = [Tweet(**search_obj.make_row(tweet)) for tweet in tweets]
+    db.session.add_all(tweet_rows)
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument(
+        '--chunk-size', type=int, action='append', dest='chunk_sizes'
+    )
+    args = parser.parse_args()
+    tweets = fake_tweets(args.rows)
+
+    with bench_app():
+        # SearchTweet reads the config of the app
+        search_obj = SearchTweet('bench-token')
+        with timed('orm add_all', args.rows):
+            orm_write(search_obj, tweets)
+        for chunk_size in args.chunk_sizes or (100, 1000, 5000):
+            Tweet.query.delete()
+            db.session.commit()
+            with timed(f'bulk insert, chunk_size={chunk_size}', args.rows):
+                search_obj.write_to_db(tweets, chunk_size)
+            with timed(f'bulk re-insert, chunk_size={chunk_size}', args.rows):
+                counts = search_obj.write_to_db(tweets, chunk_size)
+            assert (counts['inserted'], counts['skipped']) == (0, args.rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+"""Helpers shared by the benchmark modules.
+
+Classes:
+    FakeSearchAPI
+
+Functions:
+    bench_app
+    fake_status
+    fake_tweets
+    timed
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+from config import DevelopmentConfig
+from nba_ws import create_app, db
+
+AUTHORS = ('wojespn', 'ShamsCharania', 'ZachLowe_NBA', 'TheSteinLine')
+WORDS = (
+    'trade', 'Lakers', 'Celtics', 'out for season', 'sources', 'agreed',
+    'deal', 'free agent', 'injury', 'Warriors', 'Bucks', 'extension'
+)
+
+
+@contextmanager
+def bench_app():
+    """Pushes an app context with freshly created tables.
+
+    Yields:
+        The Flask application used by the benchmark.
+    """
+    app = create_app(DevelopmentConfig)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        try:
+            yield app
+        finally:
+            db.session.remove()
+            db.drop_all()
+
+
+def fake_status(tweet_id, author, author_id=None):
+    """Builds a status dictionary shaped like a Search API status.
+
+    Args:
+        tweet_id: integer, id of the fake tweet.
+        author: string, screen name of the author of the fake tweet.
+        author_id: integer, id of the author. Defaults to the position of
+            author in AUTHORS.
+
+    Returns:
+        Dictionary with the keys of a Search API status used by the app.
+    """
+    created_at = datetime(2020, 1, 1) + timedelta(minutes=tweet_id)
+    text = ' '.join(
+        WORDS[(tweet_id + i) % len(WORDS)] for i in range(12)
+    )
+    return {
+        'id': tweet_id,
+        'id_str': str(tweet_id),
+        'text': text,
+        'created_at': created_at.strftime('%a %b %d %H:%M:%S +0000 %Y'),
+        'user': {
+            'id': author_id or AUTHORS.index(author) + 1,
+            'screen_name': author,
+            'followers_count': 1000000
+        },
+        'entities': {'hashtags': [], 'urls': [], 'user_mentions': []},
+        'lang': 'en',
+        'retweet_count': tweet_id % 500,
+        'favorite_count': tweet_id % 5000
+    }
+
+
+def fake_tweets(count, start=1):
+    """Builds tweet responses as returned by SearchTweet.get_tweets.
+
+    Args:
+        count: integer, number of tweet responses to build.
+        start: integer, tweet id of the first tweet response.
+
+    Returns:
+        List of tweet response dictionaries.
+    """
+    search_params = {'q': 'from:wojespn', 'count': '100'}
+    return [
+        {
+            'json_data': fake_status(i, AUTHORS[i % len(AUTHORS)]),
+            'search_params': search_params
+        } for i in range(start, start + count)
+    ]
+
+
+@contextmanager
+def timed(label, rows=None):
+    """Prints the wall time (and throughput) of the wrapped block.
+
+    Args:
+        label: string, name of the measured block.
+        rows: integer, number of rows processed by the block, if any.
+    """
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    if rows:
+        print(f"{label}: {elapsed:.3f}s ({rows / elapsed:,.0f} rows/sec)")
+    else:
+        print(f"{label}: {elapsed:.3f}s")
+
+
+class FakeSearchAPI(object):
+    """Local HTTP server imitating the paging of the Twitter Search API.
+
+    Every author has tweets_per_author tweets, with ids following those of
+    the authors requested before it. Pages hold at most page_size statuses
+    below max_id (and above since_id) and every response is delayed by
+    latency seconds to stand in for the network round trip.
+
+    Use as a context manager, the url attribute is the value to set as the
+    TWITTER_API_URL config value.
+    """
+    def __init__(self, tweets_per_author=300, page_size=100, latency=0.05):
+        self.tweets_per_author = tweets_per_author
+        self.page_size = page_size
+        self.latency = latency
+        self.requests = 0
+        self.authors = {}
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self.handler())
+        self.url = f'http://127.0.0.1:{self.server.server_port}/'
+
+    def handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                api.requests += 1
+                params = {
+                    key: val[0]
+                    for key, val in parse_qs(urlparse(self.path).query).items()
+                }
+                body = json.dumps(api.page(params)).encode('utf-8')
+                time.sleep(api.latency)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def page(self, params):
+        author = params.get('q', 'from:wojespn').split()[0][len('from:'):]
+        # ids (and so created_at dates) stay within a small range, however
+        # many authors are searched, and above 0, which isn't a valid max_id
+        index = self.authors.setdefault(author, len(self.authors))
+        offset = (index + 1) * self.tweets_per_author
+        top = offset + self.tweets_per_author
+        max_id = min(int(params.get('max_id', top)), top)
+        since_id = max(int(params.get('since_id', offset)), offset)
+        ids = range(max_id, max(since_id, max_id - self.page_size), -1)
+        return {'statuses': [
+            fake_status(i, author, author_id=index + 1) for i in ids
+        ]}
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
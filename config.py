@@ -11,8 +11,87 @@ class Config(object):
     SECRET_KEY = os.environ.get('SECRET_KEY') or \
         'this-is-a-secret-key'
     SQLALCHEMY_DATABASE_URI = os.environ.get('PG_DATABASE_URL')
+    # read-only GET requests read from the replica when it is set
+    REPLICA_DATABASE_URL = os.environ.get('PG_REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = (
+        {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else None
+    )
+    # fall back to the primary when the replica lags further behind
+    REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', 5))
+    REPLICA_LAG_CHECK_INTERVAL = float(
+        os.environ.get('REPLICA_LAG_CHECK_INTERVAL', 1)
+    )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # connection pool of each process (see nba_ws.common.serving), keep
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW at least as large as FETCH_CONCURRENCY
+    # for the workers and as the requests of a web worker which read from the
+    # database at once
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    # in milliseconds, 0 disables the timeout
+    DB_STATEMENT_TIMEOUT = int(os.environ.get('DB_STATEMENT_TIMEOUT', 0))
     TRAP_HTTP_EXCEPTIONS = True
+    TWEETS_PER_PAGE = int(os.environ.get('TWEETS_PER_PAGE', 100))
+    TWEETS_MAX_PER_PAGE = int(os.environ.get('TWEETS_MAX_PER_PAGE', 1000))
+    TWEETS_STREAM_CHUNK_SIZE = int(
+        os.environ.get('TWEETS_STREAM_CHUNK_SIZE', 500)
+    )
+    TWEETS_EXPORT_CHUNK_SIZE = int(
+        os.environ.get('TWEETS_EXPORT_CHUNK_SIZE', 2000)
+    )
+    TWEETS_SEARCH_MAX_RESULTS = int(
+        os.environ.get('TWEETS_SEARCH_MAX_RESULTS', 10000)
+    )
+    TWEETS_WRITE_CHUNK_SIZE = int(
+        os.environ.get('TWEETS_WRITE_CHUNK_SIZE', 1000)
+    )
+    TWITTER_API_URL = os.environ.get(
+        'TWITTER_API_URL', 'https://api.twitter.com/'
+    )
+    # keep the pool at least as large as FETCH_CONCURRENCY
+    FETCH_CONCURRENCY = int(os.environ.get('FETCH_CONCURRENCY', 8))
+    TWITTER_POOL_SIZE = int(os.environ.get('TWITTER_POOL_SIZE', 10))
+    TWITTER_CONNECT_TIMEOUT = float(
+        os.environ.get('TWITTER_CONNECT_TIMEOUT', 5)
+    )
+    TWITTER_READ_TIMEOUT = float(os.environ.get('TWITTER_READ_TIMEOUT', 30))
+    REDIS_URL = os.environ.get('REDIS_URL')
+    BEARER_TOKEN_FILE = os.environ.get('BEARER_TOKEN_FILE')
+    RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 0))
+    RATE_LIMIT_MAX_WAIT = int(os.environ.get('RATE_LIMIT_MAX_WAIT', 300))
+    # requests sent at once before the rest of the budget is spread evenly
+    # over the rate limit window
+    RATE_LIMIT_BURST = int(os.environ.get('RATE_LIMIT_BURST', 20))
+    # times a request answered with a 429 is sent again after the reset
+    RATE_LIMIT_MAX_RETRIES = int(os.environ.get('RATE_LIMIT_MAX_RETRIES', 3))
+    TWEET_PARTITIONS_AHEAD = int(os.environ.get('TWEET_PARTITIONS_AHEAD', 3))
+    # 0 keeps every partition
+    TWEET_RETENTION_MONTHS = int(os.environ.get('TWEET_RETENTION_MONTHS', 0))
+    TWEET_RETENTION_DETACH = os.environ.get(
+        'TWEET_RETENTION_DETACH', ''
+    ).lower() in ('1', 'true', 'yes')
+    # 0 disables the archival of json_data
+    TWEET_ARCHIVE_AFTER_DAYS = int(
+        os.environ.get('TWEET_ARCHIVE_AFTER_DAYS', 28)
+    )
+    TWEET_ARCHIVE_SEGMENT_SIZE = int(
+        os.environ.get('TWEET_ARCHIVE_SEGMENT_SIZE', 1000)
+    )
+    TWEET_ARCHIVE_LEVEL = int(os.environ.get('TWEET_ARCHIVE_LEVEL', 9))
+    TWEET_ARCHIVE_CACHE_SIZE = int(
+        os.environ.get('TWEET_ARCHIVE_CACHE_SIZE', 32)
+    )
+    SEARCH_RUN_CACHE_SIZE = int(os.environ.get('SEARCH_RUN_CACHE_SIZE', 256))
+    PARTITION_LOCK_TIMEOUT = int(
+        os.environ.get('PARTITION_LOCK_TIMEOUT', 5000)
+    )
+    SSE_KEEPALIVE = float(os.environ.get('SSE_KEEPALIVE', 15))
+    SSE_QUEUE_SIZE = int(os.environ.get('SSE_QUEUE_SIZE', 1000))
+    SSE_BACKLOG_LIMIT = int(os.environ.get('SSE_BACKLOG_LIMIT', 1000))
+    SSE_EVENT_SIZE = int(os.environ.get('SSE_EVENT_SIZE', 100))
+    SSE_RECONNECT_DELAY = float(os.environ.get('SSE_RECONNECT_DELAY', 5))
 
 
 class ProductionConfig(Config):
@@ -41,3 +120,9 @@ class TestingConfig(Config):
     TESTING = True
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+
+class PostgresTestingConfig(TestingConfig):
+    """
+    """
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_PG_DATABASE_URL')
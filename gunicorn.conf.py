@@ -0,0 +1,29 @@
+"""Gunicorn settings of the web process.
+
+The web tier is served by gevent workers by default: every worker serves up
+to GUNICORN_WORKER_CONNECTIONS requests at once, so slow clients, streamed
+exports and SSE connections don't each hold a whole process. Set
+GUNICORN_WORKER_CLASS=sync to go back to one request per worker. The
+database connections of each worker are bounded by the DB_POOL_* config
+values (see nba_ws.common.serving).
+"""
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8000)}"
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gevent')
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+worker_connections = int(os.environ.get('GUNICORN_WORKER_CONNECTIONS', 100))
+# with gevent, only a worker blocking its event loop for that long is
+# restarted, long requests such as exports are not
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+
+def post_worker_init(worker):
+    """Makes psycopg2 cooperative before the worker opens any connection.
+
+    Runs once gunicorn has monkey patched the worker and loaded the app.
+    """
+    if worker_class == 'gevent':
+        from nba_ws.common.serving import patch_psycopg
+        patch_psycopg()
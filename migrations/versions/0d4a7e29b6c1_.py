@@ -0,0 +1,43 @@
+"""add tweet activity table
+
+Revision ID: 0d4a7e29b6c1
+Revises: f3b07c8e2a14
+Create Date: 2026-10-17 13:30:58.042719
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0d4a7e29b6c1'
+down_revision = 'f3b07c8e2a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('nba-ws-tweet_activity',
+    sa.Column('author', sa.String(), nullable=False),
+    sa.Column('bucket', sa.DateTime(), nullable=False),
+    sa.Column('tweet_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('author', 'bucket')
+    )
+    op.create_index(
+        'ix_tweet_activity_bucket', 'nba-ws-tweet_activity', ['bucket']
+    )
+    # backfill the buckets from the tweets already stored
+    op.execute('''
+        INSERT INTO "nba-ws-tweet_activity" (author, bucket, tweet_count)
+        SELECT author, date_trunc('hour', tweet_date), count(*)
+        FROM "nba-ws-tweet"
+        WHERE author IS NOT NULL AND tweet_date IS NOT NULL
+        GROUP BY 1, 2
+    ''')
+
+
+def downgrade():
+    op.drop_index(
+        'ix_tweet_activity_bucket', table_name='nba-ws-tweet_activity'
+    )
+    op.drop_table('nba-ws-tweet_activity')
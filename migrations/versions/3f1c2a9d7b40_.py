@@ -0,0 +1,41 @@
+"""add search cursor table
+
+Revision ID: 3f1c2a9d7b40
+Revises: 8483b620d52c
+Create Date: 2026-10-17 09:12:41.218305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b40'
+down_revision = '8483b620d52c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('nba-ws-search_cursor',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('search_field_id', sa.Integer(), nullable=False),
+    sa.Column('since_id', sa.BigInteger(), nullable=True),
+    sa.Column('last_run', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_page_count', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['search_field_id'], ['nba-ws-search_field.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('search_field_id')
+    )
+    # backfill the cursors from the tweets already stored for each author
+    op.execute('''
+        INSERT INTO "nba-ws-search_cursor" (search_field_id, since_id, last_run)
+        SELECT sf.id, max(t.tweet_id), max(t.datetime_added)
+        FROM "nba-ws-search_field" sf
+        JOIN "nba-ws-tweet" t ON t.author = sf.author
+        GROUP BY sf.id
+    ''')
+
+
+def downgrade():
+    op.drop_table('nba-ws-search_cursor')
@@ -0,0 +1,36 @@
+"""add data version table
+
+Revision ID: 5b9e13c6d2f8
+Revises: a7e5d0c41f96
+Create Date: 2026-10-17 10:41:52.117930
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9e13c6d2f8'
+down_revision = 'a7e5d0c41f96'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    data_version = op.create_table('nba-ws-data_version',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    now = datetime.utcnow()
+    op.bulk_insert(data_version, [
+        {'name': 'tweets', 'version': 1, 'updated_at': now},
+        {'name': 'search_fields', 'version': 1, 'updated_at': now}
+    ])
+
+
+def downgrade():
+    op.drop_table('nba-ws-data_version')
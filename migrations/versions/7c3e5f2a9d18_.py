@@ -0,0 +1,154 @@
+"""partition tweet table by month of tweet_date
+
+Revision ID: 7c3e5f2a9d18
+Revises: 0d4a7e29b6c1
+Create Date: 2026-10-17 14:05:12.518304
+
+"""
+from datetime import datetime
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e5f2a9d18'
+down_revision = '0d4a7e29b6c1'
+branch_labels = None
+depends_on = None
+
+TABLE = 'nba-ws-tweet'
+OLD_TABLE = 'nba-ws-tweet_unpartitioned'
+MONTHS_AHEAD = 3
+
+COLUMNS = (
+    'id, tweet_id, author, author_id, tweet_text, tweet_date, json_data, '
+    'search_params, datetime_added'
+)
+INDEXES = (
+    'ix_tweet_author_tweet_id', 'ix_tweet_tweet_tsv',
+    'ix_tweet_author_tweet_date', 'ix_tweet_tweet_date_brin',
+)
+
+
+def _add_months(month, count):
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _rename_old_table(table, old_table, constraints):
+    op.rename_table(table, old_table)
+    for constraint in constraints:
+        op.execute(
+            f'ALTER TABLE "{old_table}" RENAME CONSTRAINT "{constraint}" '
+            f'TO "{constraint}_old"'
+        )
+    for index in INDEXES:
+        op.execute(f'ALTER INDEX "{index}" RENAME TO "{index}_old"')
+    op.execute(f'ALTER SEQUENCE "{table}_id_seq" OWNED BY NONE')
+
+
+def _create_indexes():
+    op.execute(
+        f'CREATE INDEX ix_tweet_author_tweet_id '
+        f'ON "{TABLE}" (author, tweet_id DESC)'
+    )
+    op.execute(
+        f'CREATE INDEX ix_tweet_tweet_tsv ON "{TABLE}" USING gin (tweet_tsv)'
+    )
+    op.execute(
+        f'CREATE INDEX ix_tweet_author_tweet_date '
+        f'ON "{TABLE}" (author, tweet_date DESC)'
+    )
+    op.execute(
+        f'CREATE INDEX ix_tweet_tweet_date_brin '
+        f'ON "{TABLE}" USING brin (tweet_date)'
+    )
+
+
+def _create_table(partitioned):
+    op.execute(f'''
+        CREATE TABLE "{TABLE}" (
+            id integer NOT NULL
+                DEFAULT nextval('"{TABLE}_id_seq"'::regclass),
+            tweet_id bigint NOT NULL,
+            author varchar,
+            author_id integer,
+            tweet_text varchar,
+            tweet_date timestamp without time zone
+                {'NOT NULL' if partitioned else ''},
+            json_data jsonb,
+            search_params jsonb,
+            datetime_added timestamp with time zone,
+            tweet_tsv tsvector GENERATED ALWAYS AS (
+                to_tsvector('english', coalesce(tweet_text, ''))
+            ) STORED
+        ) {'PARTITION BY RANGE (tweet_date)' if partitioned else ''}
+    ''')
+
+
+def upgrade():
+    # the table is copied in a single transaction, so writes to it are
+    # blocked until the migration commits
+    _rename_old_table(
+        TABLE, OLD_TABLE, (f'{TABLE}_pkey', f'{TABLE}_tweet_id_key')
+    )
+    _create_table(partitioned=True)
+    op.execute(
+        f'CREATE TABLE "{TABLE}_default" PARTITION OF "{TABLE}" DEFAULT'
+    )
+
+    # tweet_date is the partition key, fall back to the date it was added
+    tweet_date = "coalesce(tweet_date, datetime_added AT TIME ZONE 'UTC')"
+    first = op.get_bind().execute(
+        f'SELECT min({tweet_date}) FROM "{OLD_TABLE}"'
+    ).scalar() or datetime.utcnow()
+    month = datetime(first.year, first.month, 1)
+    now = datetime.utcnow()
+    last = _add_months(datetime(now.year, now.month, 1), MONTHS_AHEAD)
+    while month <= last:
+        end = _add_months(month, 1)
+        op.execute(
+            f'CREATE TABLE "{TABLE}_{month:%Y%m}" PARTITION OF "{TABLE}" '
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        )
+        month = end
+
+    op.execute(f'''
+        INSERT INTO "{TABLE}" ({COLUMNS})
+        SELECT id, tweet_id, author, author_id, tweet_text, {tweet_date},
+            json_data, search_params, datetime_added
+        FROM "{OLD_TABLE}"
+    ''')
+    op.execute(
+        f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" '
+        f'PRIMARY KEY (id, tweet_date)'
+    )
+    op.execute(
+        f'ALTER TABLE "{TABLE}" ADD CONSTRAINT uq_tweet_tweet_id_tweet_date '
+        f'UNIQUE (tweet_id, tweet_date)'
+    )
+    _create_indexes()
+    op.execute(f'ALTER SEQUENCE "{TABLE}_id_seq" OWNED BY "{TABLE}".id')
+    op.drop_table(OLD_TABLE)
+
+
+def downgrade():
+    _rename_old_table(
+        TABLE, OLD_TABLE, (f'{TABLE}_pkey', 'uq_tweet_tweet_id_tweet_date')
+    )
+    _create_table(partitioned=False)
+    op.execute(f'''
+        INSERT INTO "{TABLE}" ({COLUMNS})
+        SELECT {COLUMNS} FROM "{OLD_TABLE}"
+    ''')
+    op.execute(
+        f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_pkey" PRIMARY KEY (id)'
+    )
+    op.execute(
+        f'ALTER TABLE "{TABLE}" ADD CONSTRAINT "{TABLE}_tweet_id_key" '
+        f'UNIQUE (tweet_id)'
+    )
+    _create_indexes()
+    op.execute(f'ALTER SEQUENCE "{TABLE}_id_seq" OWNED BY "{TABLE}".id')
+    # dropping the parent drops every partition
+    op.drop_table(OLD_TABLE)
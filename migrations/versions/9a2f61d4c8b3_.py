@@ -0,0 +1,58 @@
+"""add tweet archive table and tweet archive_id
+
+Revision ID: 9a2f61d4c8b3
+Revises: 7c3e5f2a9d18
+Create Date: 2026-10-17 14:41:37.902113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a2f61d4c8b3'
+down_revision = '7c3e5f2a9d18'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('nba-ws-tweet_archive',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tweet_count', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_nba-ws-tweet_archive_day'), 'nba-ws-tweet_archive', ['day'],
+        unique=False
+    )
+    # segments are already compressed with zstd, so keep Postgres from
+    # trying to compress them again
+    op.execute(
+        'ALTER TABLE "nba-ws-tweet_archive" ALTER COLUMN data '
+        'SET STORAGE EXTERNAL'
+    )
+    # nullable without a default, so adding it doesn't rewrite the table
+    op.add_column(
+        'nba-ws-tweet', sa.Column('archive_id', sa.Integer(), nullable=True)
+    )
+
+
+def downgrade():
+    # the segments can't be decompressed in SQL, so refuse to lose them
+    archived = op.get_bind().execute(
+        'SELECT count(*) FROM "nba-ws-tweet" WHERE archive_id IS NOT NULL'
+    ).scalar()
+    if archived:
+        raise RuntimeError(
+            f'{archived} tweets have archived json_data, restore it before '
+            f'downgrading'
+        )
+    op.drop_column('nba-ws-tweet', 'archive_id')
+    op.drop_index(
+        op.f('ix_nba-ws-tweet_archive_day'), table_name='nba-ws-tweet_archive'
+    )
+    op.drop_table('nba-ws-tweet_archive')
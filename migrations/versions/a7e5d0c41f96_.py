@@ -0,0 +1,34 @@
+"""add author, tweet_id index to tweet table
+
+Revision ID: a7e5d0c41f96
+Revises: 3f1c2a9d7b40
+Create Date: 2026-10-17 10:03:15.604522
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7e5d0c41f96'
+down_revision = '3f1c2a9d7b40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # build the index without locking the table against ingest writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tweet_author_tweet_id', 'nba-ws-tweet',
+            ['author', sa.text('tweet_id DESC')],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tweet_author_tweet_id', table_name='nba-ws-tweet',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,96 @@
+"""move tweet search_params to search run table
+
+Revision ID: b6d3e8a1f527
+Revises: 9a2f61d4c8b3
+Create Date: 2026-10-17 15:12:48.306571
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d3e8a1f527'
+down_revision = '9a2f61d4c8b3'
+branch_labels = None
+depends_on = None
+
+TABLE = 'nba-ws-tweet'
+RUN_TABLE = 'nba-ws-search_run'
+
+
+def upgrade():
+    op.create_table(RUN_TABLE,
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('author', sa.String(), nullable=True),
+    sa.Column('params', postgresql.JSONB(astext_type=sa.Text()),
+              nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('page_count', sa.Integer(), nullable=False),
+    sa.Column('request_seconds', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_nba-ws-search_run_author'), RUN_TABLE, ['author'],
+        unique=False
+    )
+    op.add_column(
+        TABLE, sa.Column('search_run_id', sa.Integer(), nullable=True)
+    )
+    op.add_column(
+        TABLE, sa.Column('search_page', sa.SmallInteger(), nullable=True)
+    )
+
+    # the requests of past runs weren't recorded, so every distinct set of
+    # search_params becomes a run of a single page
+    op.execute(f'''
+        CREATE TEMP TABLE _search_runs ON COMMIT DROP AS
+        SELECT nextval('"{RUN_TABLE}_id_seq"'::regclass) AS id, *
+        FROM (
+            SELECT search_params, min(author) AS author,
+                min(datetime_added AT TIME ZONE 'UTC') AS started_at,
+                max(datetime_added AT TIME ZONE 'UTC') AS finished_at
+            FROM "{TABLE}"
+            WHERE search_params IS NOT NULL
+            GROUP BY search_params
+        ) params
+    ''')
+    op.execute(f'''
+        INSERT INTO "{RUN_TABLE}" (
+            id, author, params, started_at, finished_at, page_count,
+            request_seconds
+        )
+        SELECT id, author, jsonb_build_array(search_params), started_at,
+            finished_at, 1, 0
+        FROM _search_runs
+    ''')
+    op.execute(f'''
+        UPDATE "{TABLE}" t SET search_run_id = r.id, search_page = 0
+        FROM _search_runs r
+        WHERE t.search_params = r.search_params
+    ''')
+    op.create_foreign_key(
+        'fk_tweet_search_run_id', TABLE, RUN_TABLE, ['search_run_id'], ['id']
+    )
+    op.drop_column(TABLE, 'search_params')
+
+
+def downgrade():
+    op.add_column(
+        TABLE, sa.Column(
+            'search_params', postgresql.JSONB(astext_type=sa.Text()),
+            nullable=True
+        )
+    )
+    op.execute(f'''
+        UPDATE "{TABLE}" t SET search_params = r.params -> t.search_page
+        FROM "{RUN_TABLE}" r
+        WHERE t.search_run_id = r.id
+    ''')
+    op.drop_constraint('fk_tweet_search_run_id', TABLE, type_='foreignkey')
+    op.drop_column(TABLE, 'search_page')
+    op.drop_column(TABLE, 'search_run_id')
+    op.drop_index(op.f('ix_nba-ws-search_run_author'), table_name=RUN_TABLE)
+    op.drop_table(RUN_TABLE)
@@ -0,0 +1,53 @@
+"""convert tweet json strings to jsonb objects
+
+Revision ID: c2d84f7a19e3
+Revises: 5b9e13c6d2f8
+Create Date: 2026-10-17 11:20:07.845112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2d84f7a19e3'
+down_revision = '5b9e13c6d2f8'
+branch_labels = None
+depends_on = None
+
+# number of rows rewritten per UPDATE statement
+BATCH_SIZE = 10000
+
+
+def _rewrite(expression, condition):
+    conn = op.get_bind()
+    max_id = conn.execute(
+        sa.text('SELECT max(id) FROM "nba-ws-tweet"')
+    ).scalar() or 0
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        conn.execute(sa.text(f'''
+            UPDATE "nba-ws-tweet"
+            SET json_data = {expression.format(column='json_data')},
+                search_params = {expression.format(column='search_params')}
+            WHERE id >= :start AND id < :end
+              AND ({condition.format(column='json_data')}
+                   OR {condition.format(column='search_params')})
+        '''), start=start, end=start + BATCH_SIZE)
+
+
+def upgrade():
+    # json_data and search_params held json documents encoded as jsonb
+    # strings, unwrap them into jsonb objects
+    _rewrite(
+        "CASE WHEN jsonb_typeof({column}) = 'string' "
+        "THEN ({column} #>> '{{}}')::jsonb ELSE {column} END",
+        "jsonb_typeof({column}) = 'string'"
+    )
+
+
+def downgrade():
+    _rewrite(
+        "CASE WHEN jsonb_typeof({column}) = 'object' "
+        "THEN to_jsonb({column}::text) ELSE {column} END",
+        "jsonb_typeof({column}) = 'object'"
+    )
@@ -0,0 +1,105 @@
+"""add ingest cycle table and search run ledger metrics
+
+Revision ID: c8e4a2f61b93
+Revises: b6d3e8a1f527
+Create Date: 2026-10-17 15:48:20.114937
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c8e4a2f61b93'
+down_revision = 'b6d3e8a1f527'
+branch_labels = None
+depends_on = None
+
+RUN_TABLE = 'nba-ws-search_run'
+CYCLE_TABLE = 'nba-ws-ingest_cycle'
+
+# columns of the search run table added with a server default, so existing
+# runs read as runs without metrics
+METRICS = (
+    ('empty_pages', sa.Integer(), '0'),
+    ('max_request_seconds', sa.Float(), '0'),
+    ('tweets_returned', sa.Integer(), '0'),
+    ('inserted', sa.Integer(), '0'),
+    ('skipped', sa.Integer(), '0'),
+    ('write_seconds', sa.Float(), '0'),
+)
+
+
+def upgrade():
+    op.create_table(CYCLE_TABLE,
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('task_id', sa.String(), nullable=True),
+    sa.Column('trigger', sa.String(), nullable=False),
+    sa.Column('search_field_count', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        op.f('ix_nba-ws-ingest_cycle_task_id'), CYCLE_TABLE, ['task_id'],
+        unique=False
+    )
+    op.create_index(
+        op.f('ix_nba-ws-ingest_cycle_started_at'), CYCLE_TABLE,
+        ['started_at'], unique=False
+    )
+    op.add_column(
+        RUN_TABLE, sa.Column('cycle_id', sa.Integer(), nullable=True)
+    )
+    op.create_foreign_key(
+        'fk_search_run_cycle_id', RUN_TABLE, CYCLE_TABLE, ['cycle_id'],
+        ['id']
+    )
+    op.create_index(
+        op.f('ix_nba-ws-search_run_cycle_id'), RUN_TABLE, ['cycle_id'],
+        unique=False
+    )
+    op.create_index(
+        op.f('ix_nba-ws-search_run_started_at'), RUN_TABLE, ['started_at'],
+        unique=False
+    )
+    op.add_column(
+        RUN_TABLE, sa.Column(
+            'page_stats', postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False, server_default='[]'
+        )
+    )
+    op.add_column(
+        RUN_TABLE,
+        sa.Column('rate_limit_remaining', sa.Integer(), nullable=True)
+    )
+    for name, type_, default in METRICS:
+        op.add_column(
+            RUN_TABLE,
+            sa.Column(name, type_, nullable=False, server_default=default)
+        )
+    # the model sets every column, so only existing rows use the defaults
+    for name in ('page_stats',) + tuple(name for name, _, _ in METRICS):
+        op.alter_column(RUN_TABLE, name, server_default=None)
+
+
+def downgrade():
+    for name, _, _ in METRICS:
+        op.drop_column(RUN_TABLE, name)
+    op.drop_column(RUN_TABLE, 'rate_limit_remaining')
+    op.drop_column(RUN_TABLE, 'page_stats')
+    op.drop_index(
+        op.f('ix_nba-ws-search_run_started_at'), table_name=RUN_TABLE
+    )
+    op.drop_index(op.f('ix_nba-ws-search_run_cycle_id'), table_name=RUN_TABLE)
+    op.drop_constraint('fk_search_run_cycle_id', RUN_TABLE, type_='foreignkey')
+    op.drop_column(RUN_TABLE, 'cycle_id')
+    op.drop_index(
+        op.f('ix_nba-ws-ingest_cycle_started_at'), table_name=CYCLE_TABLE
+    )
+    op.drop_index(
+        op.f('ix_nba-ws-ingest_cycle_task_id'), table_name=CYCLE_TABLE
+    )
+    op.drop_table(CYCLE_TABLE)
@@ -0,0 +1,34 @@
+"""add inserting transaction id to tweet table
+
+Revision ID: d5f19b7c3e62
+Revises: c8e4a2f61b93
+Create Date: 2026-10-17 17:02:41.508316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5f19b7c3e62'
+down_revision = 'c8e4a2f61b93'
+branch_labels = None
+depends_on = None
+
+TABLE = 'nba-ws-tweet'
+
+
+def upgrade():
+    # the default is set once the column exists, so existing tweets keep a
+    # NULL txid instead of the table being rewritten. They were committed
+    # before any event id using txid was sent, so no backlog returns them.
+    op.add_column(TABLE, sa.Column('txid', sa.BigInteger(), nullable=True))
+    op.alter_column(
+        TABLE, 'txid', server_default=sa.text('txid_current()')
+    )
+    op.create_index('ix_tweet_txid_id', TABLE, ['txid', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tweet_txid_id', table_name=TABLE)
+    op.drop_column(TABLE, 'txid')
@@ -0,0 +1,35 @@
+"""add full-text search column to tweet table
+
+Revision ID: e91a6b3f0c57
+Revises: c2d84f7a19e3
+Create Date: 2026-10-17 12:02:33.591406
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e91a6b3f0c57'
+down_revision = 'c2d84f7a19e3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # generated columns need Postgres 12 or later
+    op.execute('''
+        ALTER TABLE "nba-ws-tweet" ADD COLUMN tweet_tsv tsvector
+        GENERATED ALWAYS AS (
+            to_tsvector('english', coalesce(tweet_text, ''))
+        ) STORED
+    ''')
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tweet_tweet_tsv', 'nba-ws-tweet', ['tweet_tsv'],
+            postgresql_using='gin', postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    op.drop_index('ix_tweet_tweet_tsv', table_name='nba-ws-tweet')
+    op.drop_column('nba-ws-tweet', 'tweet_tsv')
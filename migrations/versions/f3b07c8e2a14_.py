@@ -0,0 +1,43 @@
+"""add tweet_date indexes to tweet table
+
+Revision ID: f3b07c8e2a14
+Revises: e91a6b3f0c57
+Create Date: 2026-10-17 12:48:20.330671
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b07c8e2a14'
+down_revision = 'e91a6b3f0c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_tweet_author_tweet_date', 'nba-ws-tweet',
+            ['author', sa.text('tweet_date DESC')],
+            postgresql_concurrently=True
+        )
+        # tweets are appended roughly in tweet_date order, so a BRIN index
+        # serves date ranges at a tiny fraction of the size of a btree
+        op.create_index(
+            'ix_tweet_tweet_date_brin', 'nba-ws-tweet', ['tweet_date'],
+            postgresql_using='brin', postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_tweet_tweet_date_brin', table_name='nba-ws-tweet',
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_tweet_author_tweet_date', table_name='nba-ws-tweet',
+            postgresql_concurrently=True
+        )
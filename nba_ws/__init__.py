@@ -17,10 +17,14 @@ import os
 
 from flask import Flask
 from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy
 from celery import Celery
 
-db = SQLAlchemy()
+from nba_ws.common.replica import RoutingSQLAlchemy
+from nba_ws.common.serving import engine_options
+
+# routes the reads of read-only requests to the replica, when configured
+# (see nba_ws.common.replica)
+db = RoutingSQLAlchemy()
 migrate = Migrate()
 celery = Celery(__name__)
 
@@ -28,6 +32,9 @@ celery = Celery(__name__)
 def create_app(config=os.getenv('APP_SETTINGS')):
     app = Flask(__name__)
     app.config.from_object(config)
+    app.config.setdefault(
+        'SQLALCHEMY_ENGINE_OPTIONS', engine_options(app.config)
+    )
 
     celery.config_from_object(os.getenv('CELERY_CONFIG'))
 
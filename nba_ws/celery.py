@@ -9,7 +9,6 @@ import os
 from celery.schedules import crontab
 
 from nba_ws import create_app, celery
-from nba_ws.common.util import TwitterOAuth2
 
 # celery = Celery('nba_ws')
 
@@ -18,11 +17,17 @@ from nba_ws.common.util import TwitterOAuth2
 app = create_app()
 app.app_context().push()
 
-oauth = TwitterOAuth2()
 celery.conf.beat_schedule = {
     'get-data-periodic': {
         'task': 'nba_ws.tasks.get_data_periodic',
-        'schedule': crontab(minute=0, hour='*/2'),
-        'args': (oauth.bearer_token,)
+        'schedule': crontab(minute=0, hour='*/2')
+    },
+    'maintain-partitions': {
+        'task': 'nba_ws.tasks.maintain_partitions',
+        'schedule': crontab(minute=30, hour=3)
+    },
+    'archive-json-data': {
+        'task': 'nba_ws.tasks.archive_json_data',
+        'schedule': crontab(minute=0, hour=4)
     },
 }
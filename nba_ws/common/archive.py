@@ -0,0 +1,146 @@
+"""This module contains the cold storage of the raw json of old tweets.
+
+The json_data of tweets posted more than TWEET_ARCHIVE_AFTER_DAYS ago is
+moved into zstd compressed segments of the TweetArchive model, one or more
+per day, and replaced by the id of its segment in the archive_id column of
+the Tweet model. clean_tweet (see nba_ws.common.util) rehydrates archived
+json_data transparently, through a per-process LRU cache of decompressed
+segments, so responses are unchanged.
+
+Functions:
+    archive_tweets
+    archived_json_data
+"""
+from datetime import datetime, time, timedelta
+import json
+
+import zstandard
+from flask import current_app
+from sqlalchemy import null, tuple_
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from nba_ws import db
+from nba_ws.common.store import LRUCache
+from nba_ws.models import Tweet, TweetArchive
+
+_cache = None
+
+
+def _dumps(obj):
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _load_segment(archive_id):
+    """Reads and decompresses a TweetArchive segment.
+
+    Returns:
+        Dictionary mapping tweet_id strings to json_data, empty if the
+        segment doesn't exist.
+    """
+    data = db.session.query(TweetArchive.data).filter(
+        TweetArchive.id == archive_id
+    ).scalar()
+    if not data:
+        return {}
+    return _loads(zstandard.ZstdDecompressor().decompress(data))
+
+
+def archived_json_data(archive_id, tweet_id):
+    """Returns the archived json_data of a tweet.
+
+    Decompressed segments are kept in an LRU cache of
+    TWEET_ARCHIVE_CACHE_SIZE segments. Segments are never modified, so
+    cached segments never need invalidating.
+
+    Args:
+        archive_id: integer, archive_id of the tweet.
+        tweet_id: integer, tweet_id of the tweet.
+
+    Returns:
+        The json_data of the tweet, None if it isn't in the segment.
+    """
+    global _cache
+    if _cache is None:
+        _cache = LRUCache(current_app.config['TWEET_ARCHIVE_CACHE_SIZE'])
+    return _cache.get(archive_id, _load_segment).get(str(tweet_id))
+
+
+def archive_tweets(before, segment_size=None):
+    """Moves the json_data of the tweets posted before before to segments.
+
+    Tweets are read in (tweet_date, tweet_id) order, at most segment_size at
+    a time, and every segment only holds tweets of a single day. Each
+    segment is written in its own transaction along with the archive_id of
+    its tweets, so an interrupted run loses no data and picks up where it
+    stopped.
+
+    Args:
+        before: datetime, the tweets posted before it are archived.
+        segment_size: integer, maximum number of tweets per segment.
+            Defaults to the TWEET_ARCHIVE_SEGMENT_SIZE config value.
+
+    Returns:
+        Dictionary with the number of 'segments' written and of 'tweets'
+        archived.
+    """
+    config = current_app.config
+    if segment_size is None:
+        segment_size = config['TWEET_ARCHIVE_SEGMENT_SIZE']
+    compressor = zstandard.ZstdCompressor(level=config['TWEET_ARCHIVE_LEVEL'])
+    segments, tweets, after = 0, 0, None
+    while True:
+        query = db.session.query(
+            Tweet.tweet_id, Tweet.tweet_date, Tweet.json_data
+        ).filter(
+            Tweet.tweet_date < before,
+            Tweet.archive_id.is_(None),
+            Tweet.json_data.isnot(None)
+        )
+        if after is not None:
+            query = query.filter(
+                Tweet.tweet_date >= after[0],
+                tuple_(Tweet.tweet_date, Tweet.tweet_id) > tuple_(*after)
+            )
+        rows = query.order_by(
+            Tweet.tweet_date, Tweet.tweet_id
+        ).limit(segment_size).all()
+        if not rows:
+            break
+        day = rows[0].tweet_date.date()
+        rows = [row for row in rows if row.tweet_date.date() == day]
+        after = (rows[-1].tweet_date, rows[-1].tweet_id)
+
+        segment = TweetArchive(
+            day,
+            compressor.compress(_dumps(
+                {str(row.tweet_id): row.json_data for row in rows}
+            )),
+            len(rows)
+        )
+        db.session.add(segment)
+        db.session.flush()
+        start = datetime.combine(day, time.min)
+        Tweet.query.filter(
+            Tweet.tweet_date >= start,
+            Tweet.tweet_date < start + timedelta(days=1),
+            Tweet.tweet_id.in_([row.tweet_id for row in rows])
+        ).update(
+            {'archive_id': segment.id, 'json_data': null()},
+            synchronize_session=False
+        )
+        db.session.commit()
+        segments += 1
+        tweets += len(rows)
+    return {'segments': segments, 'tweets': tweets}
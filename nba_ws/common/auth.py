@@ -0,0 +1,167 @@
+"""This module contains the bearer token provider shared by all processes.
+
+The OAuth2 bearer token is cached in Redis, or in a local file when the
+REDIS_URL config value is not set, so the gunicorn and Celery processes of a
+host share one token instead of each requesting their own. The token is only
+requested from Twitter when none is cached or when the cached one has been
+rejected.
+
+Classes:
+    TokenProvider
+
+Functions:
+    get_token_provider
+"""
+import fcntl
+import os
+import tempfile
+from contextlib import contextmanager
+
+from flask import current_app
+
+from nba_ws.common.store import get_redis
+
+_providers = {}
+
+
+class TokenProvider(object):
+    """Caches the bearer token in a store shared by all processes.
+
+    Attributes:
+        redis: redis.Redis client, None to store the token in path instead.
+        path: string, path of the file storing the token when redis is None.
+        key: string, Redis key of the token.
+        token: string, bearer token last seen by the current process.
+    """
+    def __init__(self, redis=None, path=None, key='nba_ws:bearer_token'):
+        self.redis = redis
+        self.path = path
+        self.key = key
+        self.token = None
+
+    def get(self):
+        """Returns the cached bearer token, requesting one if none is cached.
+
+        Returns:
+            string, OAuth2 bearer token.
+        """
+        if self.token is None:
+            self.token = self.load()
+        if self.token is None:
+            self.token = self.refresh()
+        return self.token
+
+    def refresh(self, stale=None):
+        """Replaces a rejected bearer token.
+
+        Only one process requests a new token at a time. Processes which were
+        waiting for it find the stored token has already changed and use it
+        without requesting another one.
+
+        Args:
+            stale: string, bearer token which was rejected by Twitter.
+
+        Returns:
+            string, new OAuth2 bearer token.
+        """
+        from nba_ws.common.util import TwitterOAuth2
+        with self.lock():
+            token = self.load()
+            if token is None or token == stale:
+                oauth = TwitterOAuth2()
+                if oauth.bearer_token == stale:
+                    oauth.get_oauth2_bearer_token()
+                token = oauth.bearer_token
+                self.save(token)
+        self.token = token
+        return token
+
+    def invalidate(self, token):
+        """Drops a bearer token rejected by Twitter and returns a new one.
+
+        The token is only dropped if it is still the cached token, so the
+        processes rejected with the same token share the token requested by
+        the first of them (see refresh).
+
+        Args:
+            token: string, bearer token to drop.
+
+        Returns:
+            string, new OAuth2 bearer token.
+        """
+        with self.lock():
+            if self.load() == token:
+                self.save(None)
+        if self.token == token:
+            self.token = None
+        return self.refresh(stale=token)
+
+    def load(self):
+        """Reads the bearer token from the shared store.
+
+        Returns:
+            string, the stored token, or None if no token is stored.
+        """
+        if self.redis is not None:
+            token = self.redis.get(self.key)
+            return token.decode('utf-8') if token else None
+        try:
+            with open(self.path) as token_file:
+                return token_file.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def save(self, token):
+        """Writes the bearer token to the shared store.
+
+        Args:
+            token: string, token to store, None to clear the store.
+        """
+        if self.redis is not None:
+            if token is None:
+                self.redis.delete(self.key)
+            else:
+                self.redis.set(self.key, token)
+            return
+        tmp_path = f'{self.path}.{os.getpid()}'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w') as token_file:
+            token_file.write(token or '')
+        os.replace(tmp_path, self.path)
+
+    @contextmanager
+    def lock(self):
+        """Holds a lock shared by all processes while the token changes."""
+        if self.redis is not None:
+            with self.redis.lock(f'{self.key}:lock', timeout=30):
+                yield
+            return
+        with open(f'{self.path}.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def get_token_provider():
+    """Returns the TokenProvider of the application.
+
+    The token is stored in Redis when the REDIS_URL config value is set,
+    otherwise in the BEARER_TOKEN_FILE file.
+
+    Returns:
+        TokenProvider instance.
+    """
+    redis = get_redis()
+    if redis is not None:
+        key = current_app.config['REDIS_URL']
+        if key not in _providers:
+            _providers[key] = TokenProvider(redis=redis)
+    else:
+        key = current_app.config['BEARER_TOKEN_FILE'] or os.path.join(
+            tempfile.gettempdir(), 'nba_ws_bearer_token'
+        )
+        if key not in _providers:
+            _providers[key] = TokenProvider(path=key)
+    return _providers[key]
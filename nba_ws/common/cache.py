@@ -0,0 +1,127 @@
+"""This module contains the HTTP caching helpers of the listing resources.
+
+Every write to the tweets or Search Fields bumps a version stamp stored in
+the DataVersion model. Listings derive their ETag and Last-Modified headers
+from that stamp, so conditional requests are answered with a 304 without
+running the listing query, and full responses can be shared between
+processes in Redis until the data changes.
+
+Functions:
+    bump_version
+    get_version
+    conditional
+"""
+from datetime import datetime
+from functools import wraps
+import hashlib
+
+from flask import current_app, request
+
+from nba_ws import db
+from nba_ws.common.store import get_redis
+from nba_ws.models import DataVersion
+
+
+def bump_version(name):
+    """Bumps the version stamp of name in the current transaction.
+
+    Args:
+        name: string, name of the versioned data.
+    """
+    now = datetime.utcnow()
+    updated = DataVersion.query.filter_by(name=name).update(
+        {'version': DataVersion.version + 1, 'updated_at': now},
+        synchronize_session=False
+    )
+    if not updated:
+        db.session.add(DataVersion(name, 1, now))
+
+
+def get_version(name):
+    """Returns the version stamp of name.
+
+    Args:
+        name: string, name of the versioned data.
+
+    Returns:
+        Tuple of the version and the UTC date of the last write.
+    """
+    row = db.session.query(
+        DataVersion.version, DataVersion.updated_at
+    ).filter_by(name=name).first()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
+
+
+def conditional(name):
+    """Decorator adding conditional GET support to a resource method.
+
+    The ETag identifies the version of name along with the query string and
+    body of the request, since listings take their filters from both. When
+    the REDIS_URL config value is set and RESPONSE_CACHE_TIMEOUT is not 0,
+    complete responses are also cached under the same key.
+
+    Args:
+        name: string, name of the versioned data served by the method.
+
+    Returns:
+        Decorator to pass in the method_decorators of a Resource.
+    """
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            version, updated_at = get_version(name)
+            digest = hashlib.sha1(
+                request.full_path.encode('utf-8') + request.get_data()
+            ).hexdigest()
+            etag = f'{name}-{version}-{digest[:16]}'
+
+            if _not_modified(etag, updated_at):
+                response = current_app.response_class(status=304)
+                return _set_validators(response, etag, updated_at)
+
+            redis = get_redis()
+            timeout = current_app.config['RESPONSE_CACHE_TIMEOUT']
+            key = f'nba_ws:response:{request.endpoint}:{etag}'
+            if redis is not None and timeout:
+                cached = redis.hgetall(key)
+                if cached:
+                    response = current_app.response_class(
+                        cached[b'body'],
+                        mimetype=cached[b'mimetype'].decode('utf-8')
+                    )
+                    return _set_validators(response, etag, updated_at)
+
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+            if redis is not None and timeout and not response.is_streamed:
+                pipe = redis.pipeline()
+                pipe.hmset(key, {
+                    'body': response.get_data(),
+                    'mimetype': response.mimetype
+                })
+                pipe.expire(key, timeout)
+                pipe.execute()
+            return _set_validators(response, etag, updated_at)
+        return wrapper
+    return decorator
+
+
+def _not_modified(etag, updated_at):
+    """Checks the conditional headers of the request against the stamp."""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and updated_at:
+        return updated_at.replace(microsecond=0) <= \
+            request.if_modified_since.replace(tzinfo=None)
+    return False
+
+
+def _set_validators(response, etag, updated_at):
+    """Sets the ETag and Last-Modified headers of response."""
+    response.set_etag(etag)
+    if updated_at:
+        response.last_modified = updated_at
+    return response
@@ -0,0 +1,77 @@
+"""This module contains the HTTP client used for Twitter API requests.
+
+Classes:
+    TwitterSession
+
+Functions:
+    get_session
+"""
+import os
+
+import requests
+from flask import current_app
+from requests.adapters import HTTPAdapter
+
+_session = None
+_session_pid = None
+
+
+class TwitterSession(requests.Session):
+    """requests.Session with a sized connection pool and a default timeout.
+
+    Connections are kept alive between requests, so the TCP and TLS
+    handshakes with the Twitter API are only paid once per pooled connection
+    instead of once per request.
+
+    Attributes:
+        timeout: float or tuple, (connect, read) timeout used for requests
+            which don't pass their own timeout.
+    """
+    def __init__(self, pool_size, timeout):
+        """Mounts the pooled adapter and sets the default headers.
+
+        Args:
+            pool_size: integer, maximum number of connections kept alive per
+                host.
+            timeout: float or tuple, default (connect, read) timeout.
+        """
+        super(TwitterSession, self).__init__()
+        self.timeout = timeout
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive'
+        })
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super(TwitterSession, self).request(method, url, **kwargs)
+
+
+def get_session():
+    """Returns the TwitterSession shared by the current process.
+
+    The session is created on first use from the TWITTER_POOL_SIZE,
+    TWITTER_CONNECT_TIMEOUT and TWITTER_READ_TIMEOUT config values, and is
+    re-created after a fork so that gunicorn and Celery child processes never
+    share sockets with their parent.
+
+    Returns:
+        TwitterSession instance.
+    """
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        config = current_app.config
+        _session = TwitterSession(
+            pool_size=config['TWITTER_POOL_SIZE'],
+            timeout=(
+                config['TWITTER_CONNECT_TIMEOUT'],
+                config['TWITTER_READ_TIMEOUT']
+            )
+        )
+        _session_pid = os.getpid()
+    return _session
@@ -0,0 +1,98 @@
+"""This module contains the concurrent ingest engine used by get_data_periodic.
+
+Functions:
+    ingest_concurrently
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from flask import current_app
+
+from nba_ws import db
+from nba_ws.common.ratelimit import RateLimitExceeded
+from nba_ws.common.util import SearchTweet
+from nba_ws.models import SearchCursor
+
+
+def _ingest(app, search_field_id, search_params, since_id, bearer_token,
+            cycle_id):
+    """Retrieves and writes the new tweets of one Search Field in a thread.
+
+    Tweets are streamed from SearchTweet.iter_tweets into
+    SearchTweet.write_to_db, so the thread holds at most one page and one
+    write chunk in memory whatever the number of new tweets.
+
+    Args:
+        app: Flask application, pushed as the app context of the thread.
+        search_field_id: integer, id of the Search Field.
+        search_params: dict, parameters passed to the request to Search API.
+        since_id: integer, since_id of the search (see
+            SearchTweet.iter_tweets).
+        bearer_token: string, OAuth2 token used to authenticate requests made
+            to Twitter Search API, None to use the shared token provider.
+        cycle_id: integer, id of the IngestCycle of the search.
+
+    Returns:
+        Dictionary with the number of tweets 'inserted' and 'skipped'.
+    """
+    with app.app_context():
+        try:
+            search_obj = SearchTweet(bearer_token)
+            cursor = SearchCursor.query.filter_by(
+                search_field_id=search_field_id
+            ).first() or SearchCursor(search_field_id)
+            return search_obj.write_to_db(
+                search_obj.iter_tweets(search_params, since_id),
+                cursor=cursor, cycle_id=cycle_id
+            )
+        finally:
+            db.session.remove()
+
+
+def ingest_concurrently(jobs, max_workers=None, bearer_token=None,
+                        cycle_id=None):
+    """Retrieves and writes the new tweets of many Search Fields in parallel.
+
+    Every Search Field is paged through by its own SearchTweet object on a
+    bounded thread pool, and its tweets are committed in batches while the
+    following pages are fetched.
+
+    Args:
+        jobs: iterable, tuples of the id of the Search Field, the dict of
+            parameters passed to the request to Search API and the since_id
+            of the search (see SearchTweet.iter_tweets).
+        max_workers: integer, maximum number of Search Fields fetched at the
+            same time. Defaults to the FETCH_CONCURRENCY config value.
+        bearer_token: string, OAuth2 token used to authenticate requests made
+            to Twitter Search API, None to use the shared token provider.
+        cycle_id: integer, id of the IngestCycle the searches are part of.
+
+    Yields:
+        Tuples of the id of the Search Field and the dictionary with the
+        number of its tweets 'inserted' and 'skipped', as each Search Field
+        is done.
+
+    Raises:
+        RateLimitExceeded: once every other Search Field has been yielded, if
+            the rate limit budget ran out for any Search Field.
+    """
+    app = current_app._get_current_object()
+    if max_workers is None:
+        max_workers = app.config['FETCH_CONCURRENCY']
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _ingest, app, search_field_id, search_params, since_id,
+                bearer_token, cycle_id
+            ): search_field_id
+            for search_field_id, search_params, since_id in jobs
+        }
+        deferred = []
+        for future in as_completed(futures):
+            try:
+                counts = future.result()
+            except RateLimitExceeded as exc:
+                deferred.append(exc)
+                continue
+            yield futures[future], counts
+    if deferred:
+        raise max(deferred, key=lambda exc: exc.retry_after)
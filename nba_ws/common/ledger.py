@@ -0,0 +1,76 @@
+"""This module contains the recording of the ingest cycles in the ledger.
+
+Every run of get_data_periodic or get_data_async is an IngestCycle, and the
+search of each author in it is a SearchRun written by
+SearchTweet.write_to_db (see nba_ws.common.util) with the per-request
+latency, rate limit budget and write time of the search. The IngestLedgerAPI
+resource reads them back as rollups.
+
+Functions:
+    start_cycle
+    finish_cycle
+    ingest_cycle
+"""
+from contextlib import contextmanager
+from datetime import datetime
+
+from nba_ws import db
+from nba_ws.models import IngestCycle
+
+
+def start_cycle(trigger, task_id=None, search_field_count=0):
+    """Writes a new IngestCycle.
+
+    Args:
+        trigger: string, 'periodic' or 'manual' (see IngestCycle from
+            nba_ws.models).
+        task_id: string, id of the Celery task of the cycle.
+        search_field_count: integer, number of Search Fields searched.
+
+    Returns:
+        The id of the IngestCycle.
+    """
+    cycle = IngestCycle(trigger, task_id, search_field_count)
+    db.session.add(cycle)
+    db.session.commit()
+    return cycle.id
+
+
+def finish_cycle(cycle_id, error=None):
+    """Marks an IngestCycle as finished.
+
+    Args:
+        cycle_id: integer, id of the IngestCycle.
+        error: string, error the cycle stopped on, None if it succeeded.
+    """
+    IngestCycle.query.filter_by(id=cycle_id).update(
+        {'finished_at': datetime.utcnow(), 'error': error},
+        synchronize_session=False
+    )
+    db.session.commit()
+
+
+@contextmanager
+def ingest_cycle(trigger, task_id=None, search_field_count=0):
+    """Records the ingest of the wrapped block as an IngestCycle.
+
+    The cycle is finished when the block exits. If the block raises, the
+    session is rolled back and the error is recorded on the cycle, then
+    raised again.
+
+    Args:
+        trigger: string, 'periodic' or 'manual'.
+        task_id: string, id of the Celery task of the cycle.
+        search_field_count: integer, number of Search Fields searched.
+
+    Yields:
+        The id of the IngestCycle.
+    """
+    cycle_id = start_cycle(trigger, task_id, search_field_count)
+    try:
+        yield cycle_id
+    except Exception as exc:
+        db.session.rollback()
+        finish_cycle(cycle_id, str(exc) or type(exc).__name__)
+        raise
+    finish_cycle(cycle_id)
@@ -0,0 +1,264 @@
+"""This module contains the push delivery of newly inserted tweets.
+
+write_to_db publishes the tweets it inserts on a Postgres NOTIFY channel in
+the same transaction, so notifications are only delivered once the tweets
+are committed, in commit order. Along with the tweets, each notification
+holds the xmin of the transaction snapshot: every transaction with a lower
+txid had finished before the notifying one, so its tweets were notified
+earlier. Each process runs a single TweetListener which LISTENs on that
+channel and fans the notifications out to every Subscription of the
+process, so any number of connected clients costs one database connection.
+
+Classes:
+    Subscription
+    TweetListener
+
+Functions:
+    notify_tweets
+    payloads
+    get_listener
+
+Objects:
+    CHANNEL
+"""
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import func, select as sql_select
+
+from nba_ws import db
+
+CHANNEL = 'nba_ws_tweets'
+
+# NOTIFY payloads must stay under 8000 bytes
+NOTIFY_BATCH_SIZE = 150
+
+logger = logging.getLogger(__name__)
+
+_listener = None
+_listener_pid = None
+
+
+def payloads(tweet_rows, xmin, batch_size=NOTIFY_BATCH_SIZE):
+    """Serializes tweet_rows into NOTIFY payloads of batch_size tweets.
+
+    Args:
+        tweet_rows: iterable, rows of inserted tweets with id, tweet_id and
+            author attributes.
+        xmin: integer, xmin of the snapshot of the inserting transaction.
+        batch_size: integer, maximum number of tweets per payload.
+
+    Yields:
+        Strings, json objects with the 'xmin' and the 'tweets' as a list of
+        [id, tweet_id, author] triples.
+    """
+    batch = []
+    for row in tweet_rows:
+        batch.append([row.id, row.tweet_id, row.author])
+        if len(batch) == batch_size:
+            yield json.dumps(
+                {'xmin': xmin, 'tweets': batch}, separators=(',', ':')
+            )
+            batch = []
+    if batch:
+        yield json.dumps(
+            {'xmin': xmin, 'tweets': batch}, separators=(',', ':')
+        )
+
+
+def notify_tweets(tweet_rows):
+    """Publishes inserted tweets on CHANNEL in the current transaction.
+
+    Args:
+        tweet_rows: iterable, rows of inserted tweets with id, tweet_id and
+            author attributes.
+    """
+    xmin = db.session.execute(sql_select([
+        func.txid_snapshot_xmin(func.txid_current_snapshot())
+    ])).scalar()
+    for payload in payloads(tweet_rows, xmin):
+        db.session.execute(sql_select([func.pg_notify(CHANNEL, payload)]))
+
+
+class Subscription(object):
+    """Queue of the tweets notified to one connected client.
+
+    Attributes:
+        authors: set of the authors to deliver tweets of, or None for all.
+        overflowed: boolean, True once the client fell behind by more than
+            the size of the queue. Tweets notified from then on are dropped,
+            and the client is expected to reconnect with its Last-Event-ID.
+    """
+    def __init__(self, authors=None, maxsize=0):
+        """Creates the queue of the subscription.
+
+        Args:
+            authors: iterable, authors to deliver tweets of. All tweets are
+                delivered when empty or None.
+            maxsize: integer, maximum number of undelivered notifications.
+        """
+        self.authors = set(authors) if authors else None
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, xmin, tweets):
+        """Queues the tweets of a notification matching the authors.
+
+        Args:
+            xmin: integer, xmin of the snapshot of the notifying transaction.
+            tweets: list of dictionaries with 'id', 'tweet_id' and 'author'
+                keys.
+        """
+        if self.authors is not None:
+            tweets = [
+                tweet for tweet in tweets if tweet['author'] in self.authors
+            ]
+        if not tweets or self.overflowed:
+            return
+        try:
+            self._queue.put_nowait((xmin, tweets))
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """Returns the next notification.
+
+        Args:
+            timeout: float, seconds to wait for a notification.
+
+        Returns:
+            Tuple of the xmin of the notifying transaction and the list of
+            its tweets.
+
+        Raises:
+            queue.Empty: If no notification arrived within timeout.
+        """
+        return self._queue.get(timeout=timeout)
+
+
+class TweetListener(object):
+    """Background thread which LISTENs on CHANNEL for the whole process.
+
+    The listener holds a dedicated connection detached from the pool of the
+    engine, and reconnects after a failure. It is started by its first
+    subscription.
+
+    Attributes:
+        engine: SQLAlchemy engine used to open the listening connection.
+        reconnect_delay: float, seconds to wait before reconnecting.
+    """
+    def __init__(self, engine, reconnect_delay=5):
+        """Creates attributes of the listener.
+
+        Args:
+            engine: SQLAlchemy engine of the Postgres database.
+            reconnect_delay: float, seconds to wait before reconnecting.
+        """
+        self.engine = engine
+        self.reconnect_delay = reconnect_delay
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, authors=None, maxsize=0):
+        """Creates a Subscription and starts the listener if needed.
+
+        Args:
+            authors: iterable, authors to deliver tweets of.
+            maxsize: integer, maximum number of undelivered notifications.
+
+        Returns:
+            Subscription instance.
+        """
+        subscription = Subscription(authors, maxsize)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self.run, name='tweet-listener', daemon=True
+                )
+                self._thread.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stops delivering notifications to subscription.
+
+        Args:
+            subscription: Subscription instance returned by subscribe.
+        """
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def dispatch(self, payload):
+        """Delivers a NOTIFY payload to every subscription.
+
+        Args:
+            payload: string, payload created by the payloads function.
+        """
+        notification = json.loads(payload)
+        tweets = [
+            {'id': id_, 'tweet_id': tweet_id, 'author': author}
+            for id_, tweet_id, author in notification['tweets']
+        ]
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.put(notification['xmin'], tweets)
+
+    def run(self):
+        """Listens on CHANNEL until the process exits."""
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.exception('Tweet listener failed, reconnecting')
+            time.sleep(self.reconnect_delay)
+
+    def listen(self, poll_timeout=60):
+        """Dispatches notifications of CHANNEL until the connection fails.
+
+        Args:
+            poll_timeout: float, seconds to wait on the socket between
+                checks of the connection.
+        """
+        connection = self.engine.raw_connection()
+        connection.detach()
+        try:
+            dbapi_connection = connection.connection
+            # the ping of pool_pre_ping leaves a transaction open
+            dbapi_connection.rollback()
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            while True:
+                select.select([dbapi_connection], [], [], poll_timeout)
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    notify = dbapi_connection.notifies.pop(0)
+                    self.dispatch(notify.payload)
+        finally:
+            connection.close()
+
+
+def get_listener():
+    """Returns the TweetListener of the current process.
+
+    The listener is re-created after a fork, so gunicorn workers never share
+    the listening connection of their parent.
+
+    Returns:
+        TweetListener instance.
+    """
+    global _listener, _listener_pid
+    if _listener is None or _listener_pid != os.getpid():
+        _listener = TweetListener(
+            db.engine, current_app.config['SSE_RECONNECT_DELAY']
+        )
+        _listener_pid = os.getpid()
+    return _listener
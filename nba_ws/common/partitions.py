@@ -0,0 +1,198 @@
+"""This module contains the maintenance of the partitions of the Tweet model.
+
+The tweet table is range partitioned by tweet_date with one partition per
+calendar month, named after the table and the month (e.g.
+nba-ws-tweet_201901), plus a default partition for tweets outside of every
+monthly range. Partitions are created ahead of time by the
+maintain_partitions task (see nba_ws.tasks), and retention drops (or
+detaches) whole partitions instead of deleting rows, so old tweets are
+removed without bloating the table or its indexes.
+
+Functions:
+    month_start
+    add_months
+    partition_name
+    create_partition
+    ensure_partitions
+    list_partitions
+    drop_partitions
+
+Objects:
+    DEFAULT_PARTITION
+"""
+from datetime import datetime
+import re
+
+from flask import current_app
+
+from nba_ws import db
+from nba_ws.models import Tweet
+
+PARENT = Tweet.__tablename__
+DEFAULT_PARTITION = f'{PARENT}_default'
+
+_partition_re = re.compile(rf'^{re.escape(PARENT)}_(\d{{4}})(\d{{2}})$')
+
+
+def month_start(date):
+    """Returns the first instant of the month of date."""
+    return datetime(date.year, date.month, 1)
+
+
+def add_months(month, count):
+    """Returns the first instant of the month count months after month.
+
+    Args:
+        month: datetime, first instant of a month.
+        count: integer, number of months to add, can be negative.
+
+    Returns:
+        datetime.
+    """
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    """Returns the name of the partition holding the tweets of month."""
+    return f'{PARENT}_{month:%Y%m}'
+
+
+def _set_lock_timeout():
+    """Bounds the wait for the lock on the tweet table in the transaction.
+
+    Attaching and detaching partitions lock the parent table, so giving up
+    early keeps the maintenance from queueing every reader and writer
+    behind it.
+    """
+    timeout = int(current_app.config['PARTITION_LOCK_TIMEOUT'])
+    db.session.execute(f"SET LOCAL lock_timeout = '{timeout}ms'")
+
+
+def create_partition(month):
+    """Creates the partition of month, if it doesn't exist yet.
+
+    Tweets of the month already stored in the default partition are moved
+    to the new partition, since Postgres refuses to create a partition whose
+    rows are in the default partition. The caller commits.
+
+    Args:
+        month: datetime, any instant of the month.
+
+    Returns:
+        The name of the partition if it was created, None if it existed.
+    """
+    start = month_start(month)
+    end = add_months(start, 1)
+    name = partition_name(start)
+    exists = db.session.execute(
+        'SELECT to_regclass(:name)', {'name': f'"{name}"'}
+    ).scalar()
+    if exists:
+        return None
+
+    _set_lock_timeout()
+    columns = ', '.join(
+        f'"{column.name}"' for column in Tweet.__table__.columns
+        if column.computed is None
+    )
+    bounds = {'start': start, 'end': end}
+    db.session.execute(
+        f'CREATE TEMP TABLE _moved_tweets ON COMMIT DROP AS '
+        f'SELECT {columns} FROM "{DEFAULT_PARTITION}" WITH NO DATA'
+    )
+    db.session.execute(
+        f'WITH moved AS ('
+        f'DELETE FROM "{DEFAULT_PARTITION}" '
+        f'WHERE tweet_date >= :start AND tweet_date < :end '
+        f'RETURNING {columns}) '
+        f'INSERT INTO _moved_tweets SELECT * FROM moved',
+        bounds
+    )
+    db.session.execute(
+        f'CREATE TABLE "{name}" PARTITION OF "{PARENT}" '
+        f"FOR VALUES FROM ('{start:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+    )
+    db.session.execute(
+        f'INSERT INTO "{PARENT}" ({columns}) '
+        f'SELECT {columns} FROM _moved_tweets'
+    )
+    return name
+
+
+def ensure_partitions(months_ahead, now=None):
+    """Creates the partitions of the current month and of months_ahead.
+
+    Every partition is created in its own transaction.
+
+    Args:
+        months_ahead: integer, number of months after the current month to
+            create partitions for.
+        now: datetime, current UTC date. Defaults to datetime.utcnow().
+
+    Returns:
+        List of the names of the partitions created.
+    """
+    month = month_start(now or datetime.utcnow())
+    created = []
+    for offset in range(months_ahead + 1):
+        name = create_partition(add_months(month, offset))
+        db.session.commit()
+        if name is not None:
+            created.append(name)
+    return created
+
+
+def list_partitions():
+    """Returns the monthly partitions of the tweet table.
+
+    Returns:
+        List of tuples of the first instant of the month and the name of
+        its partition, oldest first.
+    """
+    rows = db.session.execute(
+        'SELECT c.relname FROM pg_inherits i '
+        'JOIN pg_class c ON c.oid = i.inhrelid '
+        'WHERE i.inhparent = to_regclass(:parent)',
+        {'parent': f'"{PARENT}"'}
+    )
+    partitions = []
+    for name, in rows:
+        match = _partition_re.match(name)
+        if match:
+            year, month = map(int, match.groups())
+            partitions.append((datetime(year, month, 1), name))
+    return sorted(partitions)
+
+
+def drop_partitions(before, detach=False):
+    """Removes the partitions of the months which ended before before.
+
+    Every partition is detached from the tweet table in its own
+    transaction, then dropped unless detach is True, in which case it is
+    left as a standalone table (e.g. to be archived). Tweets older than
+    before in the default partition are deleted.
+
+    Args:
+        before: datetime, tweets posted before it are removed.
+        detach: boolean, whether to keep the detached partitions.
+
+    Returns:
+        List of the names of the partitions removed.
+    """
+    removed = []
+    for month, name in list_partitions():
+        if add_months(month, 1) > before:
+            break
+        _set_lock_timeout()
+        db.session.execute(f'ALTER TABLE "{PARENT}" DETACH PARTITION "{name}"')
+        if not detach:
+            db.session.execute(f'DROP TABLE "{name}"')
+        db.session.commit()
+        removed.append(name)
+    db.session.execute(
+        f'DELETE FROM "{DEFAULT_PARTITION}" WHERE tweet_date < :before',
+        {'before': before}
+    )
+    db.session.commit()
+    return removed
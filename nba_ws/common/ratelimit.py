@@ -0,0 +1,367 @@
+"""This module contains the rate limit scheduler for Twitter API requests.
+
+Twitter reports the request budget of each endpoint in the x-rate-limit-limit,
+x-rate-limit-remaining and x-rate-limit-reset response headers. The budget is
+tracked per endpoint and shared by every process through Redis (or kept in the
+process when Redis is not configured). Requests take one unit of budget before
+being sent. Past a burst of RATE_LIMIT_BURST requests, units are handed out
+evenly over the window, so the budget lasts until the window resets instead of
+being used up at its start and leaving every worker waiting. Requests wait for
+the window to reset when the budget is used up, instead of running into 429
+responses.
+
+Classes:
+    RateLimitExceeded
+    LocalBudget
+    RedisBudget
+    RateLimiter
+
+Functions:
+    pace_delay
+    get_rate_limiter
+"""
+import math
+import threading
+import time
+
+from flask import current_app
+
+from nba_ws.common.client import get_session
+from nba_ws.common.store import get_redis
+
+# length of a Twitter rate limit window, in seconds
+WINDOW = 15 * 60
+
+_local_budget = None
+
+
+def pace_delay(limit, remaining, reset, now, burst):
+    """Returns the time until the next unit of budget can be taken.
+
+    The requests spent in the window may run ahead of an even spread of the
+    limit over the window by at most burst requests.
+
+    Args:
+        limit: integer, number of requests allowed per window.
+        remaining: integer, number of requests left in the window.
+        reset: integer, epoch time at which the window resets.
+        now: float, current epoch time.
+        burst: integer, number of requests allowed ahead of the even spread.
+
+    Returns:
+        Seconds to wait, 0 if a unit can be taken now.
+    """
+    if limit <= 0:
+        return 0
+    elapsed = max(WINDOW - (reset - now), 0)
+    ready = (limit - remaining + 1 - burst) * WINDOW / limit
+    return max(ready - elapsed, 0)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request would have to wait too long for budget.
+
+    Attributes:
+        endpoint: string, Twitter API endpoint out of budget.
+        retry_after: integer, seconds until the budget of endpoint resets.
+    """
+    def __init__(self, endpoint, retry_after):
+        super(RateLimitExceeded, self).__init__(
+            f'{endpoint} rate limit exceeded, retry in {retry_after}s'
+        )
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class LocalBudget(object):
+    """Request budget of each endpoint stored in the current process.
+
+    Attributes:
+        budgets: dict, endpoints mapped to dicts with the 'limit',
+            'remaining' and 'reset' (epoch seconds) of their window.
+        lock: threading.Lock guarding budgets.
+    """
+    def __init__(self):
+        self.budgets = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, endpoint, now, burst):
+        """Takes one unit of budget of endpoint.
+
+        Args:
+            endpoint: string, Twitter API endpoint.
+            now: float, current epoch time.
+            burst: integer, see pace_delay.
+
+        Returns:
+            0 if the budget was taken, else the number of seconds to wait
+            before trying again: until the next unit is paced out, or until
+            the budget of endpoint resets when it is used up.
+        """
+        with self.lock:
+            budget = self.budgets.get(endpoint)
+            if not budget or now >= budget['reset']:
+                return 0
+            if budget['remaining'] <= 0:
+                return budget['reset'] - now
+            delay = pace_delay(
+                budget['limit'], budget['remaining'], budget['reset'], now,
+                burst
+            )
+            if delay:
+                return delay
+            budget['remaining'] -= 1
+            return 0
+
+    def update(self, endpoint, limit, remaining, reset):
+        """Stores the budget of endpoint reported by Twitter.
+
+        Responses of requests sent concurrently can arrive out of order, so
+        within the same window the lowest remaining value is kept.
+
+        Args:
+            endpoint: string, Twitter API endpoint.
+            limit: integer, number of requests allowed per window.
+            remaining: integer, number of requests left in the window.
+            reset: integer, epoch time at which the window resets.
+        """
+        with self.lock:
+            budget = self.budgets.get(endpoint)
+            if budget and budget['reset'] == reset:
+                remaining = min(remaining, budget['remaining'])
+            self.budgets[endpoint] = {
+                'limit': limit, 'remaining': remaining, 'reset': reset
+            }
+
+    def snapshot(self):
+        """Returns a copy of the budget of every known endpoint."""
+        with self.lock:
+            return {
+                endpoint: dict(budget)
+                for endpoint, budget in self.budgets.items()
+            }
+
+
+class RedisBudget(object):
+    """Request budget of each endpoint shared by all processes through Redis.
+
+    Each endpoint is stored as a hash with the 'limit', 'remaining' and
+    'reset' fields, and is updated by Lua scripts so that concurrent workers
+    never spend the same unit of budget twice. ACQUIRE paces units like
+    pace_delay, and returns milliseconds since Redis truncates the numbers
+    returned by scripts to integers.
+
+    Attributes:
+        redis: redis.Redis client.
+        prefix: string, prefix of the Redis keys.
+    """
+    ACQUIRE = """
+    local limit = tonumber(redis.call('HGET', KEYS[1], 'limit'))
+    local remaining = tonumber(redis.call('HGET', KEYS[1], 'remaining'))
+    local reset = tonumber(redis.call('HGET', KEYS[1], 'reset'))
+    local now = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local window = tonumber(ARGV[3])
+    if remaining == nil or reset == nil or now >= reset then
+        return 0
+    end
+    if remaining <= 0 then
+        return math.ceil((reset - now) * 1000)
+    end
+    if limit ~= nil and limit > 0 then
+        local elapsed = math.max(window - (reset - now), 0)
+        local ready = (limit - remaining + 1 - burst) * window / limit
+        if ready > elapsed then
+            return math.ceil((ready - elapsed) * 1000)
+        end
+    end
+    redis.call('HINCRBY', KEYS[1], 'remaining', -1)
+    return 0
+    """
+
+    UPDATE = """
+    local reset = tonumber(ARGV[3])
+    local remaining = tonumber(ARGV[2])
+    local current = tonumber(redis.call('HGET', KEYS[1], 'remaining'))
+    if current ~= nil and
+            tonumber(redis.call('HGET', KEYS[1], 'reset')) == reset then
+        remaining = math.min(remaining, current)
+    end
+    redis.call(
+        'HSET', KEYS[1], 'limit', ARGV[1], 'remaining', remaining,
+        'reset', reset
+    )
+    redis.call('EXPIREAT', KEYS[1], reset + tonumber(ARGV[4]))
+    return remaining
+    """
+
+    def __init__(self, redis, prefix='nba_ws:ratelimit:'):
+        self.redis = redis
+        self.prefix = prefix
+        self.acquire_script = redis.register_script(self.ACQUIRE)
+        self.update_script = redis.register_script(self.UPDATE)
+
+    def acquire(self, endpoint, now, burst):
+        """See LocalBudget.acquire."""
+        return int(self.acquire_script(
+            keys=[self.prefix + endpoint], args=[now, burst, WINDOW]
+        )) / 1000
+
+    def update(self, endpoint, limit, remaining, reset):
+        """See LocalBudget.update."""
+        self.update_script(
+            keys=[self.prefix + endpoint],
+            args=[limit, remaining, reset, WINDOW]
+        )
+
+    def snapshot(self):
+        """Returns the budget of every known endpoint."""
+        budgets = {}
+        for key in self.redis.scan_iter(match=self.prefix + '*'):
+            budget = self.redis.hgetall(key)
+            endpoint = key.decode('utf-8')[len(self.prefix):]
+            budgets[endpoint] = {
+                field.decode('utf-8'): int(val)
+                for field, val in budget.items()
+            }
+        return budgets
+
+
+class RateLimiter(object):
+    """Schedules Twitter API requests within the budget of their endpoint.
+
+    Attributes:
+        budget: LocalBudget or RedisBudget instance.
+        max_wait: integer, longest number of seconds a request waits for
+            budget before RateLimitExceeded is raised.
+        burst: integer, number of requests sent ahead of the even spread of
+            the budget over the window (see pace_delay).
+        max_retries: integer, number of times a request answered with a 429
+            is sent again before RateLimitExceeded is raised.
+    """
+    def __init__(self, budget, max_wait, burst=0, max_retries=3):
+        self.budget = budget
+        self.max_wait = max_wait
+        self.burst = burst
+        self.max_retries = max_retries
+
+    def wait(self, endpoint):
+        """Blocks until one unit of budget of endpoint is taken.
+
+        Args:
+            endpoint: string, Twitter API endpoint.
+
+        Raises:
+            RateLimitExceeded: if the budget resets later than max_wait.
+        """
+        delay = self.budget.acquire(endpoint, time.time(), self.burst)
+        while delay:
+            if delay > self.max_wait:
+                raise RateLimitExceeded(endpoint, math.ceil(delay))
+            time.sleep(delay)
+            delay = self.budget.acquire(endpoint, time.time(), self.burst)
+
+    def update(self, endpoint, headers):
+        """Stores the budget reported in the headers of a response.
+
+        Args:
+            endpoint: string, Twitter API endpoint.
+            headers: dict-like, headers of the response.
+        """
+        if 'x-rate-limit-remaining' not in headers:
+            return
+        self.budget.update(
+            endpoint,
+            int(headers.get('x-rate-limit-limit', 0)),
+            int(headers['x-rate-limit-remaining']),
+            int(headers.get('x-rate-limit-reset', time.time() + WINDOW))
+        )
+
+    def update_from_status(self, status):
+        """Stores the budgets of a rate_limit_status response.
+
+        Args:
+            status: dict, json response of SearchTweet.get_rate_limit_status.
+        """
+        for endpoints in status.get('resources', {}).values():
+            for endpoint, budget in endpoints.items():
+                self.budget.update(
+                    endpoint, budget['limit'], budget['remaining'],
+                    budget['reset']
+                )
+
+    def known(self, endpoint):
+        """Checks whether the current window budget of endpoint is known."""
+        budget = self.budget.snapshot().get(endpoint)
+        return bool(budget) and budget['reset'] > time.time()
+
+    def request(self, endpoint, method, url, **kwargs):
+        """Sends a request once budget of its endpoint is available.
+
+        A 429 response means the budget was used up by another client of the
+        same credentials. The endpoint is then out of budget until the reset
+        of the response (or for a whole window when the response has no
+        reset in the future), whatever its x-rate-limit-remaining header
+        says, and the request is sent again after the reset at most
+        max_retries times.
+
+        Args:
+            endpoint: string, Twitter API endpoint of the request.
+            method: string, HTTP method of the request.
+            url: string, URL of the request.
+            **kwargs: passed to requests.Session.request.
+
+        Returns:
+            requests.Response instance.
+
+        Raises:
+            RateLimitExceeded: if the budget resets later than max_wait, or
+                if the request is still answered with a 429 after
+                max_retries retries.
+        """
+        retries = 0
+        while True:
+            self.wait(endpoint)
+            r = get_session().request(method, url, **kwargs)
+            self.update(endpoint, r.headers)
+            if r.status_code != 429:
+                return r
+            now = time.time()
+            reset = int(r.headers.get('x-rate-limit-reset', 0))
+            if reset <= now:
+                reset = int(now) + WINDOW
+            self.budget.update(
+                endpoint, int(r.headers.get('x-rate-limit-limit', 0)), 0,
+                reset
+            )
+            if retries >= self.max_retries:
+                raise RateLimitExceeded(endpoint, math.ceil(reset - now))
+            retries += 1
+
+    def snapshot(self):
+        """Returns the budget of every known endpoint, for monitoring."""
+        return self.budget.snapshot()
+
+
+def get_rate_limiter():
+    """Returns the RateLimiter of the application.
+
+    The budget is kept in Redis when the REDIS_URL config value is set,
+    otherwise in the current process.
+
+    Returns:
+        RateLimiter instance.
+    """
+    global _local_budget
+    redis = get_redis()
+    if redis is not None:
+        budget = RedisBudget(redis)
+    else:
+        if _local_budget is None:
+            _local_budget = LocalBudget()
+        budget = _local_budget
+    return RateLimiter(
+        budget, current_app.config['RATE_LIMIT_MAX_WAIT'],
+        current_app.config['RATE_LIMIT_BURST'],
+        current_app.config['RATE_LIMIT_MAX_RETRIES']
+    )
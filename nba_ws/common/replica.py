@@ -0,0 +1,145 @@
+"""This module contains the routing of read-only requests to a read replica.
+
+When the PG_REPLICA_DATABASE_URL environment variable is set, the replica is
+added as the 'replica' bind of Flask-SQLAlchemy (see the SQLALCHEMY_BINDS
+config value). Resource methods decorated with read_replica send their
+queries to it as long as its replication lag is under REPLICA_MAX_LAG
+seconds, and fall back to the primary otherwise. Writes (flushes and
+INSERT, UPDATE or DELETE statements) always go to the primary, and so does
+every query outside of decorated methods, including the ingest tasks and
+their consistency-critical reads such as SearchTweet.get_since_id.
+
+Classes:
+    RoutingSession
+    RoutingSQLAlchemy
+
+Functions:
+    replica_lag
+    use_replica
+    read_replica
+"""
+from functools import wraps
+import threading
+import time
+
+from flask import current_app
+from flask_sqlalchemy import SignallingSession, SQLAlchemy, get_state
+from sqlalchemy import orm
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.sql.expression import UpdateBase
+
+REPLICA_BIND = 'replica'
+
+_lag_checks = {}
+_lock = threading.Lock()
+
+
+class RoutingSession(SignallingSession):
+    """Session sending the reads of read-only requests to the replica.
+
+    Reads are sent to the replica once the 'replica' key of the info of the
+    session is set by read_replica. Flask-SQLAlchemy removes the session at
+    the end of the request, so the next request starts on the primary.
+    Statements passed as text are not inspected, so decorated methods must
+    only write through the ORM or insert, update and delete constructs.
+    """
+    def get_bind(self, mapper=None, clause=None):
+        """Returns the replica engine for reads routed to it.
+
+        See SignallingSession.get_bind for the other reads and writes.
+        """
+        if self.info.get(REPLICA_BIND) and not self._flushing and \
+                not isinstance(clause, UpdateBase):
+            state = get_state(self.app)
+            return state.db.get_engine(self.app, bind=REPLICA_BIND)
+        return super(RoutingSession, self).get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """Flask-SQLAlchemy extension using RoutingSession as its session."""
+    def create_session(self, options):
+        """Creates the session factory of the scoped session."""
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+def replica_lag(engine):
+    """Reads the replication lag of the replica.
+
+    The lag is 0 when the replica has replayed everything it received, so a
+    replica of an idle primary isn't reported as lagging.
+
+    Args:
+        engine: Engine of the replica.
+
+    Returns:
+        The lag in seconds, None if the replica can't be reached or doesn't
+        report it.
+    """
+    try:
+        with engine.connect() as conn:
+            lag = conn.execute(
+                'SELECT CASE '
+                'WHEN NOT pg_is_in_recovery() THEN 0 '
+                'WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() '
+                'THEN 0 '
+                'ELSE extract(epoch FROM now() - '
+                'pg_last_xact_replay_timestamp()) END'
+            ).scalar()
+    except SQLAlchemyError:
+        current_app.logger.exception('replica lag check failed')
+        return None
+    return None if lag is None else float(lag)
+
+
+def use_replica():
+    """Checks whether reads can be sent to the replica.
+
+    The lag is read at most every REPLICA_LAG_CHECK_INTERVAL seconds per
+    process, and the replica is used if it is under REPLICA_MAX_LAG.
+
+    Returns:
+        False if no replica is configured, it can't be reached or it lags
+        too far behind the primary, True otherwise.
+    """
+    config = current_app.config
+    if REPLICA_BIND not in (config['SQLALCHEMY_BINDS'] or {}):
+        return False
+    engine = get_state(current_app).db.get_engine(
+        current_app, bind=REPLICA_BIND
+    )
+    now = time.monotonic()
+    with _lock:
+        checked = _lag_checks.get(engine)
+    if checked is None or \
+            now - checked[0] >= config['REPLICA_LAG_CHECK_INTERVAL']:
+        lag = replica_lag(engine)
+        usable = lag is not None and lag <= config['REPLICA_MAX_LAG']
+        if not usable:
+            current_app.logger.warning(
+                f'replica lag is {lag}s, reading from the primary'
+            )
+        checked = (now, usable)
+        with _lock:
+            _lag_checks[engine] = checked
+    return checked[1]
+
+
+def read_replica(f):
+    """Decorator sending the reads of a resource method to the replica.
+
+    The method reads from the primary when use_replica returns False. It
+    must be the last of the method_decorators of a Resource, so that the
+    other decorators read from the same database.
+
+    Args:
+        f: resource method.
+
+    Returns:
+        Decorated method.
+    """
+    @wraps(f)
+    def wrapper(*args, **kwargs):
+        if use_replica():
+            get_state(current_app).db.session.info[REPLICA_BIND] = True
+        return f(*args, **kwargs)
+    return wrapper
@@ -0,0 +1,50 @@
+"""This module contains the lookup of the search parameters of tweets.
+
+The parameters of the Search API requests are stored once per SearchRun
+instead of once per tweet. clean_tweet (see nba_ws.common.util) reads them
+back through a per-process LRU cache of the params of SEARCH_RUN_CACHE_SIZE
+runs, so a page of tweets retrieved by the same runs costs a handful of
+lookups.
+
+Functions:
+    search_run_params
+"""
+from flask import current_app
+
+from nba_ws import db
+from nba_ws.common.store import LRUCache
+from nba_ws.models import SearchRun
+
+_cache = None
+
+
+def _load_params(run_id):
+    """Reads the params of a SearchRun, an empty list if it doesn't exist."""
+    params = db.session.query(SearchRun.params).filter(
+        SearchRun.id == run_id
+    ).scalar()
+    return params or []
+
+
+def search_run_params(run_id, page):
+    """Returns the parameters of the Search API request of a tweet.
+
+    Args:
+        run_id: integer, search_run_id of the tweet.
+        page: integer, search_page of the tweet.
+
+    Returns:
+        Dictionary of the parameters of the request which retrieved the
+        tweet, None if the tweet has no SearchRun.
+    """
+    global _cache
+    if run_id is None or page is None:
+        return None
+    if _cache is None:
+        _cache = LRUCache(current_app.config['SEARCH_RUN_CACHE_SIZE'])
+    params = _cache.get(run_id, _load_params)
+    if page >= len(params):
+        # the run was cached while it was still writing pages
+        _cache.discard(run_id)
+        params = _cache.get(run_id, _load_params)
+    return params[page] if page < len(params) else None
@@ -0,0 +1,56 @@
+"""This module contains the database settings of the web and worker processes.
+
+The web tier can be served by sync or gevent gunicorn workers (see
+gunicorn.conf.py). With gevent, every worker serves up to
+GUNICORN_WORKER_CONNECTIONS requests at once on greenlets, so psycopg2 is
+made cooperative with psycogreen and the size of the connection pool of each
+process is set by the DB_POOL_* config values instead of the defaults of
+SQLAlchemy.
+
+Functions:
+    engine_options
+    patch_psycopg
+"""
+from sqlalchemy.engine.url import make_url
+
+
+def engine_options(config):
+    """Builds the SQLALCHEMY_ENGINE_OPTIONS of the application.
+
+    The options are used for every bind, including the read replica. Pool
+    options only apply to Postgres, so other databases (e.g. the SQLite
+    database of the tests) keep the defaults of Flask-SQLAlchemy.
+
+    Args:
+        config: Config of the application.
+
+    Returns:
+        Dictionary of keyword arguments of sqlalchemy.create_engine.
+    """
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    backend = make_url(uri).get_backend_name() if uri else None
+    if backend not in ('postgresql', 'postgres'):
+        return {}
+    options = {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        # connections idle in the pool can be closed by the server or by
+        # a pooler in between, check them out only if they still work
+        'pool_pre_ping': True,
+    }
+    if config['DB_STATEMENT_TIMEOUT']:
+        options['connect_args'] = {
+            'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT']}"
+        }
+    return options
+
+
+def patch_psycopg():
+    """Makes psycopg2 yield to other greenlets while it waits on Postgres.
+
+    Must be called in every gevent worker before its first connection.
+    """
+    from psycogreen.gevent import patch_psycopg as patch
+    patch()
@@ -0,0 +1,39 @@
+"""This module contains helpers maintaining the tweet activity statistics.
+
+Functions:
+    record_activity
+"""
+from collections import Counter
+
+from sqlalchemy.dialects.postgresql import insert
+
+from nba_ws import db
+from nba_ws.models import TweetActivity
+
+
+def record_activity(tweet_rows):
+    """Adds inserted tweets to the TweetActivity model.
+
+    Rows are upserted in the current transaction, in a fixed order so that
+    concurrent writers lock them in the same order.
+
+    Args:
+        tweet_rows: iterable, rows of inserted tweets with author and
+            tweet_date attributes.
+    """
+    counts = Counter(
+        (row.author, row.tweet_date.replace(minute=0, second=0, microsecond=0))
+        for row in tweet_rows
+        if row.author is not None and row.tweet_date is not None
+    )
+    if not counts:
+        return
+    table = TweetActivity.__table__
+    stmt = insert(table).values([
+        {'author': author, 'bucket': bucket, 'tweet_count': count}
+        for (author, bucket), count in sorted(counts.items())
+    ])
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=['author', 'bucket'],
+        set_={'tweet_count': table.c.tweet_count + stmt.excluded.tweet_count}
+    ))
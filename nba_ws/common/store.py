@@ -0,0 +1,77 @@
+"""This module contains the shared state helpers used by the app.
+
+Redis is optional: when the REDIS_URL config value is not set, helpers which
+share state through Redis fall back to per-process storage.
+
+Classes:
+    LRUCache
+
+Functions:
+    get_redis
+"""
+from collections import OrderedDict
+import threading
+
+from flask import current_app
+
+_clients = {}
+
+
+def get_redis():
+    """Returns the Redis client for the REDIS_URL config value.
+
+    Returns:
+        redis.Redis instance, or None if REDIS_URL is not configured.
+    """
+    url = current_app.config.get('REDIS_URL')
+    if not url:
+        return None
+    if url not in _clients:
+        import redis
+        _clients[url] = redis.Redis.from_url(url)
+    return _clients[url]
+
+
+class LRUCache(object):
+    """Thread-safe per-process cache keeping the most recently used values.
+
+    Attributes:
+        size: integer, maximum number of values kept.
+    """
+    def __init__(self, size):
+        """Creates the cache.
+
+        Args:
+            size: integer, maximum number of values kept.
+        """
+        self.size = size
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, load):
+        """Returns the value of key, calling load(key) on a miss.
+
+        Args:
+            key: hashable key of the value.
+            load: callable, returns the value of a key missing from the
+                cache. It is called without holding the lock.
+
+        Returns:
+            The value of key.
+        """
+        with self._lock:
+            if key in self._values:
+                self._values.move_to_end(key)
+                return self._values[key]
+        value = load(key)
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            while len(self._values) > self.size:
+                self._values.popitem(last=False)
+        return value
+
+    def discard(self, key):
+        """Removes the value of key from the cache, if present."""
+        with self._lock:
+            self._values.pop(key, None)
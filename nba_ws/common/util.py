@@ -5,24 +5,51 @@ Classes:
     SearchTweet
 
 Functions:
+    chunked
     clean_tweet
     clean_search_tweet
+    dumps
+    json_response
+    tweet_columns
+    tweet_fields
+    utc_datetime
 
 Objects:
     sf_format
     status_format
+    tweet_fieldsets
 """
 import base64
-from datetime import datetime
+from datetime import datetime, timezone
+from itertools import islice
 import json
+import logging
 import os
-import requests
+import time
 
-from flask_restful import fields
+from flask import current_app, json as flask_json
+from flask_restful import fields, inputs
+from sqlalchemy.dialects.postgresql import insert
 from urllib.parse import quote_plus, urljoin
+from werkzeug.http import http_date
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from nba_ws import db
-from nba_ws.models import Tweet
+from nba_ws.common.archive import archived_json_data
+from nba_ws.common.auth import get_token_provider
+from nba_ws.common.cache import bump_version
+from nba_ws.common.client import get_session
+from nba_ws.common.notify import notify_tweets
+from nba_ws.common.ratelimit import get_rate_limiter
+from nba_ws.common.search_runs import search_run_params
+from nba_ws.common.stats import record_activity
+from nba_ws.models import SearchCursor, SearchField, SearchRun, Tweet
+
+logger = logging.getLogger(__name__)
 
 
 class TwitterOAuth2(object):
@@ -74,7 +101,7 @@ class TwitterOAuth2(object):
         }
         body = {'grant_type': 'client_credentials'}
         resource_url = 'https://api.twitter.com/oauth2/token'
-        r = requests.post(url=resource_url, data=body, headers=headers)
+        r = get_session().post(url=resource_url, data=body, headers=headers)
         assert r.status_code in [200]
         self.bearer_token = r.json()['access_token']
 
@@ -88,7 +115,7 @@ class TwitterOAuth2(object):
             # 'Content-Type': 'application/x-www-form-urlencoded;'
         }
         data = {'access_token': self.bearer_token}
-        r = requests.post(url=resource_url, data=data, headers=headers)
+        r = get_session().post(url=resource_url, data=data, headers=headers)
         assert r.status_code in [200]
         self.invalidate_resp = r
 
@@ -101,47 +128,100 @@ class SearchTweet(object):
 
     Attributes:
         base_url: string, base URL of the Twitter API.
+        bearer_token: string, OAuth2 token used to authenticate requests.
         headers: dict, header passed to request to generate bearer token.
         max_id: integer, parameter passed to Search API request, specifies
             that the tweets retrieved should not be greater than the max_id
             parameter passed into the request.
+        page_count: integer, number of Search API requests performed by the
+            last call of the get_tweets method.
+        page_stats: list, dicts with the latency in 'seconds', the number of
+            'statuses' returned and the rate limit 'remaining' after each
+            Search API request of the last call of the get_tweets method.
         params: dict, parameters passed to request to generate bearer token.
         rate_limit_status_url: string, URL of Twitter API to check the
             rate limit status for the user.
+        request_seconds: float, time spent waiting on Search API requests
+            by the last call of the get_tweets method.
+        search_run: SearchRun object of the last call of the get_tweets
+            method, written along with its tweets by the write_to_db method.
         search_url: string, URL with endpoint for Search API to retrieve tweets
         since_id: integer, parameter passed to Search API request, specifies
             that the tweets retrieved should be greater than the since_id
             parameter passed into the request.
 
     """
-    def __init__(self, bearer_token):
+    def __init__(self, bearer_token=None):
         """Initializes attributes of class
 
         Args:
             bearer_token: string, OAuth2 token used to authenticate requests
-            made to Twitter Search API.
+            made to Twitter Search API. Taken from the shared token provider
+            (see nba_ws.common.auth) on the first request when None.
         """
-        self.base_url = "https://api.twitter.com/1.1/"
+        self.base_url = urljoin(current_app.config['TWITTER_API_URL'], "1.1/")
         self.search_url = urljoin(self.base_url, "search/tweets.json")
         self.rate_limit_status_url = urljoin(
             self.base_url, "application/rate_limit_status.json"
         )
         self.params = {}
-        self.headers = {'Authorization': f'Bearer {bearer_token}'}
+        self.bearer_token = bearer_token
         self.since_id = None
         self.max_id = None
+        self.page_count = 0
+        self.page_stats = []
+        self.request_seconds = 0
+        self.search_run = None
+
+    @property
+    def headers(self):
+        """Authorization header of the requests, with the bearer token."""
+        if self.bearer_token is None:
+            self.bearer_token = get_token_provider().get()
+        return {'Authorization': f'Bearer {self.bearer_token}'}
+
+    def request(self, endpoint, url, params):
+        """Performs an authenticated GET request to the Twitter API.
+
+        If the bearer token is rejected, it is invalidated in the shared
+        token provider and the request is sent once more with the new token.
+
+        Args:
+            endpoint: string, Twitter API endpoint of the request, used by the
+                rate limiter.
+            url: string, URL of the request.
+            params: dict, query parameters of the request.
+
+        Returns:
+            requests.Response instance.
+        """
+        limiter = get_rate_limiter()
+        r = limiter.request(
+            endpoint, 'GET', url=url, params=params, headers=self.headers
+        )
+        if r.status_code == 401:
+            self.bearer_token = get_token_provider().invalidate(
+                self.bearer_token
+            )
+            r = limiter.request(
+                endpoint, 'GET', url=url, params=params, headers=self.headers
+            )
+        return r
 
     def get_since_id(self, author):
         """Gets the highest tweet id of a given author.
 
+        The since_id is read from the SearchCursor of the Search Field of the
+        author, which is advanced every time the tweets of a run are written.
+
         Args:
             author: string, author of tweet to check the since_id for.
         """
-        tweet = Tweet.query.filter_by(author=author).order_by(
-            Tweet.tweet_id.desc()
+        cursor = SearchCursor.query.join(SearchField).filter(
+            SearchField.author == author
         ).first()
-        if tweet:
-            self.since_id = str(tweet.tweet_id)
+        if cursor and cursor.since_id:
+            self.since_id = str(cursor.since_id)
 
     def build_query(self, query_params):
         """Builds a query string used by the search request from a dictionary.
@@ -205,33 +285,60 @@ class SearchTweet(object):
         if search_params.get('q'):
             self.params['q'] = self.build_query(search_params['q'])
 
-    def get_tweets(self, search_params):
+    def get_tweets(self, search_params, since_id=None):
         """Performs Search API requests for a given set of search parameters.
 
+        Args:
+            search_params: dict, containing parameters provided to the
+                Search API request.
+            since_id: integer, since_id of the search (see the iter_tweets
+                method).
+
+        Returns:
+            List of tweets, each tweet is stored as a dictionary with keys
+            mapped to the raw json tweet data from the search method response
+            and the search parameters used to perform that search request.
+        """
+        return list(self.iter_tweets(search_params, since_id))
+
+    def iter_tweets(self, search_params, since_id=None):
+        """Lazily performs Search API requests for a set of search parameters.
+
         This method is used to perform the search requests to retrieve tweets.
         To perform the search for given search parameters:
             1: Set the since_id for the search parameters.
             2: Form a dictionary payload from the search_params arg.
             3: Call the search method.
-            4: If the response of the search is empty, stop and
-                return the tweets list.
-            5: If the response is not empty, format the response
-                and add to the list to be returned.
+            4: If the response of the search is empty, stop.
+            5: If the response is not empty, format and yield each tweet
+                of the response.
+        The next page is only requested once every tweet of the current page
+        has been consumed, so at most one page is held in memory.
 
         Args:
             search_params: dict, containing parameters provided to the
                 Search API request.
-
-        Returns:
-            List of tweets, each tweet is stored as a dictionary with keys
-            mapped to the raw json tweet data from the search method response
-            and the search parameters used to perform that search request.
+            since_id: integer, since_id of the search, 0 if the Search Field
+                has no tweets yet. Read with the get_since_id method when
+                None.
+
+        Yields:
+            Tweets, each tweet is stored as a dictionary with keys mapped to
+            the raw json tweet data from the search method response and the
+            search parameters used to perform that search request.
         """
-        tweets = []
-        self.get_since_id(search_params['q']['author'])
+        self.page_count = 0
+        self.page_stats = []
+        self.request_seconds = 0
+        self.search_run = SearchRun(search_params['q']['author'])
+        if since_id is None:
+            self.get_since_id(search_params['q']['author'])
+        else:
+            self.since_id = str(since_id) if since_id else None
         while(1):
             self.build_params(search_params)
             resps = self.search()
+            self.page_count += 1
             if not resps['json_data']['statuses']:
                 self.max_id = None
                 break
@@ -239,30 +346,44 @@ class SearchTweet(object):
                 tweet = {}
                 tweet['json_data'] = status
                 tweet['search_params'] = resps['search_params']
-                tweets.append(tweet)
-        return tweets
+                yield tweet
 
     def search(self):
         """Performs a Search API request to retrieve tweets.
 
+        The request waits for budget of the shared rate limiter (see
+        nba_ws.common.ratelimit) before being sent. Its latency, number of
+        statuses and the rate limit budget left are added to page_stats.
+
         Returns:
             Dictionary of response from Search API request. Dictionary returned
             has keys mapped to the raw json data of the request and the
             search parameters used to perform the request.
+
+        Raises:
+            RateLimitExceeded: if the rate limit budget resets later than the
+                RATE_LIMIT_MAX_WAIT config value.
+            requests.HTTPError: if the Search API answers with an error
+                status.
         """
-        r = requests.get(
-            url=self.search_url,
-            params=self.params,
-            headers=self.headers
-        )
-        print(r.url, r.status_code)
-        assert r.status_code in [200]
-        if r.json()['statuses']:
+        started = time.monotonic()
+        r = self.request('/search/tweets', self.search_url, self.params)
+        seconds = time.monotonic() - started
+        self.request_seconds += seconds
+        r.raise_for_status()
+        json_data = r.json()
+        remaining = r.headers.get('x-rate-limit-remaining')
+        self.page_stats.append({
+            'seconds': round(seconds, 3),
+            'statuses': len(json_data['statuses']),
+            'remaining': None if remaining is None else int(remaining)
+        })
+        if json_data['statuses']:
             self.max_id = min(
-                [resp['id'] for resp in r.json()['statuses']]
+                [resp['id'] for resp in json_data['statuses']]
             ) - 1
         response = {}
-        response['json_data'] = r.json()
+        response['json_data'] = json_data
         response['search_params'] = self.params
         self.params = {}
         return response
@@ -281,14 +402,26 @@ class SearchTweet(object):
         payload = {}
         if resources:
             payload = {'resources': ','.join(resources)}
-        r = requests.get(
-            url=self.rate_limit_status_url,
-            params=payload,
-            headers=self.headers
+        r = self.request(
+            '/application/rate_limit_status', self.rate_limit_status_url,
+            payload
         )
         assert r.status_code in [200]
         return r.json()
 
+    def sync_rate_limit_status(self):
+        """Seeds the shared rate limit budget before a run.
+
+        The rate limit status of the search resource is only requested when
+        the budget of the current window is not already known, which is the
+        case for the first run after the window resets.
+        """
+        limiter = get_rate_limiter()
+        if not limiter.known('/search/tweets'):
+            limiter.update_from_status(
+                self.get_rate_limit_status(['search'])
+            )
+
     def make_row(self, tweet_resp):
         """Flattens tweet response into a tweet row to be added to Tweet model.
 
@@ -307,45 +440,356 @@ class SearchTweet(object):
         tweet_row['tweet_date'] = datetime.strptime(
             tweet_resp['json_data']['created_at'], "%a %b %d %H:%M:%S %z %Y"
         )
-        tweet_row['json_data'] = json.dumps(tweet_resp['json_data'])
-        tweet_row['search_params'] = json.dumps(tweet_resp['search_params'])
+        tweet_row['json_data'] = tweet_resp['json_data']
         return tweet_row
 
-    def write_to_db(self, tweets):
+    def write_to_db(self, tweets, chunk_size=None, cursor=None,
+                    progress=None, cycle_id=None):
         """Writes iterable tweets to Tweet model.
 
+        Tweets are written in chunks of chunk_size rows (see the _insert_rows
+        method), and tweets which are already stored are skipped. Each chunk
+        is committed as soon as it is written and tweets are consumed lazily,
+        so passing the iter_tweets generator keeps at most one page and one
+        chunk in memory.
+        The search parameters of the tweets are stored once per page in the
+        params of the SearchRun of the search (the search_run attribute, or
+        a new SearchRun when tweets weren't retrieved by this object), which
+        is finished along with the cursor. The run also records the ingest
+        ledger metrics of the search: the page_stats of its requests, the
+        tweets returned, inserted and skipped and the time spent writing
+        them, updated with every chunk so a failed run keeps its counts.
+
         Args:
             tweets: iterable, containing tweet responses
+            chunk_size: integer, number of rows per INSERT statement.
+                Defaults to the TWEETS_WRITE_CHUNK_SIZE config value.
+            cursor: SearchCursor object of the Search Field the tweets were
+                retrieved for. Pages are retrieved newest first, so its
+                since_id, last_run and last_page_count are only advanced
+                with the last chunk of tweets, and a run which fails part way
+                is searched again from the previous since_id. They are
+                committed in the transaction of the last insert, or on their
+                own when the last chunk is full (chunked can only tell it is
+                the last one by retrieving the next page).
+            progress: callable, called after each chunk is committed with a
+                dictionary of the number of tweets 'inserted' and 'skipped'
+                so far.
+            cycle_id: integer, id of the IngestCycle the search is part of.
+
+        Returns:
+            Dictionary with the number of tweets 'inserted' and 'skipped',
+            and the lowest ('min_id') and highest ('max_id') tweet_id
+            retrieved, None if no tweets were retrieved.
+        """
+        if chunk_size is None:
+            chunk_size = current_app.config['TWEETS_WRITE_CHUNK_SIZE']
+        inserted, skipped, since_id, min_id = 0, 0, 0, None
+        run, pages, write_seconds, finished = None, {}, 0, False
+        try:
+            for chunk in chunked(tweets, chunk_size):
+                # iter_tweets sets search_run before yielding its first tweet
+                run = run or self._start_search_run(cycle_id)
+                tweet_rows = self._run_rows(run, chunk, pages)
+                self._record_run(run, inserted, skipped, write_seconds)
+                tweet_ids = [row['tweet_id'] for row in tweet_rows]
+                since_id = max(since_id, *tweet_ids)
+                min_id = min([min_id, *tweet_ids] if min_id else tweet_ids)
+                started = time.monotonic()
+                count = self._insert_rows(tweet_rows)
+                inserted += count
+                skipped += len(tweet_rows) - count
+                # chunked only yields a short chunk once tweets is exhausted
+                if len(chunk) < chunk_size:
+                    self._finish_search_run(
+                        run, cursor, inserted, skipped,
+                        write_seconds + time.monotonic() - started, since_id
+                    )
+                    finished = True
+                db.session.commit()
+                write_seconds += time.monotonic() - started
+                if progress is not None:
+                    progress({'inserted': inserted, 'skipped': skipped})
+            if not finished:
+                self._finish_search_run(
+                    run or self._start_search_run(cycle_id), cursor, inserted,
+                    skipped, write_seconds, since_id
+                )
+                db.session.commit()
+        except Exception:
+            # the chunks committed before the failure are served already
+            db.session.rollback()
+            if inserted:
+                bump_version('tweets')
+                db.session.commit()
+            raise
+        logger.info('%d record(s) added to table, %d skipped.', inserted,
+                    skipped)
+        return {
+            'inserted': inserted,
+            'skipped': skipped,
+            'min_id': min_id,
+            'max_id': since_id or None
+        }
+
+    def _run_rows(self, run, tweets, pages):
+        """Flattens a chunk of tweet responses into rows of their SearchRun.
+
+        The search parameters of each page are added once to the params of
+        run, and the rows keep the index of their page in search_page. run
+        is flushed, so the rows can reference its id.
+
+        Args:
+            run: SearchRun object of the search.
+            tweets: list, tweet responses of the chunk.
+            pages: dict, ids of the search_params dicts of the pages written
+                so far mapped to their index and parameters. Updated with the
+                pages of tweets.
+
+        Returns:
+            List of tweet rows (see the make_row method).
+        """
+        tweet_rows = []
+        for tweet in tweets:
+            # tweets of the same page share their search_params dict
+            params = tweet.get('search_params')
+            if id(params) not in pages:
+                pages[id(params)] = (len(pages), params)
+            tweet_row = self.make_row(tweet)
+            tweet_row['search_page'] = pages[id(params)][0]
+            tweet_rows.append(tweet_row)
+        run.params = [page_params for _, page_params in pages.values()]
+        if run.author is None:
+            run.author = tweet_rows[0]['author']
+        db.session.flush()
+        for tweet_row in tweet_rows:
+            tweet_row['search_run_id'] = run.id
+        return tweet_rows
+
+    def _insert_rows(self, tweet_rows):
+        """Inserts tweet rows in the current transaction.
+
+        Rows are written with a multi-row INSERT ... ON CONFLICT (tweet_id,
+        tweet_date) DO NOTHING statement, so tweets which are already stored
+        are skipped instead of failing the whole batch (the tweet_date of a
+        tweet never changes, so the pair is as unique as tweet_id). The
+        tweets inserted are counted in the TweetActivity model (see
+        record_activity from nba_ws.common.stats) and published to the
+        connected clients once committed (see notify_tweets from
+        nba_ws.common.notify).
+
+        Args:
+            tweet_rows: list, tweet rows (see the make_row method).
+
+        Returns:
+            Number of tweets inserted.
         """
-        tweet_rows = [Tweet(**self.make_row(tweet)) for tweet in tweets]
-        db.session.add_all(tweet_rows)
-        db.session.commit()
-        print(f"{len(tweet_rows)} record(s) added to table.")
+        stmt = insert(Tweet.__table__).values(
+            tweet_rows
+        ).on_conflict_do_nothing(
+            index_elements=['tweet_id', 'tweet_date']
+        ).returning(
+            Tweet.__table__.c.id, Tweet.__table__.c.tweet_id,
+            Tweet.__table__.c.author, Tweet.__table__.c.tweet_date
+        )
+        inserted_rows = db.session.execute(stmt).fetchall()
+        if inserted_rows:
+            record_activity(inserted_rows)
+            notify_tweets(inserted_rows)
+        return len(inserted_rows)
 
+    def _start_search_run(self, cycle_id=None):
+        """Adds the SearchRun of the tweets being written to the session.
 
-def clean_tweet(tweet_row):
+        Args:
+            cycle_id: integer, id of the IngestCycle of the run.
+
+        Returns:
+            The search_run attribute, or a new SearchRun if it is None.
+        """
+        if self.search_run is None:
+            self.search_run = SearchRun(None)
+        self.search_run.cycle_id = cycle_id
+        db.session.add(self.search_run)
+        return self.search_run
+
+    def _finish_search_run(self, run, cursor, inserted, skipped,
+                           write_seconds, since_id):
+        """Finishes the SearchRun of the search and advances its cursor.
+
+        The version stamp of the tweets (see bump_version from
+        nba_ws.common.cache) is bumped once for the whole write, when any
+        tweet was inserted.
+
+        Args:
+            run: SearchRun object of the search.
+            cursor: SearchCursor object of the Search Field, or None.
+            inserted: integer, number of tweets inserted by the search.
+            skipped: integer, number of tweets skipped by the search.
+            write_seconds: float, time spent writing tweets.
+            since_id: integer, highest tweet_id retrieved, 0 if none.
+        """
+        self._record_run(run, inserted, skipped, write_seconds)
+        run.finished_at = datetime.utcnow()
+        self.search_run = None
+        if inserted:
+            bump_version('tweets')
+        if cursor is not None:
+            cursor.since_id = max(cursor.since_id or 0, since_id) or None
+            cursor.last_run = run.finished_at
+            cursor.last_page_count = self.page_count
+            db.session.add(cursor)
+
+    def _record_run(self, run, inserted, skipped, write_seconds):
+        """Copies the ingest ledger metrics of the search to its SearchRun.
+
+        Args:
+            run: SearchRun object of the search.
+            inserted: integer, number of tweets inserted so far.
+            skipped: integer, number of tweets skipped so far.
+            write_seconds: float, time spent writing tweets so far.
+        """
+        seconds = [page['seconds'] for page in self.page_stats]
+        remaining = [
+            page['remaining'] for page in self.page_stats
+            if page['remaining'] is not None
+        ]
+        run.page_count = self.page_count
+        run.page_stats = list(self.page_stats)
+        run.empty_pages = sum(
+            1 for page in self.page_stats if not page['statuses']
+        )
+        run.request_seconds = round(self.request_seconds, 3)
+        run.max_request_seconds = max(seconds, default=0)
+        run.rate_limit_remaining = min(remaining, default=None)
+        run.tweets_returned = inserted + skipped
+        run.inserted = inserted
+        run.skipped = skipped
+        run.write_seconds = round(write_seconds, 3)
+
+
+def chunked(iterable, size):
+    """Splits an iterable into lists of at most size items.
+
+    Args:
+        iterable: iterable to be split.
+        size: integer, maximum number of items in each list.
+
+    Yields:
+        Lists of consecutive items of iterable.
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def clean_tweet(tweet_row, fields=None):
     """Create a dictionary from a row of Tweet model.
 
+    The json_data of archived tweets is read back from their TweetArchive
+    segment (see archived_json_data from nba_ws.common.archive), and
+    search_params from the SearchRun of the tweet (see search_run_params
+    from nba_ws.common.search_runs).
+
     Args:
         tweet_row: Tweet object, row of Tweet model.
+        fields: iterable, columns of the Tweet model to include. All the
+            columns are included when None (see tweet_fieldsets).
 
     Returns:
         Dictionary containing data of row of Tweet model where each key
         is a column of the Tweet model mapped to their corresponding values.
     """
+    if fields is None:
+        fields = tweet_fieldsets['full']
     tweet = {}
-    tweet['id'] = tweet_row.id
-    tweet['tweet_id'] = tweet_row.tweet_id
-    tweet['author'] = tweet_row.author
-    tweet['author_id'] = tweet_row.author_id
-    tweet['tweet_text'] = tweet_row.tweet_text
-    tweet['tweet_date'] = tweet_row.tweet_date
-    tweet['json_data'] = json.loads(tweet_row.json_data)
-    tweet['search_params'] = json.loads(tweet_row.search_params)
-    tweet['datetime_added'] = tweet_row.datetime_added
+    for field in fields:
+        if field == 'search_params' and hasattr(tweet_row, 'search_run_id'):
+            tweet[field] = search_run_params(
+                tweet_row.search_run_id, tweet_row.search_page
+            )
+        else:
+            tweet[field] = getattr(tweet_row, field)
+    if 'json_data' in tweet and tweet['json_data'] is None:
+        archive_id = getattr(tweet_row, 'archive_id', None)
+        if archive_id is not None:
+            tweet['json_data'] = archived_json_data(
+                archive_id, tweet_row.tweet_id
+            )
     return tweet
 
 
+def tweet_columns(fields):
+    """Returns the columns of the Tweet model to load to return fields.
+
+    tweet_id is always loaded, archive_id is loaded along with json_data so
+    that clean_tweet can rehydrate archived tweets, and search_params is
+    loaded as the search_run_id and search_page of the tweet.
+
+    Args:
+        fields: iterable, columns of the Tweet model to return.
+
+    Returns:
+        List of the column attributes of the Tweet model, to be passed to
+        load_only.
+    """
+    names = set(fields) | {'tweet_id'}
+    if 'json_data' in names:
+        names.add('archive_id')
+    if 'search_params' in names:
+        names.remove('search_params')
+        names.update(('search_run_id', 'search_page'))
+    return [getattr(Tweet, name) for name in sorted(names)]
+
+
+def tweet_fields(value):
+    """Parses the fields argument of the tweet resources.
+
+    Used as the type of a reqparse argument.
+
+    Args:
+        value: string, name of a fieldset of tweet_fieldsets or comma
+            separated columns of the Tweet model.
+
+    Returns:
+        Tuple of the names of the columns to return.
+
+    Raises:
+        ValueError: If value names an unknown column.
+    """
+    if value in tweet_fieldsets:
+        return tweet_fieldsets[value]
+    fields = tuple(
+        field.strip() for field in value.split(',') if field.strip()
+    )
+    unknown = set(fields) - set(tweet_fieldsets['full'])
+    if not fields or unknown:
+        raise ValueError(f'Unknown field(s): {", ".join(sorted(unknown))}')
+    return fields
+
+
+def utc_datetime(value):
+    """Parses an ISO 8601 date or datetime into a naive UTC datetime.
+
+    Used as the type of a reqparse argument. Naive datetimes and dates are
+    read as UTC, like the date columns of the models, and returned as is.
+
+    Args:
+        value: string, ISO 8601 date or datetime.
+
+    Returns:
+        datetime, naive and in UTC.
+    """
+    if 'T' not in value:
+        return inputs.date(value)
+    parsed = inputs.datetime_from_iso8601(value)
+    if parsed.tzinfo is None:
+        return parsed
+    return parsed.astimezone(timezone.utc).replace(tzinfo=None)
+
+
 def clean_search_field(search_field_row):
     """Clean Search Field row from SearchField model into a dictionary.
 
@@ -365,6 +809,48 @@ def clean_search_field(search_field_row):
     return search_field
 
 
+def dumps(obj):
+    """Serializes obj to json.
+
+    orjson is used when it is installed, which is several times faster than
+    the json module on the large nested json_data of tweets. Dates are
+    serialized as HTTP dates either way, as jsonify does.
+
+    Args:
+        obj: object to be serialized.
+
+    Returns:
+        bytes, json document.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME
+        )
+    return flask_json.dumps(obj).encode('utf-8')
+
+
+def _default(obj):
+    """Serializes the objects orjson passes through."""
+    if isinstance(obj, datetime):
+        return http_date(obj.utctimetuple())
+    raise TypeError(f'{type(obj).__name__} is not JSON serializable')
+
+
+def json_response(obj, status=200):
+    """Creates a json Response of obj, serialized with the dumps function.
+
+    Args:
+        obj: object to be serialized.
+        status: integer, HTTP status code of the response.
+
+    Returns:
+        Response instance.
+    """
+    return current_app.response_class(
+        dumps(obj), status=status, mimetype='application/json'
+    )
+
+
 sf_format = {
     'search_field': fields.String,
     'author': fields.String,
@@ -372,6 +858,16 @@ sf_format = {
     'uri': fields.Url('resources.search_field', absolute=True)
 }
 
+# named projections of the Tweet model accepted by the fields argument of
+# TweetListAPI, 'summary' leaves out the raw json columns
+tweet_fieldsets = {
+    'summary': ('tweet_id', 'author', 'tweet_text', 'tweet_date'),
+    'full': (
+        'id', 'tweet_id', 'author', 'author_id', 'tweet_text', 'tweet_date',
+        'json_data', 'search_params', 'datetime_added'
+    )
+}
+
 status_format = {
     'task_status_uri': fields.Url('resources.taskstatus', absolute=True)
 }
@@ -4,16 +4,29 @@ Models:
     Tweet: stores Tweets returned by Search API requests.
     SearchField: stores Search Field values passes while performing
         Search API requests.
+    SearchCursor: stores the high-water mark of the searches of each
+        Search Field.
+    DataVersion: stores a version stamp of the data of each resource.
+    TweetActivity: stores the number of tweets of each author per hour.
+    TweetArchive: stores the compressed raw json of archived tweets.
+    SearchRun: stores the Search API requests of each search of an author.
+    IngestCycle: stores each run of the ingest of every Search Field.
 """
 from datetime import datetime
 
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import DDL, Computed, event, text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from nba_ws import db
 
 
 class Tweet(db.Model):
     """Model used to store Tweets from Search API requests.
 
+    The table is range partitioned by tweet_date, one partition per calendar
+    month (see nba_ws.common.partitions), so its primary key and unique
+    constraint include tweet_date. Tweets outside of every monthly partition
+    are stored in a default partition.
+
     Attributes:
         tweet_id: integer, id of tweet as per Twitter.
         author: string, author of tweet.
@@ -22,25 +35,62 @@ class Tweet(db.Model):
         tweet_date: datetime, UTC date of tweet being posted.
         json_data: json, entire Search API response data stored as a json
             column. This column is the raw data of the response.
-        search_params: json, the parameters passed to the Search API request
-            to retrieve the tweet from Twitter.
+        search_run_id: integer, id of the SearchRun the tweet was retrieved
+            by.
+        search_page: integer, index of the parameters of the Search API
+            request which retrieved the tweet in the params of its SearchRun.
+        tweet_tsv: tsvector, generated by Postgres from tweet_text and used
+            for full-text search. Deferred, as it is never returned.
+        archive_id: integer, id of the TweetArchive segment holding the
+            json_data of the tweet once it has been archived, in which case
+            json_data is NULL (see nba_ws.common.archive).
+        txid: integer, id of the Postgres transaction which inserted the
+            tweet, which orders the tweet events in commit order (see
+            nba_ws.resources.events). Deferred, as it is never returned.
     """
     __tablename__ = 'nba-ws-tweet'
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    tweet_id = db.Column(db.BigInteger, unique=True, nullable=False)
+    tweet_id = db.Column(db.BigInteger, nullable=False)
     author = db.Column(db.String())
     author_id = db.Column(db.Integer)
     tweet_text = db.Column(db.String())
-    tweet_date = db.Column(db.DateTime)
+    tweet_date = db.Column(db.DateTime, primary_key=True)
     json_data = db.Column(JSONB)
-    search_params = db.Column(JSONB)
+    search_run_id = db.Column(
+        db.Integer, db.ForeignKey('nba-ws-search_run.id')
+    )
+    search_page = db.Column(db.SmallInteger)
     datetime_added = db.Column(
         db.DateTime(timezone=True), default=datetime.utcnow
     )
+    tweet_tsv = db.deferred(db.Column(
+        TSVECTOR,
+        Computed(
+            "to_tsvector('english', coalesce(tweet_text, ''))", persisted=True
+        )
+    ))
+    archive_id = db.Column(db.Integer)
+    txid = db.deferred(db.Column(
+        db.BigInteger, server_default=text('txid_current()')
+    ))
+    __table_args__ = (
+        db.Index('ix_tweet_author_tweet_id', author, tweet_id.desc()),
+        db.Index('ix_tweet_txid_id', 'txid', 'id'),
+        db.Index('ix_tweet_tweet_tsv', 'tweet_tsv', postgresql_using='gin'),
+        db.Index('ix_tweet_author_tweet_date', author, tweet_date.desc()),
+        db.Index(
+            'ix_tweet_tweet_date_brin', tweet_date, postgresql_using='brin'
+        ),
+        db.UniqueConstraint(
+            tweet_id, tweet_date, name='uq_tweet_tweet_id_tweet_date'
+        ),
+        {'postgresql_partition_by': 'RANGE (tweet_date)'},
+    )
 
     def __init__(
         self, tweet_id, author, author_id,
-        tweet_text, tweet_date, json_data, search_params
+        tweet_text, tweet_date, json_data, search_run_id=None,
+        search_page=None
     ):
         self.tweet_id = tweet_id
         self.author = author
@@ -48,12 +98,22 @@ class Tweet(db.Model):
         self.tweet_text = tweet_text
         self.tweet_date = tweet_date
         self.json_data = json_data
-        self.search_params = search_params
+        self.search_run_id = search_run_id
+        self.search_page = search_page
 
     def __repr__(self):
         return f"<Tweet({self.id}, {self.author}, {self.tweet_id})>"
 
 
+event.listen(
+    Tweet.__table__, 'after_create',
+    DDL(
+        'CREATE TABLE "nba-ws-tweet_default" PARTITION OF "nba-ws-tweet" '
+        'DEFAULT'
+    ).execute_if(dialect='postgresql')
+)
+
+
 class SearchField(db.Model):
     """Model used to store Search Fields.
 
@@ -83,3 +143,245 @@ class SearchField(db.Model):
 
     def __repr__(self):
         return f"<SearchField({self.id}, {self.search_field})>"
+
+
+class SearchCursor(db.Model):
+    """Model used to store the progress of the searches of a Search Field.
+
+    The cursor holds the highest tweet id written for the Search Field, which
+    is passed as the since_id of its next search. It is only advanced with
+    the last tweets of a run (see SearchTweet.write_to_db), so a run which
+    fails part way is searched again from the previous since_id.
+
+    Attributes:
+        __tablename__: string, name of the table.
+        search_field_id: integer, id of the Search Field of the cursor.
+        since_id: integer, highest tweet id written for the Search Field.
+        last_run: datetime, UTC date of the last run of the Search Field.
+        last_page_count: integer, number of Search API requests performed by
+            the last run of the Search Field.
+    """
+    __tablename__ = 'nba-ws-search_cursor'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    search_field_id = db.Column(
+        db.Integer,
+        db.ForeignKey('nba-ws-search_field.id', ondelete='CASCADE'),
+        unique=True,
+        nullable=False
+    )
+    since_id = db.Column(db.BigInteger)
+    last_run = db.Column(db.DateTime(timezone=True))
+    last_page_count = db.Column(db.Integer)
+    search_field = db.relationship(
+        'SearchField',
+        backref=db.backref(
+            'cursor', uselist=False, cascade='all, delete-orphan'
+        )
+    )
+
+    def __init__(self, search_field_id, since_id=None):
+        self.search_field_id = search_field_id
+        self.since_id = since_id
+
+    def __repr__(self):
+        return f"<SearchCursor({self.search_field_id}, {self.since_id})>"
+
+
+class DataVersion(db.Model):
+    """Model used to store a version stamp of the data served by the API.
+
+    The version of a name is bumped in the same transaction as every write to
+    the data it stands for ('tweets' or 'search_fields'), so listings can
+    answer conditional requests from this row alone.
+
+    Attributes:
+        __tablename__: string, name of the table.
+        name: string, name of the versioned data.
+        version: integer, incremented on every write.
+        updated_at: datetime, UTC date of the last write.
+    """
+    __tablename__ = 'nba-ws-data_version'
+    name = db.Column(db.String(), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, name, version=1, updated_at=None):
+        self.name = name
+        self.version = version
+        self.updated_at = updated_at
+
+    def __repr__(self):
+        return f"<DataVersion({self.name}, {self.version})>"
+
+
+class TweetActivity(db.Model):
+    """Model used to store the number of tweets of each author per hour.
+
+    Rows are incremented with the tweets inserted by every write of
+    SearchTweet.write_to_db, in the same transaction, so activity statistics
+    are read from this table without scanning the Tweet model.
+
+    Attributes:
+        __tablename__: string, name of the table.
+        author: string, author of the tweets.
+        bucket: datetime, UTC hour the tweets were posted in.
+        tweet_count: integer, number of tweets of author posted in bucket.
+    """
+    __tablename__ = 'nba-ws-tweet_activity'
+    author = db.Column(db.String(), primary_key=True)
+    bucket = db.Column(db.DateTime, primary_key=True)
+    tweet_count = db.Column(db.Integer, nullable=False, default=0)
+    __table_args__ = (
+        db.Index('ix_tweet_activity_bucket', bucket),
+    )
+
+    def __init__(self, author, bucket, tweet_count=0):
+        self.author = author
+        self.bucket = bucket
+        self.tweet_count = tweet_count
+
+    def __repr__(self):
+        return f"<TweetActivity({self.author}, {self.bucket})>"
+
+
+class TweetArchive(db.Model):
+    """Model used to store the raw json of archived tweets.
+
+    Each row is a segment holding the json_data of up to
+    TWEET_ARCHIVE_SEGMENT_SIZE tweets posted on the same day, serialized as
+    a json object keyed by tweet_id and compressed with zstd. Segments are
+    never modified once written.
+
+    Attributes:
+        __tablename__: string, name of the table.
+        id: integer, id of the segment.
+        day: date, UTC day the tweets of the segment were posted on.
+        tweet_count: integer, number of tweets in the segment.
+        data: bytes, zstd compressed json object of the segment.
+        created_at: datetime, UTC date the segment was written.
+    """
+    __tablename__ = 'nba-ws-tweet_archive'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    tweet_count = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.LargeBinary, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, day, data, tweet_count):
+        self.day = day
+        self.data = data
+        self.tweet_count = tweet_count
+
+    def __repr__(self):
+        return f"<TweetArchive({self.id}, {self.day})>"
+
+
+class SearchRun(db.Model):
+    """Model used to store the Search API requests of a search.
+
+    A row is written by SearchTweet.write_to_db for every search of the new
+    tweets of an author. The parameters of the requests are stored once per
+    run instead of once per tweet, and tweets point to them with their
+    search_run_id and search_page. Along with the IngestCycle model, runs
+    make up the ingest ledger read by the IngestLedgerAPI resource.
+
+    Attributes:
+        __tablename__: string, name of the table.
+        id: integer, id of the run.
+        author: string, author searched.
+        params: json, list of the parameters of each Search API request of
+            the run which returned tweets, in request order.
+        started_at: datetime, UTC date the run started.
+        finished_at: datetime, UTC date every tweet of the run was written,
+            None while the run is in progress.
+        page_count: integer, number of Search API requests of the run.
+        request_seconds: float, time spent waiting on the Search API.
+        cycle_id: integer, id of the IngestCycle of the run, None for runs
+            started outside of an ingest cycle.
+        page_stats: json, list of dicts with the latency in 'seconds', the
+            number of 'statuses' returned and the rate limit 'remaining'
+            after each Search API request of the run, in request order.
+        empty_pages: integer, number of requests which returned no tweets.
+        max_request_seconds: float, latency of the slowest request.
+        rate_limit_remaining: integer, lowest rate limit budget left after
+            a request of the run, None if Twitter didn't report it.
+        tweets_returned: integer, number of tweets returned by the Search
+            API.
+        inserted: integer, number of tweets written to the Tweet model.
+        skipped: integer, number of tweets which were already stored.
+        write_seconds: float, time spent writing tweets to the database.
+    """
+    __tablename__ = 'nba-ws-search_run'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    author = db.Column(db.String(), index=True)
+    params = db.Column(JSONB, nullable=False, default=list)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime)
+    page_count = db.Column(db.Integer, nullable=False, default=0)
+    request_seconds = db.Column(db.Float, nullable=False, default=0)
+    cycle_id = db.Column(
+        db.Integer, db.ForeignKey('nba-ws-ingest_cycle.id'), index=True
+    )
+    page_stats = db.Column(JSONB, nullable=False, default=list)
+    empty_pages = db.Column(db.Integer, nullable=False, default=0)
+    max_request_seconds = db.Column(db.Float, nullable=False, default=0)
+    rate_limit_remaining = db.Column(db.Integer)
+    tweets_returned = db.Column(db.Integer, nullable=False, default=0)
+    inserted = db.Column(db.Integer, nullable=False, default=0)
+    skipped = db.Column(db.Integer, nullable=False, default=0)
+    write_seconds = db.Column(db.Float, nullable=False, default=0)
+
+    def __init__(self, author, started_at=None, cycle_id=None):
+        self.author = author
+        self.params = []
+        self.started_at = started_at or datetime.utcnow()
+        self.page_count = 0
+        self.request_seconds = 0
+        self.cycle_id = cycle_id
+        self.page_stats = []
+        self.empty_pages = 0
+        self.max_request_seconds = 0
+        self.tweets_returned = 0
+        self.inserted = 0
+        self.skipped = 0
+        self.write_seconds = 0
+
+    def __repr__(self):
+        return f"<SearchRun({self.id}, {self.author})>"
+
+
+class IngestCycle(db.Model):
+    """Model used to store each run of the ingest of every Search Field.
+
+    A row is written when get_data_periodic or get_data_async starts, and
+    the SearchRun rows of the authors searched point to it with their
+    cycle_id. finished_at stays None if the cycle didn't complete.
+
+    Attributes:
+        __tablename__: string, name of the table.
+        id: integer, id of the cycle.
+        task_id: string, id of the Celery task of the cycle.
+        trigger: string, 'periodic' for the cycles run by celery beat,
+            'manual' for the cycles started by the SearchTriggerAPI resource.
+        search_field_count: integer, number of Search Fields searched.
+        started_at: datetime, UTC date the cycle started.
+        finished_at: datetime, UTC date the cycle finished.
+        error: string, error the cycle stopped on, None if it succeeded.
+    """
+    __tablename__ = 'nba-ws-ingest_cycle'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    task_id = db.Column(db.String(), index=True)
+    trigger = db.Column(db.String(), nullable=False)
+    search_field_count = db.Column(db.Integer, nullable=False, default=0)
+    started_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+    finished_at = db.Column(db.DateTime)
+    error = db.Column(db.String())
+
+    def __init__(self, trigger, task_id=None, search_field_count=0):
+        self.trigger = trigger
+        self.task_id = task_id
+        self.search_field_count = search_field_count
+        self.started_at = datetime.utcnow()
+
+    def __repr__(self):
+        return f"<IngestCycle({self.id}, {self.trigger})>"
@@ -4,9 +4,16 @@
 from flask import Blueprint
 from flask_restful import Api
 
-from nba_ws.resources.search import SearchTriggerAPI, TaskStatusAPI
+from nba_ws.resources.events import TweetEventsAPI
+from nba_ws.resources.export import TweetExportAPI
+from nba_ws.resources.ledger import IngestLedgerAPI
+from nba_ws.resources.search import (
+    RateLimitAPI, SearchTriggerAPI, TaskStatusAPI
+)
 from nba_ws.resources.search_field import SearchFieldAPI, SearchFieldListAPI
+from nba_ws.resources.stats import TweetStatsAPI
 from nba_ws.resources.tweet import TweetListAPI
+from nba_ws.resources.tweet_search import TweetSearchAPI
 
 base_uri = '/todo/api/v1.0'
 api_bp = Blueprint('resources', __name__)
@@ -18,6 +25,26 @@ api.add_resource(
     f'{base_uri}/tweets',
     endpoint='tweets'
 )
+api.add_resource(
+    TweetSearchAPI,
+    f'{base_uri}/tweets/search',
+    endpoint='tweet_search'
+)
+api.add_resource(
+    TweetEventsAPI,
+    f'{base_uri}/tweets/events',
+    endpoint='tweet_events'
+)
+api.add_resource(
+    TweetExportAPI,
+    f'{base_uri}/tweets/export',
+    endpoint='tweet_export'
+)
+api.add_resource(
+    TweetStatsAPI,
+    f'{base_uri}/tweets/stats',
+    endpoint='tweet_stats'
+)
 api.add_resource(
     SearchFieldListAPI,
     f'{base_uri}/search_field/all',
@@ -38,3 +65,13 @@ api.add_resource(
     f'{base_uri}/search/taskstatus/<task_id>',
     endpoint='taskstatus'
 )
+api.add_resource(
+    RateLimitAPI,
+    f'{base_uri}/search/ratelimit',
+    endpoint='ratelimit'
+)
+api.add_resource(
+    IngestLedgerAPI,
+    f'{base_uri}/search/ledger',
+    endpoint='ingest_ledger'
+)
@@ -0,0 +1,217 @@
+"""Contains API Resource for pushing new Tweets to clients.
+
+This module contains an API class streaming the tweets inserted in the Tweet
+model to clients as Server-Sent Events - TweetEventsAPI
+"""
+import queue
+
+from flask import Response, abort, current_app, request
+from flask_restful import Resource, reqparse
+from sqlalchemy import func, select, tuple_
+
+from nba_ws import db
+from nba_ws.common.notify import get_listener
+from nba_ws.common.util import chunked, dumps
+from nba_ws.models import Tweet
+
+
+def event_id(value):
+    """Parses the id of a tweet event.
+
+    Used as the type of a reqparse argument.
+
+    Args:
+        value: string, id of an event formatted as '<txid>-<id>'.
+
+    Returns:
+        Tuple of integers (txid, id).
+
+    Raises:
+        ValueError: If value is not the id of an event.
+    """
+    txid, sep, id_ = value.partition('-')
+    if not sep or not txid.isdigit() or not id_.isdigit():
+        raise ValueError(f'{value} is not an event id')
+    return int(txid), int(id_)
+
+
+class TweetEventsAPI(Resource):
+    """API to push the tweets inserted in Tweet model as Server-Sent Events.
+
+    HTTP Methods supported: GET.
+
+    Every event holds the tweet_id and author of a batch of new tweets. Its
+    id, '<txid>-<id>', follows the order in which tweets are committed
+    rather than the order of their id: every tweet inserted by a
+    transaction lower than txid, and by txid up to id, was sent before the
+    event. Clients which reconnect with a Last-Event-ID header (or
+    last_event_id parameter) first receive the tweets committed after that
+    id, then new tweets as they are written. Tweets of transactions which
+    were still running are sent again after a reconnect, so clients
+    deduplicate tweets by tweet_id.
+    Notifications come from the TweetListener of the process (see
+    nba_ws.common.notify), so connected clients don't query the database.
+
+    Attributes:
+        reqparse: instance of the reqparse.RequestParser class used to validate
+            data parameters passed in the request.
+    """
+
+    def __init__(self):
+        """Creates attributes and runs Resource class constructor.
+
+        Argument(s) added to the reqparse:
+            author, last_event_id
+        """
+        self.reqparse = reqparse.RequestParser()
+        # EventSource can't send a body, so authors are query parameters
+        self.reqparse.add_argument(
+            'author',
+            type=str,
+            action='append',
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'last_event_id',
+            type=event_id,
+            location='args'
+        )
+        super(TweetEventsAPI, self).__init__()
+
+    def get(self):
+        """Streams new tweets as Server-Sent Events.
+
+        The request takes the following parameters:
+            author: author of the tweets to stream, can be repeated.
+            last_event_id: id of the last event received, overridden by the
+                Last-Event-ID header.
+
+        Returns:
+            A streamed text/event-stream Response. A comment is sent every
+            SSE_KEEPALIVE seconds without events. The stream ends when the
+            client falls more than SSE_QUEUE_SIZE events behind, or after a
+            backlog of SSE_BACKLOG_LIMIT tweets, so that it reconnects and
+            resumes from its Last-Event-ID.
+
+        Raises:
+            HTTPError: If the Last-Event-ID is not the id of an event.
+        """
+        args = self.reqparse.parse_args()
+        last_event_id = args['last_event_id']
+        if 'Last-Event-ID' in request.headers:
+            try:
+                last_event_id = event_id(request.headers['Last-Event-ID'])
+            except ValueError as error:
+                abort(400, description=str(error))
+        config = current_app.config
+        keepalive = config['SSE_KEEPALIVE']
+        listener = get_listener()
+        subscription = listener.subscribe(
+            args['author'], config['SSE_QUEUE_SIZE']
+        )
+        # subscribe first, so no tweet is lost between backlog and stream
+        backlog, xmin, limit = [], None, config['SSE_BACKLOG_LIMIT']
+        if last_event_id is not None:
+            try:
+                xmin, backlog = self.backlog(
+                    last_event_id, args['author'], limit
+                )
+            except Exception:
+                listener.unsubscribe(subscription)
+                raise
+
+        def generate():
+            cursor = last_event_id or (0, 0)
+            seen = {tweet['tweet_id'] for tweet in backlog}
+            try:
+                for tweets in chunked(backlog, config['SSE_EVENT_SIZE']):
+                    # tweets of transactions which were still running when
+                    # the backlog was read may be followed by earlier ones
+                    cursor = min(
+                        (tweets[-1]['txid'], tweets[-1]['id']), (xmin, 0)
+                    )
+                    yield self.event(cursor, tweets)
+                # tweets past a truncated backlog aren't notified anymore,
+                # the client fetches them by reconnecting
+                if len(backlog) >= limit:
+                    return
+                while not subscription.overflowed:
+                    try:
+                        notify_xmin, tweets = subscription.get(
+                            timeout=keepalive
+                        )
+                    except queue.Empty:
+                        yield b': keepalive\n\n'
+                        continue
+                    cursor = max(cursor, (notify_xmin, 0))
+                    if seen:
+                        tweets = [
+                            tweet for tweet in tweets
+                            if tweet['tweet_id'] not in seen
+                        ]
+                        if not tweets:
+                            continue
+                    yield self.event(cursor, tweets)
+            finally:
+                listener.unsubscribe(subscription)
+
+        return Response(
+            generate(),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
+
+    @staticmethod
+    def backlog(last_event_id, authors, limit):
+        """Returns the tweets committed after last_event_id.
+
+        Args:
+            last_event_id: tuple (txid, id), id of the last event received.
+            authors: list of authors to return tweets of, or None for all.
+            limit: integer, maximum number of tweets returned.
+
+        Returns:
+            Tuple of the xmin of a snapshot taken before the tweets were read,
+            below which every transaction had finished, and the list of
+            dictionaries with 'txid', 'id', 'tweet_id' and 'author' keys of
+            the tweets, ordered by txid and id.
+        """
+        xmin = db.session.execute(select([
+            func.txid_snapshot_xmin(func.txid_current_snapshot())
+        ])).scalar()
+        query = Tweet.query.with_entities(
+            Tweet.txid, Tweet.id, Tweet.tweet_id, Tweet.author
+        ).filter(tuple_(Tweet.txid, Tweet.id) > tuple_(*last_event_id))
+        if authors:
+            query = query.filter(Tweet.author.in_(authors))
+        rows = query.order_by(
+            Tweet.txid.asc(), Tweet.id.asc()
+        ).limit(limit).all()
+        return xmin, [
+            {
+                'txid': row.txid, 'id': row.id, 'tweet_id': row.tweet_id,
+                'author': row.author
+            } for row in rows
+        ]
+
+    @staticmethod
+    def event(cursor, tweets):
+        """Formats tweets as a Server-Sent Event.
+
+        Args:
+            cursor: tuple (txid, id) of the event id.
+            tweets: list of dictionaries with 'tweet_id' and 'author' keys.
+
+        Returns:
+            bytes, event with the id cursor whose data holds the 'tweet_id'
+            and 'author' of tweets.
+        """
+        id_ = '-'.join(str(part) for part in cursor)
+        data = [
+            {'tweet_id': tweet['tweet_id'], 'author': tweet['author']}
+            for tweet in tweets
+        ]
+        return (
+            f'id: {id_}\nevent: tweets\ndata: '.encode('utf-8')
+            + dumps({'tweets': data}) + b'\n\n'
+        )
@@ -0,0 +1,167 @@
+"""Contains API Resource for exporting Tweets in database.
+
+This module contains an API class for exporting the tweets stored in the Tweet
+model as newline delimited json - TweetExportAPI
+"""
+import zlib
+
+from flask import Response, current_app, stream_with_context
+from flask_restful import Resource, inputs, reqparse
+from sqlalchemy.orm import load_only
+
+from nba_ws.common.replica import read_replica
+from nba_ws.common.util import (
+    clean_tweet, dumps, tweet_columns, tweet_fields, tweet_fieldsets,
+    utc_datetime
+)
+from nba_ws.models import Tweet
+
+
+class TweetExportAPI(Resource):
+    """API to export Tweets stored in Tweet model.
+
+    HTTP Methods supported: GET.
+
+    Tweets are streamed oldest first as newline delimited json (one tweet per
+    line) from a server-side cursor, so an export of the whole table runs in
+    constant memory. A client that gets disconnected resumes the export by
+    passing the tweet_id of the last line it received as after_id.
+    Exports read from the read replica when one is configured, so they
+    don't compete with the ingest for the primary.
+
+    Attributes:
+        reqparse: instance of the reqparse.RequestParser class used to validate
+            data parameters passed in the request.
+    """
+    method_decorators = {'get': [read_replica]}
+
+    def __init__(self):
+        """Creates attributes and runs Resource class constructor.
+
+        Argument(s) added to the reqparse:
+            author, after_id, since, until, fields, gzip
+        """
+        self.reqparse = reqparse.RequestParser()
+        self.reqparse.add_argument(
+            'author',
+            type=list,
+            location='json'
+        )
+        self.reqparse.add_argument(
+            'after_id',
+            type=int,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'since',
+            type=utc_datetime,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'until',
+            type=utc_datetime,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'fields',
+            type=tweet_fields,
+            default=tweet_fieldsets['full'],
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'gzip',
+            type=inputs.boolean,
+            default=False,
+            location='args'
+        )
+        super(TweetExportAPI, self).__init__()
+
+    def get(self):
+        """Streams the tweets stored in Tweet model as newline delimited json.
+
+        If any parameters are passed to the request, the tweets are filtered
+        accordingly:
+            author: list of authors of the tweets to export.
+            after_id: only tweets with a tweet_id higher than after_id.
+            since: ISO 8601 date, only tweets posted at or after since.
+            until: ISO 8601 date, only tweets posted before until.
+            fields: comma separated columns of the tweets to export, or the
+                name of a fieldset of tweet_fieldsets (see
+                nba_ws.common.util). Defaults to 'full'. tweet_id is always
+                exported so that the export can be resumed.
+            gzip: compress the response body with gzip. Defaults to false.
+
+        Returns:
+            A streamed Response with one json serialized tweet per line,
+            ordered by tweet_id. Tweets are formatted according to the
+            clean_tweet object (see clean_tweet from nba_ws.common.util).
+
+        Raises:
+            HTTPError: If fields names an unknown column.
+        """
+        args = self.reqparse.parse_args()
+        fields = args['fields']
+        if 'tweet_id' not in fields:
+            fields = ('tweet_id',) + fields
+        query = Tweet.query.options(load_only(*tweet_columns(fields)))
+        if args['author']:
+            query = query.filter(Tweet.author.in_(args['author']))
+        if args['since'] is not None:
+            query = query.filter(Tweet.tweet_date >= args['since'])
+        if args['until'] is not None:
+            query = query.filter(Tweet.tweet_date < args['until'])
+        if args['after_id'] is not None:
+            query = query.filter(Tweet.tweet_id > args['after_id'])
+
+        chunk_size = current_app.config['TWEETS_EXPORT_CHUNK_SIZE']
+        tweets = query.order_by(Tweet.tweet_id.asc()).execution_options(
+            stream_results=True
+        ).yield_per(chunk_size)
+        body = self.lines(tweets, fields, chunk_size)
+        response = Response(
+            stream_with_context(
+                self.compress(body) if args['gzip'] else body
+            ),
+            mimetype='application/x-ndjson'
+        )
+        if args['gzip']:
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+    @staticmethod
+    def lines(tweets, fields, chunk_size):
+        """Serializes tweets to newline delimited json, chunk_size at a time.
+
+        Args:
+            tweets: iterable of rows of the Tweet model.
+            fields: tuple, columns of the tweets to export.
+            chunk_size: int, number of tweets per yielded chunk.
+
+        Yields:
+            bytes, json serialized tweets each followed by a newline.
+        """
+        chunk = []
+        for tweet in tweets:
+            chunk.append(dumps(clean_tweet(tweet, fields)))
+            if len(chunk) == chunk_size:
+                yield b'\n'.join(chunk) + b'\n'
+                chunk = []
+        if chunk:
+            yield b'\n'.join(chunk) + b'\n'
+
+    @staticmethod
+    def compress(chunks):
+        """Compresses chunks into a single gzip stream.
+
+        Args:
+            chunks: iterable of bytes.
+
+        Yields:
+            bytes, gzip compressed data.
+        """
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
@@ -0,0 +1,177 @@
+"""Contains API Resource for the ingest ledger.
+
+This module contains an API class for reading rollups of the SearchRun and
+IngestCycle models, which record every search of the ingest tasks -
+IngestLedgerAPI
+"""
+from flask import abort
+from flask_restful import Resource, reqparse
+from sqlalchemy import func
+
+from nba_ws import db
+from nba_ws.common.replica import read_replica
+from nba_ws.common.util import json_response, utc_datetime
+from nba_ws.models import IngestCycle, SearchRun
+
+
+class IngestLedgerAPI(Resource):
+    """API to read rollups of the searches of the ingest tasks.
+
+    HTTP Methods supported: GET.
+
+    Searches are rolled up per author (to spot slow authors and wasted empty
+    pages), per ingest cycle or per day (to spot throughput regressions).
+    Reads go to the read replica when one is configured.
+
+    Attributes:
+        reqparse: instance of the reqparse.RequestParser class used to validate
+            data parameters passed in the request.
+    """
+    method_decorators = {'get': [read_replica]}
+
+    def __init__(self):
+        """Creates attributes and runs Resource class constructor.
+
+        Argument(s) added to the reqparse:
+            author, group_by, order_by, since, until
+        """
+        self.reqparse = reqparse.RequestParser()
+        self.reqparse.add_argument(
+            'author',
+            type=list,
+            location='json'
+        )
+        self.reqparse.add_argument(
+            'group_by',
+            type=str,
+            default='author',
+            choices=('author', 'cycle', 'day'),
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'order_by',
+            type=str,
+            default='group',
+            choices=(
+                'group', 'avg_request_seconds', 'max_request_seconds',
+                'write_seconds', 'empty_pages'
+            ),
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'since',
+            type=utc_datetime,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'until',
+            type=utc_datetime,
+            location='args'
+        )
+        super(IngestLedgerAPI, self).__init__()
+
+    def get(self):
+        """Returns rollups of the searches of the ingest tasks.
+
+        The request takes the following parameters:
+            author: list of authors to return rollups for.
+            group_by: one of author (default), cycle or day.
+            order_by: group (default) to order by the group_by columns, or
+                one of avg_request_seconds, max_request_seconds,
+                write_seconds or empty_pages to list the highest first.
+            since: ISO 8601 date, only searches started at or after since.
+            until: ISO 8601 date, only searches started before until.
+
+        Returns:
+            A json serialized dictionary containing a key 'ledger' mapped to
+            a list of dictionaries with the group_by columns ('author';
+            'cycle_id', 'task_id', 'trigger', 'search_field_count',
+            'started_at', 'finished_at' and 'error' of the cycle; or 'day')
+            and the number of 'runs', 'pages', 'empty_pages',
+            'tweets_returned', 'inserted' and 'skipped' tweets, the total
+            'request_seconds', 'avg_request_seconds' and
+            'max_request_seconds' of the Search API requests, the
+            'write_seconds', the lowest 'rate_limit_remaining' and the
+            'tweets_per_second' inserted.
+
+        Raises:
+            HTTPError: If no searches match the parameters.
+        """
+        args = self.reqparse.parse_args()
+        if args['group_by'] == 'author':
+            keys = [SearchRun.author]
+        elif args['group_by'] == 'day':
+            keys = [func.date_trunc('day', SearchRun.started_at).label('day')]
+        else:
+            keys = [
+                IngestCycle.id.label('cycle_id'), IngestCycle.task_id,
+                IngestCycle.trigger, IngestCycle.search_field_count,
+                IngestCycle.started_at, IngestCycle.finished_at,
+                IngestCycle.error
+            ]
+        metrics = {
+            'runs': func.count(SearchRun.id),
+            'pages': func.sum(SearchRun.page_count),
+            'empty_pages': func.sum(SearchRun.empty_pages),
+            'tweets_returned': func.sum(SearchRun.tweets_returned),
+            'inserted': func.sum(SearchRun.inserted),
+            'skipped': func.sum(SearchRun.skipped),
+            'request_seconds': func.sum(SearchRun.request_seconds),
+            'avg_request_seconds': (
+                func.sum(SearchRun.request_seconds) /
+                func.nullif(func.sum(SearchRun.page_count), 0)
+            ),
+            'max_request_seconds': func.max(SearchRun.max_request_seconds),
+            'write_seconds': func.sum(SearchRun.write_seconds),
+            'rate_limit_remaining': func.min(SearchRun.rate_limit_remaining)
+        }
+        query = db.session.query(*keys, *(
+            metric.label(name) for name, metric in metrics.items()
+        ))
+        if args['group_by'] == 'cycle':
+            query = query.join(
+                IngestCycle, SearchRun.cycle_id == IngestCycle.id
+            )
+        if args['author']:
+            query = query.filter(SearchRun.author.in_(args['author']))
+        if args['since'] is not None:
+            query = query.filter(SearchRun.started_at >= args['since'])
+        if args['until'] is not None:
+            query = query.filter(SearchRun.started_at < args['until'])
+        query = query.group_by(*keys)
+        if args['order_by'] == 'group':
+            query = query.order_by(*keys)
+        else:
+            query = query.order_by(
+                metrics[args['order_by']].desc().nullslast(), *keys
+            )
+        rows = query.all()
+        if not rows:
+            abort(404, description='Not found')
+        return json_response({'ledger': [self.rollup(row) for row in rows]})
+
+    @staticmethod
+    def rollup(row):
+        """Formats a row of the ledger query.
+
+        Args:
+            row: keyed tuple of the group_by columns and the metrics of the
+                group.
+
+        Returns:
+            Dictionary of the columns of row, with the sums as integers or
+            seconds rounded to the millisecond, and the 'tweets_per_second'
+            inserted over the time spent requesting and writing tweets.
+        """
+        rollup = row._asdict()
+        for name in ('pages', 'empty_pages', 'tweets_returned', 'inserted',
+                     'skipped'):
+            rollup[name] = int(rollup[name] or 0)
+        for name in ('request_seconds', 'avg_request_seconds',
+                     'max_request_seconds', 'write_seconds'):
+            rollup[name] = round(rollup[name] or 0, 3)
+        elapsed = rollup['request_seconds'] + rollup['write_seconds']
+        rollup['tweets_per_second'] = (
+            round(rollup['inserted'] / elapsed, 1) if elapsed else None
+        )
+        return rollup
@@ -1,14 +1,17 @@
 """Contains API Resources used to search Twitter for NBA news.
 
-This module contains 2 Resource classes which are used for searching Twitter:
+This module contains 3 Resource classes which are used for searching Twitter:
     SearchTriggerAPI
     TaskStatusAPI
+    RateLimitAPI
 """
 from flask import abort, jsonify
 from flask_restful import Resource, marshal, reqparse
 
-from nba_ws.common.util import TwitterOAuth2, status_format
-from nba_ws.tasks import get_data_async
+from nba_ws import celery
+from nba_ws.common.ratelimit import get_rate_limiter
+from nba_ws.common.util import status_format
+from nba_ws.tasks import get_data_async, ingest_progress
 
 
 class SearchTriggerAPI(Resource):
@@ -31,15 +34,17 @@ class SearchTriggerAPI(Resource):
         super(SearchTriggerAPI, self).__init__()
 
     def get(self):
-        """Triggers the get_data_async celery task and returns task details.
+        """Starts the get_data_async chord and returns task details.
+
+        The task_id returned is the id of the summarize_ingest callback task
+        of the chord, which finishes once all the tweets have been written.
 
         Returns:
             A dictionary containing data about a task as specified by
             status_format (See nba_ws.common.util for status_format),
             which is serialized to json and returned.
         """
-        bearer_token = TwitterOAuth2().bearer_token
-        result = get_data_async.delay(bearer_token)
+        result = get_data_async()
         task = {
             'task_id': result.id
         }
@@ -49,7 +54,7 @@ class SearchTriggerAPI(Resource):
 
 
 class TaskStatusAPI(Resource):
-    """This API is used to monitor the status of the triggered get_async_data task.
+    """This API is used to monitor the status of the get_data_async chord.
 
     HTTP Methods supported: GET.
     """
@@ -68,20 +73,42 @@ class TaskStatusAPI(Resource):
         Returns:
             A dictionary containing data on the task_id, state and ready status
             (and result, if the task is successful) which is serialised into
-            json and returned.
+            json and returned. For a task started by SearchTriggerAPI, the
+            'progress' key holds the state and counts written so far of the
+            task of each Search Field (see ingest_progress from
+            nba_ws.tasks).
         """
-        task = get_data_async.AsyncResult(task_id)
+        task = celery.AsyncResult(task_id)
+        response = {
+            'task_id': task_id,
+            'state': task.state,
+            'ready': task.ready()
+        }
         if task.state == 'SUCCESS':
-            response = {
-                'task_id': task_id,
-                'state': task.state,
-                'ready': task.ready(),
-                'result': task.result
-            }
-        else:
-            response = {
-                'task_id': task_id,
-                'state': task.state,
-                'ready': task.ready()
-            }
+            response['result'] = task.result
+        progress = ingest_progress(task_id)
+        if progress is not None:
+            response['progress'] = progress
         return jsonify(response)
+
+
+class RateLimitAPI(Resource):
+    """This API is used to monitor the Twitter API rate limit budget.
+
+    HTTP Methods supported: GET.
+    """
+    def __init__(self):
+        """Inits Resource class constructor
+        """
+        super(RateLimitAPI, self).__init__()
+
+    def get(self):
+        """Returns the rate limit budget shared by the search tasks.
+
+        Returns:
+            A dictionary containing a key 'rate_limits' mapped to the
+            Twitter API endpoints seen so far, each mapped to the 'limit',
+            'remaining' and 'reset' (epoch seconds) of its current window,
+            which is serialised into json and returned.
+        """
+        return jsonify({'rate_limits': get_rate_limiter().snapshot()})
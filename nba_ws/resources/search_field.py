@@ -13,6 +13,8 @@ from flask import abort, jsonify
 from flask_restful import Resource, marshal, reqparse
 
 from nba_ws import db
+from nba_ws.common.cache import bump_version, conditional
+from nba_ws.common.replica import read_replica
 from nba_ws.common.util import clean_search_field, sf_format
 from nba_ws.models import SearchField
 
@@ -22,10 +24,15 @@ class SearchFieldAPI(Resource):
 
     HTTP Methods supported: GET, PUT, DELETE.
 
+    GET requests read from the read replica when one is configured (see
+    read_replica from nba_ws.common.replica).
+
     Attributes:
         reqparse: instance of the reqparse.RequestParser class used to validate
             data parameters passed in the request.
     """
+    method_decorators = {'get': [read_replica]}
+
     def __init__(self):
         """Creates attributes and inits Resource class constructor.
 
@@ -88,6 +95,7 @@ class SearchFieldAPI(Resource):
         search_field.search_field = json.dumps(args['search_field'])
         search_field.author = args['search_field']['q']['author']
         db.session.add(search_field)
+        bump_version('search_fields')
         db.session.commit()
         return 200
 
@@ -107,6 +115,7 @@ class SearchFieldAPI(Resource):
         if not search_field:
             abort(404, description='Not found')
         db.session.delete(search_field)
+        bump_version('search_fields')
         db.session.commit()
         return 200
 
@@ -116,10 +125,18 @@ class SearchFieldListAPI(Resource):
 
     HTTP Methods supported: GET, POST.
 
+    GET requests support conditional requests through the ETag and
+    Last-Modified headers (see conditional from nba_ws.common.cache), and
+    read from the read replica when one is configured.
+
     Attributes:
         reqparse: instance of the reqparse.RequestParser class used to validate
             data parameters passed in the request.
     """
+    method_decorators = {
+        'get': [conditional('search_fields'), read_replica]
+    }
+
     def __init__(self):
         """Creates attributes and runs Resource class constructor.
 
@@ -167,6 +184,7 @@ class SearchFieldListAPI(Resource):
         sf = args['search_field']
         search_field = SearchField(json.dumps(sf), sf['q']['author'])
         db.session.add(search_field)
+        bump_version('search_fields')
         db.session.commit()
         resp = {}
         resp['search_field'] = json.dumps(sf)
@@ -0,0 +1,120 @@
+"""Contains API Resource for tweet activity statistics.
+
+This module contains an API class for reading the number of tweets posted by
+each author per time bucket from the TweetActivity model - TweetStatsAPI
+"""
+from flask import abort
+from flask_restful import Resource, reqparse
+from sqlalchemy import func
+
+from nba_ws import db
+from nba_ws.common.cache import conditional
+from nba_ws.common.replica import read_replica
+from nba_ws.common.util import json_response, utc_datetime
+from nba_ws.models import TweetActivity
+
+
+class TweetStatsAPI(Resource):
+    """API to read the number of tweets per author and time bucket.
+
+    HTTP Methods supported: GET.
+
+    Statistics are read from the TweetActivity model, which holds one row per
+    author and hour, so the cost of a request depends on the number of
+    buckets returned and not on the number of tweets. Reads go to the read
+    replica when one is configured.
+
+    Attributes:
+        reqparse: instance of the reqparse.RequestParser class used to validate
+            data parameters passed in the request.
+    """
+    method_decorators = {'get': [conditional('tweets'), read_replica]}
+
+    def __init__(self):
+        """Creates attributes and runs Resource class constructor.
+
+        Argument(s) added to the reqparse:
+            author, bucket, since, until
+        """
+        self.reqparse = reqparse.RequestParser()
+        self.reqparse.add_argument(
+            'author',
+            type=list,
+            location='json'
+        )
+        self.reqparse.add_argument(
+            'bucket',
+            type=str,
+            default='hour',
+            choices=('hour', 'day', 'week', 'month'),
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'since',
+            type=utc_datetime,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'until',
+            type=utc_datetime,
+            location='args'
+        )
+        super(TweetStatsAPI, self).__init__()
+
+    def get(self):
+        """Returns the number of tweets of each author per time bucket.
+
+        The request takes the following parameters:
+            author: list of authors to return statistics for.
+            bucket: size of the time buckets, one of hour (default), day,
+                week or month.
+            since: ISO 8601 date, only buckets starting at or after since.
+                It is rounded down to the start of its bucket, so the bucket
+                containing since is returned whole.
+            until: ISO 8601 date, only buckets starting before until. It is
+                rounded down to the start of its bucket too, so the bucket
+                containing until is left out.
+
+        Returns:
+            A json serialized dictionary containing a key 'stats' mapped to a
+            list of dictionaries with the 'author', the 'bucket' start date
+            and the 'tweet_count', ordered by bucket and author.
+
+        Raises:
+            HTTPError: If no statistics match the parameters.
+        """
+        args = self.reqparse.parse_args()
+        bucket = func.date_trunc(args['bucket'], TweetActivity.bucket)
+        query = db.session.query(
+            TweetActivity.author, bucket.label('bucket'),
+            func.sum(TweetActivity.tweet_count).label('tweet_count')
+        )
+        if args['author']:
+            query = query.filter(TweetActivity.author.in_(args['author']))
+        # hourly rows are filtered from the start of the bucket of since and
+        # until, so that the first bucket is not cut short
+        if args['since'] is not None:
+            query = query.filter(
+                TweetActivity.bucket >= func.date_trunc(
+                    args['bucket'], args['since']
+                )
+            )
+        if args['until'] is not None:
+            query = query.filter(
+                TweetActivity.bucket < func.date_trunc(
+                    args['bucket'], args['until']
+                )
+            )
+        rows = query.group_by(
+            TweetActivity.author, bucket
+        ).order_by(bucket, TweetActivity.author).all()
+        if not rows:
+            abort(404, description='Not found')
+        stats = [
+            {
+                'author': row.author,
+                'bucket': row.bucket,
+                'tweet_count': int(row.tweet_count)
+            } for row in rows
+        ]
+        return json_response({'stats': stats})
@@ -3,10 +3,18 @@
 This module contains an API class for listing tweets stored in the Tweet model
 in the database - TweetListAPI
 """
-from flask import abort, jsonify
-from flask_restful import Resource, reqparse
+from flask import (
+    Response, abort, current_app, request, stream_with_context, url_for
+)
+from flask_restful import Resource, inputs, reqparse
+from sqlalchemy.orm import load_only
 
-from nba_ws.common.util import clean_tweet
+from nba_ws.common.cache import conditional
+from nba_ws.common.replica import read_replica
+from nba_ws.common.util import (
+    clean_tweet, dumps, json_response, tweet_columns, tweet_fields,
+    tweet_fieldsets, utc_datetime
+)
 from nba_ws.models import Tweet
 
 
@@ -15,15 +23,28 @@ class TweetListAPI(Resource):
 
     HTTP Methods supported: GET.
 
+    Tweets are paginated with a cursor on tweet_id (keyset pagination), so
+    every page is an index range scan regardless of how deep the client has
+    paged. Passing stream=true instead streams every matching tweet in chunks.
+    The since and until filters compare tweet_date, the partition key of the
+    tweet table, to constants, so Postgres only scans the partitions of the
+    months they cover.
+    Conditional requests are supported through the ETag and Last-Modified
+    headers (see conditional from nba_ws.common.cache). Reads go to the read
+    replica when one is configured (see read_replica from
+    nba_ws.common.replica).
+
     Attributes:
         reqparse: instance of the reqparse.RequestParser class used to validate
             data parameters passed in the request.
     """
+    method_decorators = {'get': [conditional('tweets'), read_replica]}
+
     def __init__(self):
         """Creates attributes and runs Resource class constructor.
 
         Argument(s) added to the reqparse:
-            author
+            author, limit, before_id, after_id, stream, fields, since, until
         """
         self.reqparse = reqparse.RequestParser()
         self.reqparse.add_argument(
@@ -31,13 +52,71 @@ class TweetListAPI(Resource):
             type=list,
             location='json'
         )
+        # the next/prev links carry the authors as query arguments
+        self.reqparse.add_argument(
+            'author',
+            dest='author_args',
+            type=str,
+            action='append',
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'limit',
+            type=inputs.positive,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'before_id',
+            type=int,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'after_id',
+            type=int,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'stream',
+            type=inputs.boolean,
+            default=False,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'fields',
+            type=tweet_fields,
+            default=tweet_fieldsets['summary'],
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'since',
+            type=utc_datetime,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'until',
+            type=utc_datetime,
+            location='args'
+        )
         super(TweetListAPI, self).__init__()
 
     def get(self):
         """Returns tweets stored in Tweet model.
 
         If any parameters are passed to the request, the tweets are filtered
-        accordingly. If no parameters are passed, then all tweets are fetched.
+        accordingly. Tweets are returned newest first, one page at a time:
+            author: list of authors of the tweets, in the json body, or
+                repeated author query arguments.
+            before_id: only tweets with a tweet_id lower than before_id.
+            after_id: only tweets with a tweet_id higher than after_id.
+            limit: maximum number of tweets in the page.
+            since: ISO 8601 date, only tweets posted at or after since.
+            until: ISO 8601 date, only tweets posted before until.
+            fields: comma separated columns of the tweets to return, or the
+                name of a fieldset of tweet_fieldsets (see
+                nba_ws.common.util). Defaults to 'summary'.
+        Only the requested columns are loaded from the database.
+        The 'links' key of the response holds the URIs of the next (older)
+        and previous (newer) pages, when they exist.
 
         Returns:
             A json serialized dictionary containing a key 'tweets' mapped to
@@ -46,17 +125,134 @@ class TweetListAPI(Resource):
             (see clean_tweet from nba_ws.common.util for more details).
 
         Raises:
-            HTTPError: If no tweets are returned by query.
+            HTTPError: If fields names an unknown column or if no tweets are
+                returned by query.
         """
         args = self.reqparse.parse_args()
-        author = args['author']
-        if author:
-            tweets = Tweet.query.filter(
-                Tweet.author.in_(author)
-            ).order_by(Tweet.tweet_id.desc()).all()
+        args['author'] = args['author'] or args['author_args']
+        fields = args['fields']
+        query = self.filter_query(Tweet.query, args).options(
+            load_only(*tweet_columns(fields))
+        )
+        if args['stream']:
+            return self.stream(query, fields)
+
+        limit = min(
+            args['limit'] or current_app.config['TWEETS_PER_PAGE'],
+            current_app.config['TWEETS_MAX_PER_PAGE']
+        )
+        if args['after_id'] is not None and args['before_id'] is None:
+            # walk towards newer tweets, then flip the page back to desc
+            tweets = query.order_by(
+                Tweet.tweet_id.asc()
+            ).limit(limit + 1).all()
+            has_more_newer = len(tweets) > limit
+            tweets = tweets[:limit][::-1]
+            has_more_older = bool(tweets) and self.has_older(
+                args, tweets[-1].tweet_id
+            )
         else:
-            tweets = Tweet.query.order_by(Tweet.tweet_id.desc()).all()
+            tweets = query.order_by(
+                Tweet.tweet_id.desc()
+            ).limit(limit + 1).all()
+            has_more_older = len(tweets) > limit
+            tweets = tweets[:limit]
+            has_more_newer = args['before_id'] is not None
         if not tweets:
             abort(404, description='Not found')
-        formatted_tweets = [clean_tweet(tweet) for tweet in tweets]
-        return jsonify({'tweets': formatted_tweets})
+
+        links = {}
+        filters = {
+            key: request.args[key] for key in ('fields', 'since', 'until')
+            if key in request.args
+        }
+        if args['author']:
+            filters['author'] = args['author']
+        if has_more_older:
+            links['next'] = url_for(
+                'resources.tweets', before_id=tweets[-1].tweet_id,
+                limit=limit, _external=True, **filters
+            )
+        if has_more_newer:
+            links['prev'] = url_for(
+                'resources.tweets', after_id=tweets[0].tweet_id,
+                limit=limit, _external=True, **filters
+            )
+        formatted_tweets = [clean_tweet(tweet, fields) for tweet in tweets]
+        return json_response({'tweets': formatted_tweets, 'links': links})
+
+    def filter_query(self, query, args):
+        """Applies the author, date and cursor filters passed in the request.
+
+        Args:
+            query: Query object of the Tweet model.
+            args: dict, parsed arguments of the request.
+
+        Returns:
+            Filtered Query object.
+        """
+        if args['author']:
+            query = query.filter(Tweet.author.in_(args['author']))
+        if args['since'] is not None:
+            query = query.filter(Tweet.tweet_date >= args['since'])
+        if args['until'] is not None:
+            query = query.filter(Tweet.tweet_date < args['until'])
+        if args['before_id'] is not None:
+            query = query.filter(Tweet.tweet_id < args['before_id'])
+        if args['after_id'] is not None:
+            query = query.filter(Tweet.tweet_id > args['after_id'])
+        return query
+
+    def has_older(self, args, tweet_id):
+        """Checks whether tweets older than tweet_id match the request.
+
+        Args:
+            args: dict, parsed arguments of the request.
+            tweet_id: integer, tweet_id of the oldest tweet of the page.
+
+        Returns:
+            True if a next (older) page exists.
+        """
+        args = dict(args, before_id=tweet_id, after_id=None)
+        older = self.filter_query(Tweet.query, args).with_entities(
+            Tweet.tweet_id
+        )
+        return bool(older.limit(1).all())
+
+    def stream(self, query, fields):
+        """Streams every tweet matched by query as a json document.
+
+        Rows are fetched from a server-side cursor and serialized in chunks of
+        TWEETS_STREAM_CHUNK_SIZE, so the memory used by the worker does not
+        grow with the number of tweets returned.
+
+        Args:
+            query: filtered Query object of the Tweet model.
+            fields: tuple, columns of the tweets to return.
+
+        Returns:
+            A streamed Response whose body has the same shape as the paginated
+            response, without the 'links' key.
+        """
+        chunk_size = current_app.config['TWEETS_STREAM_CHUNK_SIZE']
+        tweets = query.order_by(Tweet.tweet_id.desc()).execution_options(
+            stream_results=True
+        ).yield_per(chunk_size)
+
+        def generate():
+            yield b'{"tweets": ['
+            chunk = []
+            separator = b''
+            for tweet in tweets:
+                chunk.append(dumps(clean_tweet(tweet, fields)))
+                if len(chunk) == chunk_size:
+                    yield separator + b','.join(chunk)
+                    separator = b','
+                    chunk = []
+            if chunk:
+                yield separator + b','.join(chunk)
+            yield b']}'
+
+        return Response(
+            stream_with_context(generate()), mimetype='application/json'
+        )
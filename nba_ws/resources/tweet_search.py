@@ -0,0 +1,146 @@
+"""Contains API Resource for full-text search over Tweets in database.
+
+This module contains an API class for searching the text of the tweets stored
+in the Tweet model - TweetSearchAPI
+"""
+from flask import abort, current_app, request, url_for
+from flask_restful import Resource, inputs, reqparse
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
+
+from nba_ws import db
+from nba_ws.common.cache import conditional
+from nba_ws.common.replica import read_replica
+from nba_ws.common.util import (
+    clean_tweet, json_response, tweet_columns, tweet_fields,
+    tweet_fieldsets
+)
+from nba_ws.models import Tweet
+
+
+class TweetSearchAPI(Resource):
+    """API to search the text of Tweets stored in Tweet model.
+
+    HTTP Methods supported: GET.
+
+    Queries are matched against the tweet_tsv column of the Tweet model
+    through its GIN index, and matching tweets are ranked by relevance.
+    Reads go to the read replica when one is configured.
+
+    Attributes:
+        reqparse: instance of the reqparse.RequestParser class used to validate
+            data parameters passed in the request.
+    """
+    method_decorators = {'get': [conditional('tweets'), read_replica]}
+
+    def __init__(self):
+        """Creates attributes and runs Resource class constructor.
+
+        Argument(s) added to the reqparse:
+            q, author, page, limit, fields
+        """
+        self.reqparse = reqparse.RequestParser()
+        self.reqparse.add_argument(
+            'q',
+            type=str,
+            required=True,
+            location='args',
+            help='\'q\' is a necessary parameter'
+        )
+        self.reqparse.add_argument(
+            'author',
+            type=list,
+            location='json'
+        )
+        # the next link carries the authors as query arguments
+        self.reqparse.add_argument(
+            'author',
+            dest='author_args',
+            type=str,
+            action='append',
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'page',
+            type=inputs.positive,
+            default=1,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'limit',
+            type=inputs.positive,
+            location='args'
+        )
+        self.reqparse.add_argument(
+            'fields',
+            type=tweet_fields,
+            default=tweet_fieldsets['summary'],
+            location='args'
+        )
+        super(TweetSearchAPI, self).__init__()
+
+    def get(self):
+        """Returns the tweets matching a full-text search query.
+
+        The request takes the following parameters:
+            q: search query, in web search syntax ("out for season",
+                Lakers -Clippers, trade OR waived).
+            author: list of authors to restrict the search to, in the json
+                body, or repeated author query arguments.
+            page: page of the results, starting at 1.
+            limit: maximum number of tweets in the page.
+            fields: columns of the tweets to return (see TweetListAPI).
+
+        Returns:
+            A json serialized dictionary containing a key 'tweets' mapped to
+            the matching tweets, most relevant first, each with its 'rank',
+            and a key 'links' mapped to the URI of the next page, if any.
+            Only the first TWEETS_SEARCH_MAX_RESULTS matches can be paged
+            through.
+
+        Raises:
+            HTTPError: If no tweets match the query.
+        """
+        args = self.reqparse.parse_args()
+        args['author'] = args['author'] or args['author_args']
+        limit = min(
+            args['limit'] or current_app.config['TWEETS_PER_PAGE'],
+            current_app.config['TWEETS_MAX_PER_PAGE']
+        )
+        offset = (args['page'] - 1) * limit
+        max_results = current_app.config['TWEETS_SEARCH_MAX_RESULTS']
+        if offset >= max_results:
+            abort(404, description='Not found')
+
+        ts_query = func.websearch_to_tsquery('english', args['q'])
+        rank = func.ts_rank_cd(Tweet.tweet_tsv, ts_query).label('rank')
+        query = db.session.query(Tweet, rank).filter(
+            Tweet.tweet_tsv.op('@@')(ts_query)
+        )
+        if args['author']:
+            query = query.filter(Tweet.author.in_(args['author']))
+        results = query.options(
+            load_only(*tweet_columns(args['fields']))
+        ).order_by(
+            rank.desc(), Tweet.tweet_id.desc()
+        ).offset(offset).limit(min(limit + 1, max_results - offset)).all()
+        if not results:
+            abort(404, description='Not found')
+
+        links = {}
+        if len(results) > limit:
+            filters = {}
+            if 'fields' in request.args:
+                filters['fields'] = request.args['fields']
+            if args['author']:
+                filters['author'] = args['author']
+            links['next'] = url_for(
+                'resources.tweet_search', q=args['q'],
+                page=args['page'] + 1, limit=limit, _external=True, **filters
+            )
+        tweets = []
+        for tweet, tweet_rank in results[:limit]:
+            tweet = clean_tweet(tweet, args['fields'])
+            tweet['rank'] = tweet_rank
+            tweets.append(tweet)
+        return json_response({'tweets': tweets, 'links': links})
@@ -1,107 +1,284 @@
 """Module containing Celery tasks used in the application.
 
 Tasks defined:
-    get_tweets: retrieve all new tweets for a given search parameter arg.
+    ingest_tweets: retrieve and write all new tweets for a given search
+        parameter arg.
     get_data_periodic: retrieves all new tweets for all SearchField rows run
         periodically by the celery beat(see nba_ws.celery.py for more details).
-    get_data_async: retrieves all new tweets for all SearchField rows,
-        which can be run manually using the SearchTriggerAPI web resource
-        (see class SearchTriggerAPI from nba_ws.resources.search for more
-        details).
+    maintain_partitions: creates the upcoming monthly partitions of the tweet
+        table and removes the partitions past retention, run daily by the
+        celery beat.
+    archive_json_data: moves the raw json of old tweets to compressed
+        segments, run daily by the celery beat.
+    summarize_ingest: sums up the results of a group of ingest_tweets tasks,
+        used as the callback of the chord started by get_data_async.
+
+Functions defined:
+    get_data_async: starts a chord retrieving all new tweets for all
+        SearchField rows, which can be run manually using the
+        SearchTriggerAPI web resource (see class SearchTriggerAPI from
+        nba_ws.resources.search for more details).
+    ingest_progress: returns the progress of each task of a get_data_async
+        run, used by the TaskStatusAPI web resource.
 """
-from functools import reduce
+from datetime import datetime, timedelta
 import json
+import time
+
+from celery import chord, group
+from celery.utils import uuid
+from flask import current_app
+from sqlalchemy.orm import joinedload
 
-from nba_ws import celery
+from nba_ws import celery, db
 # from nba_ws.celery import celery
-from nba_ws.models import SearchField
+from nba_ws.models import SearchCursor, SearchField, TweetArchive
+from nba_ws.common.archive import archive_tweets
+from nba_ws.common.cache import bump_version
+from nba_ws.common.fetch import ingest_concurrently
+from nba_ws.common.ledger import finish_cycle, ingest_cycle, start_cycle
+from nba_ws.common.partitions import (
+    add_months, drop_partitions, ensure_partitions, month_start
+)
+from nba_ws.common.ratelimit import RateLimitExceeded
 from nba_ws.common.util import SearchTweet
 
 
-@celery.task
-def get_tweets(bearer_token, search_params):
-    """Function used to search for new Tweets of a Search Field.
+@celery.task(bind=True)
+def ingest_tweets(self, search_params, search_field_id, since_id=None,
+                  cycle_id=None):
+    """Function used to retrieve and write the new Tweets of a Search Field.
 
-    This function is used for performing a Search API request to retrieve
-    new tweets for a given search_param argument.
+    This function is used for performing Search API requests to retrieve
+    new tweets for a given search_param argument, and writes them in batches
+    as the pages come in (see SearchTweet.write_to_db from
+    nba_ws.common.util), so tweets never go through the result backend. The
+    counts written so far are reported as the meta of a PROGRESS state after
+    every batch. If the rate limit budget runs out, the task is retried once
+    the budget resets. The bearer token is taken from the shared token
+    provider (see nba_ws.common.auth).
 
     Args:
-        bearer_token: string, OAuth2 token used to authenticate requests made
-            to Twitter Search API.
         search_params: dict, parameters passed to the request to Search API.
+        search_field_id: integer, id of the Search Field searched.
+        since_id: integer, since_id of the search (see
+            SearchTweet.iter_tweets from nba_ws.common.util).
+        cycle_id: integer, id of the IngestCycle the search is part of.
 
     Returns:
-        List of tweets(each tweet is stored as a dict).
+        Dictionary with the 'search_field_id', the number of tweets
+        'inserted' and 'skipped', the 'min_id' and 'max_id' of the tweets
+        retrieved, the number of 'pages' (Search API requests performed) and
+        the 'elapsed' seconds.
     """
-    search_object = SearchTweet(bearer_token)
-    tweets = []
-    search_object.get_since_id(search_params['q']['author'])
-    while(1):
-        search_object.build_params(search_params)
-        resps = search_object.search()
-        if not resps['json_data']['statuses']:
-            break
-        for status in resps['json_data']['statuses']:
-            tweet = {}
-            tweet['json_data'] = status
-            tweet['search_params'] = resps['search_params']
-            tweets.append(tweet)
-    search_object.max_id = None
-    return tweets
+    started = time.monotonic()
+    search_object = SearchTweet()
+    cursor = SearchCursor.query.filter_by(
+        search_field_id=search_field_id
+    ).first() or SearchCursor(search_field_id)
 
+    def progress(counts):
+        self.update_state(state='PROGRESS', meta=dict(
+            counts, search_field_id=search_field_id,
+            pages=search_object.page_count
+        ))
 
-@celery.task
-def get_data_periodic(bearer_token):
+    try:
+        search_object.sync_rate_limit_status()
+        summary = search_object.write_to_db(
+            search_object.iter_tweets(search_params, since_id),
+            cursor=cursor, progress=progress, cycle_id=cycle_id
+        )
+    except RateLimitExceeded as exc:
+        raise self.retry(exc=exc, countdown=exc.retry_after)
+    return dict(
+        summary, search_field_id=search_field_id,
+        pages=search_object.page_count,
+        elapsed=round(time.monotonic() - started, 3)
+    )
+
+
+@celery.task(bind=True)
+def get_data_periodic(self):
     """Function used to retrieve new tweets for all Search Fields.
 
     This function is used by celery beat to periodically search Twitter for
-    new tweets by any of the Search Fields.
-
-    Args:
-        bearer_token: string, OAuth2 token used to authenticate requests made
-            to Twitter Search API.
+    new tweets by any of the Search Fields. Search Fields are fetched in
+    parallel (see ingest_concurrently from nba_ws.common.fetch) and their
+    tweets are committed in batches as the pages come in. If the rate limit
+    budget runs out, the task is retried once the budget resets, and picks up
+    from the SearchCursor of each Search Field. Every run is recorded as an
+    IngestCycle of the ingest ledger (see nba_ws.common.ledger).
 
     Returns:
         None
     """
-    search_obj = SearchTweet(bearer_token)
-    search_params = SearchField.query.all()
-    tweets = [
-        search_obj.get_tweets(
-            json.loads(search_param.search_field)
-        ) for search_param in search_params
+    jobs = [
+        (sf.id, json.loads(sf.search_field), _since_id(sf))
+        for sf in _search_fields()
     ]
-    data = list(reduce(lambda x, y: x + y, tweets))
-    if len(data) > 0:
-        search_obj.write_to_db(data)
+    try:
+        with ingest_cycle('periodic', self.request.id, len(jobs)) as cycle_id:
+            SearchTweet().sync_rate_limit_status()
+            for _ in ingest_concurrently(jobs, cycle_id=cycle_id):
+                pass
+    except RateLimitExceeded as exc:
+        raise self.retry(exc=exc, countdown=exc.retry_after)
 
 
-@celery.task(bind=True)
-def get_data_async(self, bearer_token):
+@celery.task
+def maintain_partitions():
+    """Function used to maintain the monthly partitions of the tweet table.
+
+    This function is used by celery beat to create the partitions of the
+    current month and of the next TWEET_PARTITIONS_AHEAD months, so tweets
+    never land in the default partition. When TWEET_RETENTION_MONTHS is set,
+    the partitions of the months older than that are dropped, or detached if
+    TWEET_RETENTION_DETACH is set (see nba_ws.common.partitions). The
+    archived json of the tweets of dropped partitions is deleted as well.
+
+    Returns:
+        Dictionary with the names of the partitions 'created' and 'removed'.
+    """
+    config = current_app.config
+    created = ensure_partitions(config['TWEET_PARTITIONS_AHEAD'])
+    removed = []
+    if config['TWEET_RETENTION_MONTHS']:
+        cutoff = add_months(
+            month_start(datetime.utcnow()), -config['TWEET_RETENTION_MONTHS']
+        )
+        removed = drop_partitions(
+            cutoff, detach=config['TWEET_RETENTION_DETACH']
+        )
+        if not config['TWEET_RETENTION_DETACH']:
+            TweetArchive.query.filter(
+                TweetArchive.day < cutoff.date()
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        if removed:
+            bump_version('tweets')
+            db.session.commit()
+    return {'created': created, 'removed': removed}
+
+
+@celery.task
+def archive_json_data():
+    """Function used to archive the raw json of old tweets.
+
+    This function is used by celery beat to move the json_data of the tweets
+    posted more than TWEET_ARCHIVE_AFTER_DAYS days ago to compressed
+    segments (see archive_tweets from nba_ws.common.archive). Responses are
+    unchanged, as archived json_data is read back on demand.
+
+    Returns:
+        Dictionary with the number of 'segments' written and of 'tweets'
+        archived.
+    """
+    days = current_app.config['TWEET_ARCHIVE_AFTER_DAYS']
+    if not days:
+        return {'segments': 0, 'tweets': 0}
+    return archive_tweets(datetime.utcnow() - timedelta(days=days))
+
+
+@celery.task
+def summarize_ingest(results, cycle_id=None):
+    """Function used to sum up the results of ingest_tweets tasks.
+
+    This function is the callback of the chord started by get_data_async, it
+    runs once every ingest_tweets task of the chord header has finished, and
+    finishes the IngestCycle of the chord.
+
+    Args:
+        results: list, results of the ingest_tweets tasks.
+        cycle_id: integer, id of the IngestCycle of the chord.
+
+    Returns:
+        Dictionary with the total number of tweets 'inserted' and 'skipped',
+        of 'pages' retrieved, and the result of each ingest_tweets task
+        under 'search_fields'.
+    """
+    if cycle_id is not None:
+        finish_cycle(cycle_id)
+    return {
+        'inserted': sum(result['inserted'] for result in results),
+        'skipped': sum(result['skipped'] for result in results),
+        'pages': sum(result['pages'] for result in results),
+        'search_fields': results
+    }
+
+
+def get_data_async():
     """Function used to retrieve new tweets for all Search Fields.
 
     This function is used by the SearchTriggerAPI resource of the application
     to manually run a search to retrieve new tweets for all Search Fields in
-    the SearchField model.
+    the SearchField model. One ingest_tweets task is started per Search Field
+    and the summarize_ingest task is chained as the chord callback, so no
+    worker is kept busy waiting for the results of the other tasks. The
+    group of ingest_tweets tasks is saved in the result backend, so their
+    progress can be read from the id of the callback (see ingest_progress).
+    The chord is recorded as an IngestCycle of the ingest ledger, which is
+    left unfinished if any of its tasks fails.
+
+    Returns:
+        AsyncResult of the summarize_ingest callback task.
+    """
+    task_id = uuid()
+    search_fields = _search_fields()
+    cycle_id = start_cycle('manual', task_id, len(search_fields))
+    header = group(
+        (
+            ingest_tweets.s(
+                json.loads(search_field.search_field), search_field.id,
+                _since_id(search_field), cycle_id=cycle_id
+            ) for search_field in search_fields
+        ),
+        task_id=_group_id(task_id)
+    )
+    result = chord(header)(
+        summarize_ingest.s(cycle_id=cycle_id), task_id=task_id
+    )
+    if result.parent is not None:
+        result.parent.save()
+    return result
+
+
+def ingest_progress(task_id):
+    """Returns the progress of the ingest_tweets tasks of a get_data_async run.
 
     Args:
-        bearer_token: string, OAuth2 token used to authenticate requests made
-            to Twitter Search API.
+        task_id: string, id of the summarize_ingest callback task returned by
+            get_data_async.
 
     Returns:
-        None
+        List with a dictionary per ingest_tweets task holding its 'task_id',
+        'state' and, once it has written tweets, the counts reported by the
+        task. None if task_id is not the id of a get_data_async run.
     """
-    search_obj = SearchTweet(bearer_token)
-    search_params = SearchField.query.all()
-    tweets = [
-        get_tweets.delay(
-            bearer_token, json.loads(search_param.search_field)
-        ) for search_param in search_params
-    ]
-    while(1):
-        ready = [tweet.result for tweet in tweets if tweet.ready()]
-        if len(ready) == len(tweets):
-            break
-    data = list(reduce(lambda x, y: x + y, ready))
-    if len(data) > 0:
-        search_obj.write_to_db(data)
+    group_result = celery.GroupResult.restore(_group_id(task_id))
+    if group_result is None:
+        return None
+    progress = []
+    for result in group_result.results:
+        info = result.info if isinstance(result.info, dict) else {}
+        progress.append(dict(info, task_id=result.id, state=result.state))
+    return progress
+
+
+def _search_fields():
+    """Reads every Search Field along with its SearchCursor in one query.
+
+    Returns:
+        List of SearchField objects with their cursor attribute loaded.
+    """
+    return SearchField.query.options(joinedload(SearchField.cursor)).all()
+
+
+def _group_id(task_id):
+    """Returns the id of the group of ingest_tweets tasks of task_id."""
+    return f'{task_id}-ingest'
+
+
+def _since_id(search_field):
+    """Returns the since_id of a Search Field, 0 if it has no tweets yet."""
+    return (search_field.cursor and search_field.cursor.since_id) or 0
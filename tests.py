@@ -1,8 +1,45 @@
-from nba_ws import create_app, db
-from config import TestingConfig
+from nba_ws import celery, create_app, db
+from nba_ws.common.archive import archive_tweets
+from nba_ws.common.auth import TokenProvider
+from nba_ws.common.cache import get_version
+from nba_ws.common.client import get_session
+from nba_ws.common.ledger import ingest_cycle
+from nba_ws.common.notify import CHANNEL, TweetListener, payloads
+from nba_ws.common.partitions import ensure_partitions, list_partitions
+from nba_ws.common.ratelimit import (
+    WINDOW, LocalBudget, RateLimiter, RateLimitExceeded
+)
+from nba_ws.common.replica import REPLICA_BIND, read_replica
+from nba_ws.common.serving import engine_options
+from nba_ws.common.stats import record_activity
+from nba_ws.common.util import (
+    SearchTweet, clean_tweet, tweet_fieldsets, utc_datetime
+)
+from nba_ws.models import (
+    SearchCursor, SearchField, SearchRun, Tweet, TweetActivity
+)
+from nba_ws.resources.events import TweetEventsAPI, event_id
+from nba_ws.resources.export import TweetExportAPI
+from nba_ws.resources.tweet import TweetListAPI
+from nba_ws.tasks import _since_id, get_data_async, ingest_tweets
+from celery.exceptions import Retry
+from config import PostgresTestingConfig, TestingConfig
+from flask_migrate import downgrade, upgrade
+from datetime import datetime, timedelta
+from sqlalchemy import event, func
+from types import SimpleNamespace
 from typing import List, Tuple
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 import unittest
+import gzip
 import json
+import os
+import re
+import requests
+import select
+import tempfile
+import time
 
 BASE_URL = "http://127.0.0.1:5000/todo/api/v1.0"
 
@@ -183,6 +220,1641 @@ class TestSearchAPI(unittest.TestCase):
                 )
 
 
+class TestGetDataAsync(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        celery.conf.update(
+            task_always_eager=True,
+            task_eager_propagates=True,
+            broker_url='memory://',
+            result_backend='cache+memory://'
+        )
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_chord_writes_each_author_once(self):
+        authors = ('wojespn', 'ShamsCharania')
+        search_fields = [
+            SimpleNamespace(
+                id=i, cursor=None,
+                search_field=json.dumps({'q': {'author': author}})
+            ) for i, author in enumerate(authors)
+        ]
+        pages = {
+            author: [
+                [{'id': 2, 'user': author}, {'id': 1, 'user': author}], []
+            ] for author in authors
+        }
+
+        def fake_search(search_obj):
+            author = search_obj.params['q'][len('from:'):]
+            search_obj.params = {}
+            statuses = pages[author].pop(0)
+            return {
+                'json_data': {'statuses': statuses},
+                'search_params': {'q': f'from:{author}'}
+            }
+
+        written = []
+
+        def fake_write_to_db(search_obj, tweets, cursor=None, progress=None,
+                             cycle_id=None):
+            self.assertEqual(cycle_id, 7)
+            written.append(list(tweets))
+            progress({'inserted': len(written[-1]), 'skipped': 0})
+            return {
+                'inserted': len(written[-1]), 'skipped': 0,
+                'min_id': 1, 'max_id': 2
+            }
+
+        with mock.patch(
+                    'nba_ws.tasks._search_fields', return_value=search_fields
+                ), \
+                mock.patch('nba_ws.tasks.SearchCursor'), \
+                mock.patch('nba_ws.tasks.start_cycle', return_value=7), \
+                mock.patch('nba_ws.tasks.finish_cycle') as finish_cycle, \
+                mock.patch.object(SearchTweet, 'sync_rate_limit_status'), \
+                mock.patch.object(SearchTweet, 'get_since_id'), \
+                mock.patch.object(SearchTweet, 'search', fake_search), \
+                mock.patch.object(
+                    SearchTweet, 'write_to_db', fake_write_to_db
+                ):
+            result = get_data_async().get()
+
+        finish_cycle.assert_called_once_with(7)
+        self.assertEqual(result['inserted'], 4)
+        self.assertEqual(result['skipped'], 0)
+        summaries = result['search_fields']
+        self.assertEqual(
+            {summary['search_field_id'] for summary in summaries}, {0, 1}
+        )
+        for summary in summaries:
+            self.assertNotIn('tweets', summary)
+        self.assertEqual([len(tweets) for tweets in written], [2, 2])
+        self.assertEqual(
+            {tweets[0]['json_data']['user'] for tweets in written},
+            set(authors)
+        )
+
+    def test_rate_limited_ingest_is_retried_after_reset(self):
+        exc = RateLimitExceeded('/search/tweets', 120)
+        with mock.patch('nba_ws.tasks.SearchCursor'), \
+                mock.patch.object(
+                    SearchTweet, 'sync_rate_limit_status', side_effect=exc
+                ), \
+                mock.patch.object(
+                    ingest_tweets, 'retry', side_effect=Retry
+                ) as retry:
+            with self.assertRaises(Retry):
+                ingest_tweets({'q': {'author': 'wojespn'}}, 1)
+        retry.assert_called_once_with(exc=exc, countdown=120)
+
+    def test_since_id_falls_back_to_zero(self):
+        self.assertEqual(_since_id(SimpleNamespace(cursor=None)), 0)
+        self.assertEqual(_since_id(SimpleNamespace(
+            cursor=SimpleNamespace(since_id=None)
+        )), 0)
+        self.assertEqual(_since_id(SimpleNamespace(
+            cursor=SimpleNamespace(since_id=42)
+        )), 42)
+
+
+class FakeClock(object):
+    """Stands in for the time module, sleeping only moves the clock."""
+    def __init__(self, now):
+        self.now = now
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class TestRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock(1577836800.0)
+        patcher = mock.patch('nba_ws.common.ratelimit.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.budget = LocalBudget()
+
+    def headers(self, remaining, reset_in, limit=450):
+        return {
+            'x-rate-limit-limit': str(limit),
+            'x-rate-limit-remaining': str(remaining),
+            'x-rate-limit-reset': str(int(self.clock.now + reset_in))
+        }
+
+    def test_budget_is_spent_then_reset(self):
+        limiter = RateLimiter(self.budget, max_wait=600, burst=10)
+        limiter.update('/search/tweets', self.headers(2, 60, limit=2))
+        limiter.wait('/search/tweets')
+        limiter.wait('/search/tweets')
+        self.assertEqual(
+            self.budget.snapshot()['/search/tweets']['remaining'], 0
+        )
+        self.assertEqual(self.clock.slept, [])
+        limiter.wait('/search/tweets')
+        self.assertEqual(self.clock.slept, [60])
+
+    def test_requests_are_paced_past_burst(self):
+        limiter = RateLimiter(self.budget, max_wait=600, burst=2)
+        limiter.update(
+            '/search/tweets', self.headers(WINDOW, WINDOW, limit=WINDOW)
+        )
+        for _ in range(4):
+            limiter.wait('/search/tweets')
+        # one request per second once the burst is spent
+        self.assertEqual(self.clock.slept, [1, 1])
+
+    def test_wait_raises_past_max_wait(self):
+        limiter = RateLimiter(self.budget, max_wait=60)
+        limiter.update('/search/tweets', self.headers(0, 600))
+        with self.assertRaises(RateLimitExceeded) as raised:
+            limiter.wait('/search/tweets')
+        self.assertEqual(raised.exception.retry_after, 600)
+        self.assertEqual(self.clock.slept, [])
+
+    def test_429_refreshes_budget_and_retries(self):
+        limiter = RateLimiter(self.budget, max_wait=60)
+        responses = [
+            SimpleNamespace(status_code=429, headers=self.headers(0, 30)),
+            SimpleNamespace(status_code=200, headers=self.headers(449, 900)),
+        ]
+        session = mock.Mock()
+        session.request.side_effect = lambda *args, **kwargs: \
+            responses.pop(0)
+        with mock.patch(
+                'nba_ws.common.ratelimit.get_session', return_value=session
+                ):
+            response = limiter.request('/search/tweets', 'GET', 'url')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(session.request.call_count, 2)
+        self.assertEqual(self.clock.slept, [30])
+        self.assertEqual(
+            self.budget.snapshot()['/search/tweets']['remaining'], 449
+        )
+
+    def test_429_exhausts_budget_whatever_the_headers(self):
+        limiter = RateLimiter(self.budget, max_wait=60)
+        responses = [
+            SimpleNamespace(status_code=429, headers=self.headers(5, 40)),
+            SimpleNamespace(status_code=200, headers=self.headers(449, 900)),
+        ]
+        session = mock.Mock()
+        session.request.side_effect = lambda *args, **kwargs: \
+            responses.pop(0)
+        with mock.patch(
+                'nba_ws.common.ratelimit.get_session', return_value=session
+                ):
+            response = limiter.request('/search/tweets', 'GET', 'url')
+        self.assertEqual(response.status_code, 200)
+        # the retry waits for the reset instead of spending the 5 requests
+        self.assertEqual(self.clock.slept, [40])
+
+    def test_429_retries_are_capped(self):
+        limiter = RateLimiter(self.budget, max_wait=60, max_retries=2)
+        session = mock.Mock()
+        session.request.side_effect = lambda *args, **kwargs: \
+            SimpleNamespace(status_code=429, headers=self.headers(0, 30))
+        with mock.patch(
+                'nba_ws.common.ratelimit.get_session', return_value=session
+                ):
+            with self.assertRaises(RateLimitExceeded) as raised:
+                limiter.request('/search/tweets', 'GET', 'url')
+        self.assertEqual(session.request.call_count, 3)
+        self.assertEqual(self.clock.slept, [30, 30])
+        self.assertEqual(raised.exception.retry_after, 30)
+
+
+class TestTokenProvider(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = os.path.join(self.tmp_dir.name, 'bearer_token')
+        self.issued = []
+        issued = self.issued
+
+        class FakeOAuth2(object):
+            """Returns the last token issued, like the BEARER_TOKEN env."""
+            def __init__(self):
+                self.bearer_token = issued[-1] if issued else None
+
+            def get_oauth2_bearer_token(self):
+                issued.append(f'token-{len(issued) + 1}')
+                self.bearer_token = issued[-1]
+
+        patcher = mock.patch('nba_ws.common.util.TwitterOAuth2', FakeOAuth2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_token_is_reused_across_instances(self):
+        first = TokenProvider(path=self.path)
+        second = TokenProvider(path=self.path)
+        self.assertEqual(first.get(), 'token-1')
+        self.assertEqual(second.get(), 'token-1')
+        self.assertEqual(self.issued, ['token-1'])
+
+    def test_refresh_keeps_rotated_token(self):
+        first = TokenProvider(path=self.path)
+        second = TokenProvider(path=self.path)
+        stale = first.get()
+        second.get()
+        self.assertEqual(first.refresh(stale=stale), 'token-2')
+        # second was rejected with the same stale token, it picks up the
+        # token rotated by first instead of requesting another one
+        self.assertEqual(second.refresh(stale=stale), 'token-2')
+        self.assertEqual(self.issued, ['token-1', 'token-2'])
+
+    def test_request_is_retried_once_on_401(self):
+        app = create_app(TestingConfig)
+        limiter = mock.Mock()
+        limiter.request.side_effect = [
+            SimpleNamespace(status_code=401),
+            SimpleNamespace(status_code=401)
+        ]
+        provider = mock.Mock()
+        provider.invalidate.return_value = 'new-token'
+        with app.app_context(), \
+                mock.patch(
+                    'nba_ws.common.util.get_rate_limiter',
+                    return_value=limiter
+                ), \
+                mock.patch(
+                    'nba_ws.common.util.get_token_provider',
+                    return_value=provider
+                ):
+            search_obj = SearchTweet('old-token')
+            response = search_obj.request('/search/tweets', 'url', {})
+        self.assertEqual(response.status_code, 401)
+        provider.invalidate.assert_called_once_with('old-token')
+        self.assertEqual(
+            [
+                call[1]['headers']['Authorization']
+                for call in limiter.request.call_args_list
+            ],
+            ['Bearer old-token', 'Bearer new-token']
+        )
+
+    def test_401_refreshes_token_once(self):
+        app = create_app(TestingConfig)
+        limiter = mock.Mock()
+        limiter.request.side_effect = [
+            SimpleNamespace(status_code=401),
+            SimpleNamespace(status_code=200)
+        ]
+        provider = TokenProvider(path=self.path)
+        with app.app_context(), \
+                mock.patch(
+                    'nba_ws.common.util.get_rate_limiter',
+                    return_value=limiter
+                ), \
+                mock.patch(
+                    'nba_ws.common.util.get_token_provider',
+                    return_value=provider
+                ):
+            search_obj = SearchTweet(provider.get())
+            response = search_obj.request('/search/tweets', 'url', {})
+            # another process rejected with the same token reuses the new
+            # one instead of requesting a third
+            self.assertEqual(
+                TokenProvider(path=self.path).invalidate('token-1'), 'token-2'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.issued, ['token-1', 'token-2'])
+        self.assertEqual(
+            limiter.request.call_args_list[1][1]['headers']['Authorization'],
+            'Bearer token-2'
+        )
+
+
+class TestTwitterSession(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app.config.update(
+            TWITTER_POOL_SIZE=4, TWITTER_CONNECT_TIMEOUT=2,
+            TWITTER_READ_TIMEOUT=20
+        )
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.addCleanup(self.app_context.pop)
+        # start without the session of the other tests
+        patcher = mock.patch('nba_ws.common.client._session', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_session_is_reused(self):
+        self.assertIs(get_session(), get_session())
+
+    def test_session_is_recreated_after_fork(self):
+        session = get_session()
+        with mock.patch(
+                'nba_ws.common.client.os.getpid', return_value=-1
+                ):
+            child_session = get_session()
+            self.assertIs(get_session(), child_session)
+        self.assertIsNot(child_session, session)
+
+    def test_default_timeout_and_pool_size(self):
+        session = get_session()
+        adapter = session.get_adapter('https://api.twitter.com/')
+        self.assertEqual(adapter._pool_connections, 4)
+        self.assertEqual(adapter._pool_maxsize, 4)
+        with mock.patch('requests.Session.request') as request:
+            session.request('GET', 'https://api.twitter.com/')
+            session.request('GET', 'https://api.twitter.com/', timeout=1)
+        self.assertEqual(
+            [call[1]['timeout'] for call in request.call_args_list],
+            [(2, 20), 1]
+        )
+
+    def test_failed_search_raises_http_error(self):
+        response = requests.Response()
+        response.status_code = 503
+        response.url = 'https://api.twitter.com/1.1/search/tweets.json'
+        limiter = mock.Mock()
+        limiter.request.return_value = response
+        with mock.patch(
+                'nba_ws.common.util.get_rate_limiter', return_value=limiter
+                ):
+            with self.assertRaises(requests.HTTPError):
+                SearchTweet('token').search()
+
+
+class TestTweetExport(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def test_export_lines_round_trip_through_gzip(self):
+        tweets = [
+            SimpleNamespace(tweet_id=i, author='wojespn') for i in range(5)
+        ]
+        chunks = list(TweetExportAPI.lines(
+            tweets, ('tweet_id', 'author'), chunk_size=2
+        ))
+        self.assertEqual(len(chunks), 3)
+        body = gzip.decompress(b''.join(TweetExportAPI.compress(chunks)))
+        self.assertEqual(
+            [json.loads(line) for line in body.splitlines()],
+            [{'tweet_id': i, 'author': 'wojespn'} for i in range(5)]
+        )
+
+
+class TestTweetNotify(unittest.TestCase):
+    def test_payloads_fit_in_notify(self):
+        rows = [
+            SimpleNamespace(
+                id=2 ** 31 - 1000 + i, tweet_id=2 ** 62 + i,
+                author='ShamsCharania'
+            )
+            for i in range(1000)
+        ]
+        batches = [
+            json.loads(payload) for payload in payloads(rows, 2 ** 40)
+        ]
+        self.assertEqual(
+            sum(len(batch['tweets']) for batch in batches), 1000
+        )
+        for payload in payloads(rows, 2 ** 40):
+            self.assertLess(len(payload.encode('utf-8')), 8000)
+
+    def test_listener_filters_subscriptions_by_author(self):
+        listener = TweetListener(engine=None)
+        listener._thread = object()
+        everyone = listener.subscribe()
+        woj = listener.subscribe(['wojespn'])
+        listener.dispatch(next(payloads([
+            SimpleNamespace(id=7, tweet_id=1, author='wojespn'),
+            SimpleNamespace(id=8, tweet_id=2, author='ShamsCharania'),
+        ], 42)))
+        self.assertEqual(len(everyone.get(timeout=0)[1]), 2)
+        self.assertEqual(woj.get(timeout=0), (
+            42, [{'id': 7, 'tweet_id': 1, 'author': 'wojespn'}]
+        ))
+
+    def test_event_id_is_commit_order(self):
+        event = TweetEventsAPI.event((42, 9), [
+            {'id': 9, 'tweet_id': 1, 'author': 'wojespn'},
+            {'id': 8, 'tweet_id': 2, 'author': 'ShamsCharania'},
+        ])
+        lines = event.decode('utf-8').split('\n')
+        self.assertEqual(lines[:2], ['id: 42-9', 'event: tweets'])
+        self.assertEqual(json.loads(lines[2][len('data: '):]), {'tweets': [
+            {'tweet_id': 1, 'author': 'wojespn'},
+            {'tweet_id': 2, 'author': 'ShamsCharania'},
+        ]})
+
+    def test_malformed_last_event_id_is_rejected(self):
+        self.assertEqual(event_id('42-9'), (42, 9))
+        # ids of events numbered by Tweet.id are rejected before the client
+        # subscribes
+        response = create_app(TestingConfig).test_client().get(
+            f"{BASE_URL}/tweets/events", headers={'Last-Event-ID': '600'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TestReadReplica(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app.config['SQLALCHEMY_BINDS'] = {REPLICA_BIND: 'sqlite://'}
+        self.app.config['REPLICA_LAG_CHECK_INTERVAL'] = 0
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        self.app_context.pop()
+
+    def read_bind(self, lag):
+        with mock.patch('nba_ws.common.replica.replica_lag', return_value=lag):
+            read_replica(lambda: None)()
+        return db.session.get_bind(Tweet.__mapper__)
+
+    def test_reads_go_to_replica_and_writes_to_primary(self):
+        replica = db.get_engine(self.app, bind=REPLICA_BIND)
+        self.assertIs(self.read_bind(lag=0.5), replica)
+        self.assertIs(
+            db.session.get_bind(
+                Tweet.__mapper__, clause=Tweet.__table__.insert()
+            ),
+            db.engine
+        )
+
+    def test_lagging_replica_falls_back_to_primary(self):
+        self.assertIs(self.read_bind(lag=60), db.engine)
+        db.session.remove()
+        self.assertIs(self.read_bind(lag=None), db.engine)
+
+
+class TestUtcDatetime(unittest.TestCase):
+    def setUp(self):
+        # a local timezone other than UTC must not shift naive values
+        self.tz = os.environ.get('TZ')
+        os.environ['TZ'] = 'America/New_York'
+        time.tzset()
+
+    def tearDown(self):
+        if self.tz is None:
+            del os.environ['TZ']
+        else:
+            os.environ['TZ'] = self.tz
+        time.tzset()
+
+    def test_offset_is_converted_to_utc(self):
+        self.assertEqual(
+            utc_datetime('2020-01-01T10:00:00+02:00'),
+            datetime(2020, 1, 1, 8)
+        )
+
+    def test_naive_is_unchanged(self):
+        self.assertEqual(
+            utc_datetime('2020-01-01T10:00:00'), datetime(2020, 1, 1, 10)
+        )
+        self.assertEqual(utc_datetime('2020-01-01'), datetime(2020, 1, 1))
+
+
+class TestEngineOptions(unittest.TestCase):
+    def test_pool_options_only_apply_to_postgres(self):
+        config = {
+            name: getattr(TestingConfig, name) for name in dir(TestingConfig)
+            if name.isupper()
+        }
+        self.assertEqual(engine_options(config), {})
+
+        config.update(
+            SQLALCHEMY_DATABASE_URI='postgresql://localhost/nba_ws',
+            DB_POOL_SIZE=20, DB_STATEMENT_TIMEOUT=15000
+        )
+        options = engine_options(config)
+        self.assertEqual(options['pool_size'], 20)
+        self.assertEqual(
+            options['connect_args'], {'options': '-c statement_timeout=15000'}
+        )
+
+
+class FakeTweetQuery(object):
+    """Stands in for the filtered Query of TweetListAPI over a list of rows."""
+    def __init__(self, rows):
+        self.rows = rows
+        self.loaded = None
+
+    def options(self, *options):
+        # the Tweet query the options would be applied to, to compile it
+        self.loaded = Tweet.query.options(*options)
+        return self
+
+    def order_by(self, clause):
+        descending = str(clause).endswith('DESC')
+        return FakeTweetQuery(sorted(
+            self.rows, key=lambda row: row.tweet_id, reverse=descending
+        ))
+
+    def limit(self, limit):
+        return FakeTweetQuery(self.rows[:limit])
+
+    def with_entities(self, *entities):
+        return self
+
+    def execution_options(self, **options):
+        return self
+
+    def yield_per(self, count):
+        return iter(self.rows)
+
+    def all(self):
+        return list(self.rows)
+
+
+class TestTweetList(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.app.config['TWEETS_STREAM_CHUNK_SIZE'] = 2
+        self.client = self.app.test_client()
+        self.rows = [
+            SimpleNamespace(
+                id=tweet_id, tweet_id=tweet_id, author='wojespn',
+                author_id=1, tweet_text=f'tweet {tweet_id}',
+                tweet_date=datetime(2019, 1, 1), json_data='{}',
+                search_params='{}', datetime_added=datetime(2019, 1, 1)
+            ) for tweet_id in range(1, 6)
+        ]
+
+        def filter_query(api, query, args):
+            self.query = FakeTweetQuery([
+                row for row in self.rows
+                if (args['before_id'] is None
+                    or row.tweet_id < args['before_id'])
+                and (args['after_id'] is None
+                     or row.tweet_id > args['after_id'])
+                and (not args['author'] or row.author in args['author'])
+            ])
+            return self.query
+
+        patcher = mock.patch.object(TweetListAPI, 'filter_query', filter_query)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.version = (1, datetime(2019, 1, 1))
+        patcher = mock.patch(
+            'nba_ws.common.cache.get_version',
+            side_effect=lambda name: self.version
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def page(self, **params):
+        response = self.client.get(f"{BASE_URL}/tweets", query_string=params)
+        body = response.get_json()
+        return (
+            [tweet['tweet_id'] for tweet in body['tweets']],
+            {
+                rel: parse_qs(urlparse(link).query)
+                for rel, link in body['links'].items()
+            }
+        )
+
+    def test_page_links(self):
+        self.assertEqual(self.page(limit=2), ([5, 4], {
+            'next': {'before_id': ['4'], 'limit': ['2']}
+        }))
+        self.assertEqual(self.page(before_id=4, limit=2), ([3, 2], {
+            'next': {'before_id': ['2'], 'limit': ['2']},
+            'prev': {'after_id': ['3'], 'limit': ['2']}
+        }))
+        self.assertEqual(self.page(after_id=1, limit=2), ([3, 2], {
+            'next': {'before_id': ['2'], 'limit': ['2']},
+            'prev': {'after_id': ['3'], 'limit': ['2']}
+        }))
+        self.assertEqual(self.page(after_id=0, limit=2), ([2, 1], {
+            'prev': {'after_id': ['2'], 'limit': ['2']}
+        }))
+
+    def test_links_keep_authors(self):
+        self.rows[1].author = 'ShamsCharania'
+        response = self.client.get(
+            f"{BASE_URL}/tweets", query_string={'limit': 2},
+            json={'author': ['wojespn']}
+        )
+        body = response.get_json()
+        self.assertEqual(
+            [tweet['tweet_id'] for tweet in body['tweets']], [5, 4]
+        )
+        self.assertEqual(parse_qs(urlparse(body['links']['next']).query), {
+            'before_id': ['4'], 'limit': ['2'], 'author': ['wojespn']
+        })
+        # the links pass the authors as query arguments
+        self.assertEqual(
+            self.page(before_id=4, limit=2, author='wojespn'), ([3, 1], {
+                'prev': {
+                    'after_id': ['3'], 'limit': ['2'], 'author': ['wojespn']
+                }
+            })
+        )
+
+    def test_stream_chunks_are_valid_json(self):
+        response = self.client.get(
+            f"{BASE_URL}/tweets", query_string={'stream': 'true'},
+            buffered=False
+        )
+        chunks = list(response.response)
+        response.close()
+        # the opening and closing brackets, and 3 chunks of tweets
+        self.assertEqual(len(chunks), 5)
+        tweets = json.loads(b''.join(chunks))['tweets']
+        self.assertEqual(
+            [tweet['tweet_id'] for tweet in tweets], [5, 4, 3, 2, 1]
+        )
+
+    def test_conditional_get(self):
+        uri = f"{BASE_URL}/tweets?limit=2"
+        response = self.client.get(uri)
+        etag = response.headers['ETag']
+        self.assertTrue(etag.startswith('"tweets-1-'))
+        self.assertEqual(
+            response.headers['Last-Modified'], 'Tue, 01 Jan 2019 00:00:00 GMT'
+        )
+        with mock.patch.object(TweetListAPI, 'filter_query') as listing:
+            for headers in (
+                    {'If-None-Match': etag},
+                    {'If-Modified-Since': response.headers['Last-Modified']}
+                    ):
+                not_modified = self.client.get(uri, headers=headers)
+                self.assertEqual(not_modified.status_code, 304)
+                self.assertEqual(not_modified.headers['ETag'], etag)
+        listing.assert_not_called()
+        # a write bumps the version, and so the ETag
+        self.version = (2, datetime(2019, 1, 2))
+        response = self.client.get(uri, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['ETag'].startswith('"tweets-2-'))
+
+    def test_fields(self):
+        response = self.client.get(
+            f"{BASE_URL}/tweets", query_string={'fields': 'author,tweet_text'}
+        )
+        self.assertEqual(
+            set(response.get_json()['tweets'][0]), {'author', 'tweet_text'}
+        )
+        columns = str(self.query.loaded).split(' FROM ')[0]
+        self.assertIn('tweet_text', columns)
+        self.assertNotIn('json_data', columns)
+        response = self.client.get(
+            f"{BASE_URL}/tweets", query_string={'fields': 'author,password'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class TestTweetSearchRequest(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app(TestingConfig)
+        self.client = self.app.test_client()
+        patcher = mock.patch(
+            'nba_ws.common.cache.get_version',
+            return_value=(1, datetime(2019, 1, 1))
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_query_is_required(self):
+        response = self.client.get(f"{BASE_URL}/tweets/search")
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('q', response.get_json()['message'])
+
+    def test_pages_past_cap_are_not_found(self):
+        self.app.config['TWEETS_SEARCH_MAX_RESULTS'] = 20
+        # the page is rejected before the tweet table is queried
+        with mock.patch('nba_ws.resources.tweet_search.db') as search_db:
+            response = self.client.get(
+                f"{BASE_URL}/tweets/search",
+                query_string={'q': 'Lakers', 'limit': 10, 'page': 3}
+            )
+        self.assertEqual(response.status_code, 404)
+        search_db.session.query.assert_not_called()
+
+
+@unittest.skipUnless(
+    os.getenv('TEST_PG_DATABASE_URL'), 'TEST_PG_DATABASE_URL is not set'
+)
+class PostgresTestCase(unittest.TestCase):
+    """Runs against a local Postgres loaded with synthetic tweets."""
+    tweet_count = 200000
+    author_count = 200
+
+    def setUp(self):
+        self.app = create_app(PostgresTestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.drop_all()
+        db.create_all()
+        ensure_partitions(months_ahead=5, now=datetime(2019, 1, 1))
+        db.session.execute(
+            """
+            INSERT INTO "nba-ws-tweet" (
+                tweet_id, author, author_id, tweet_text, tweet_date,
+                json_data, datetime_added
+            )
+            SELECT g, 'author' || (g % :authors), g % :authors,
+                'tweet ' || g,
+                timestamp '2019-01-01' + g * interval '1 minute',
+                '{}'::jsonb,
+                timestamp '2019-01-01' + g * interval '1 minute'
+            FROM generate_series(1, :tweets) g
+            """,
+            {'authors': self.author_count, 'tweets': self.tweet_count}
+        )
+        db.session.commit()
+        db.session.execute('ANALYZE')
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def explain(self, query):
+        # bound parameters are passed to psycopg2, since some of them (e.g.
+        # datetimes) can't be rendered as literals by SQLAlchemy
+        statement = query.statement.compile(dialect=db.engine.dialect)
+        plan = db.session.connection().execute(
+            f'EXPLAIN (FORMAT JSON) {statement}', statement.params
+        )
+        return plan.scalar()[0]['Plan']
+
+    def scans(self, plan):
+        nodes = [plan]
+        for child in plan.get('Plans', []):
+            nodes += self.scans(child)
+        return [node for node in nodes if 'Scan' in node['Node Type']]
+
+    def parent_index(self, index):
+        """Returns the index of the table a partition index belongs to."""
+        parent = db.session.execute(
+            'SELECT p.relname FROM pg_inherits i '
+            'JOIN pg_class p ON p.oid = i.inhparent '
+            'WHERE i.inhrelid = to_regclass(:index)',
+            {'index': f'"{index}"'}
+        ).scalar()
+        return parent or index
+
+    def assertIndexScan(self, query, table, index=None):
+        scans = [
+            scan for scan in self.scans(self.explain(query))
+            if scan.get('Relation Name', '').startswith(table)
+            or 'Index Name' in scan
+        ]
+        self.assertTrue(scans)
+        for scan in scans:
+            self.assertNotEqual(scan['Node Type'], 'Seq Scan', scan)
+        if index:
+            self.assertIn(index, [
+                self.parent_index(scan['Index Name']) for scan in scans
+                if 'Index Name' in scan
+            ])
+
+
+class TestTweetQueryPlans(PostgresTestCase):
+    def test_author_listing_uses_author_index(self):
+        query = Tweet.query.filter(
+            Tweet.author.in_(['author7'])
+        ).order_by(Tweet.tweet_id.desc()).limit(101)
+        self.assertIndexScan(query, 'nba-ws-tweet', 'ix_tweet_author_tweet_id')
+
+    def test_author_page_uses_author_index(self):
+        query = Tweet.query.filter(
+            Tweet.author.in_(['author7']), Tweet.tweet_id < 150000
+        ).order_by(Tweet.tweet_id.desc()).limit(101)
+        self.assertIndexScan(query, 'nba-ws-tweet', 'ix_tweet_author_tweet_id')
+
+    def test_many_authors_listing_uses_index(self):
+        query = Tweet.query.filter(
+            Tweet.author.in_(['author7', 'author8', 'author9'])
+        ).order_by(Tweet.tweet_id.desc()).limit(101)
+        self.assertIndexScan(query, 'nba-ws-tweet')
+
+    def test_listing_page_uses_index(self):
+        query = Tweet.query.filter(
+            Tweet.tweet_id < 150000
+        ).order_by(Tweet.tweet_id.desc()).limit(101)
+        self.assertIndexScan(query, 'nba-ws-tweet')
+
+    def test_author_time_window_uses_index(self):
+        since = datetime(2019, 4, 1)
+        query = Tweet.query.filter(
+            Tweet.author.in_(['author7']),
+            Tweet.tweet_date >= since,
+            Tweet.tweet_date < since + timedelta(days=1)
+        ).order_by(Tweet.tweet_id.desc()).limit(101)
+        self.assertIndexScan(query, 'nba-ws-tweet')
+
+    def test_time_window_uses_brin_index(self):
+        since = datetime(2019, 4, 1)
+        query = db.session.query(func.count(Tweet.id)).filter(
+            Tweet.tweet_date >= since,
+            Tweet.tweet_date < since + timedelta(days=1)
+        )
+        self.assertIndexScan(
+            query, 'nba-ws-tweet', 'ix_tweet_tweet_date_brin'
+        )
+
+    def test_time_window_prunes_partitions(self):
+        since = datetime(2019, 4, 1)
+        query = Tweet.query.filter(
+            Tweet.tweet_date >= since,
+            Tweet.tweet_date < since + timedelta(days=1)
+        ).order_by(Tweet.tweet_id.desc()).limit(101)
+        relations = {
+            scan['Relation Name'] for scan in self.scans(self.explain(query))
+            if 'Relation Name' in scan
+        }
+        self.assertEqual(relations, {'nba-ws-tweet_201904'})
+
+    def test_partitions_created_ahead(self):
+        months = [month for month, name in list_partitions()]
+        self.assertEqual(months[0], datetime(2019, 1, 1))
+        self.assertEqual(months[-1], datetime(2019, 6, 1))
+
+
+class TestTweetActivity(PostgresTestCase):
+    def test_record_activity_adds_to_buckets(self):
+        date = datetime(2020, 1, 1, 10, 15)
+        rows = [
+            SimpleNamespace(author='author1', tweet_date=date),
+            SimpleNamespace(author='author1', tweet_date=date),
+            SimpleNamespace(
+                author='author2', tweet_date=date + timedelta(hours=1)
+            ),
+        ]
+        record_activity(rows)
+        record_activity(rows[:1])
+        db.session.commit()
+        counts = {
+            (row.author, row.bucket): row.tweet_count
+            for row in TweetActivity.query.all()
+        }
+        self.assertEqual(counts, {
+            ('author1', datetime(2020, 1, 1, 10)): 3,
+            ('author2', datetime(2020, 1, 1, 11)): 1,
+        })
+
+    def test_since_and_until_are_rounded_to_bucket(self):
+        record_activity([
+            SimpleNamespace(
+                author='author1', tweet_date=datetime(2020, 1, day, hour)
+            ) for day, hour in ((1, 9), (1, 15), (2, 9), (2, 15), (3, 9))
+        ])
+        db.session.commit()
+        response = self.app.test_client().get(
+            f"{BASE_URL}/tweets/stats", json={'author': ['author1']},
+            query_string={
+                'bucket': 'day', 'since': '2020-01-01T12:00:00Z',
+                'until': '2020-01-03T12:00:00Z'
+            }
+        )
+        self.assertEqual(response.status_code, 200)
+        # the whole first day is counted, and the day of until left out
+        self.assertEqual(
+            [stat['tweet_count'] for stat in response.get_json()['stats']],
+            [2, 2]
+        )
+
+
+class TestTweetArchive(PostgresTestCase):
+    def test_archived_json_data_is_rehydrated(self):
+        before = datetime(2019, 1, 2)
+        db.session.execute(
+            """
+            UPDATE "nba-ws-tweet" SET json_data = jsonb_build_object(
+                'id', tweet_id, 'text', tweet_text
+            )
+            WHERE tweet_date < :before
+            """,
+            {'before': before}
+        )
+        db.session.commit()
+
+        counts = archive_tweets(before, segment_size=1000)
+
+        self.assertEqual(counts, {'segments': 2, 'tweets': 1439})
+        tweet = Tweet.query.filter_by(tweet_id=5).one()
+        self.assertIsNone(tweet.json_data)
+        self.assertIsNotNone(tweet.archive_id)
+        self.assertEqual(
+            clean_tweet(tweet)['json_data'], {'id': 5, 'text': 'tweet 5'}
+        )
+
+
+class TestTweetSearch(PostgresTestCase):
+    tweet_count = 1000
+
+    def setUp(self):
+        super(TestTweetSearch, self).setUp()
+        db.session.execute(
+            """
+            UPDATE "nba-ws-tweet" SET tweet_text = CASE tweet_id
+                WHEN 1 THEN 'Lakers agree to trade'
+                WHEN 2 THEN 'Lakers trade talks, sources: Lakers trade'
+                WHEN 3 THEN 'Lakers win'
+            END
+            WHERE tweet_id IN (1, 2, 3)
+            """
+        )
+        db.session.commit()
+        self.client = self.app.test_client()
+
+    def search(self, author=None, **params):
+        body = {}
+        if author:
+            body = {
+                'data': json.dumps({'author': author}),
+                'content_type': 'application/json'
+            }
+        return self.client.get(
+            f"{BASE_URL}/tweets/search", query_string=params, **body
+        )
+
+    def test_results_are_ranked(self):
+        response = self.search(q='Lakers trade')
+        self.assertEqual(response.status_code, 200)
+        tweets = response.get_json()['tweets']
+        self.assertEqual([tweet['tweet_id'] for tweet in tweets], [2, 1])
+        self.assertGreater(tweets[0]['rank'], tweets[1]['rank'])
+
+    def test_author_filter(self):
+        response = self.search(author=['author1'], q='Lakers')
+        self.assertEqual(
+            [tweet['tweet_id'] for tweet in response.get_json()['tweets']],
+            [1]
+        )
+        self.assertEqual(
+            self.search(author=['author4'], q='Lakers').status_code, 404
+        )
+
+    def test_results_are_capped(self):
+        self.app.config['TWEETS_SEARCH_MAX_RESULTS'] = 5
+        first = self.search(q='tweet', limit=3, fields='id')
+        self.assertEqual(len(first.get_json()['tweets']), 3)
+        second = self.client.get(first.get_json()['links']['next'])
+        self.assertEqual(len(second.get_json()['tweets']), 2)
+        self.assertEqual(second.get_json()['links'], {})
+        self.assertEqual(
+            self.search(q='tweet', limit=3, page=3).status_code, 404
+        )
+
+    def test_next_link_keeps_query_and_fields(self):
+        response = self.search(q='tweet', limit=10, fields='id,author')
+        next_url = response.get_json()['links']['next']
+        query = parse_qs(urlparse(next_url).query)
+        self.assertEqual(query, {
+            'q': ['tweet'], 'page': ['2'], 'limit': ['10'],
+            'fields': ['id,author']
+        })
+        tweets = self.client.get(next_url).get_json()['tweets']
+        self.assertEqual(len(tweets), 10)
+        self.assertEqual(set(tweets[0]), {'id', 'author', 'rank'})
+
+    def test_next_link_keeps_authors(self):
+        response = self.search(author=['author1'], q='tweet', limit=2)
+        self.assertEqual(
+            [tweet['tweet_id'] for tweet in response.get_json()['tweets']],
+            [801, 601]
+        )
+        next_url = response.get_json()['links']['next']
+        self.assertEqual(
+            parse_qs(urlparse(next_url).query)['author'], ['author1']
+        )
+        tweets = self.client.get(next_url).get_json()['tweets']
+        self.assertEqual(
+            [tweet['tweet_id'] for tweet in tweets], [401, 201]
+        )
+
+
+class TestTweetPagination(PostgresTestCase):
+    tweet_count = 1000
+
+    def setUp(self):
+        super(TestTweetPagination, self).setUp()
+        self.client = self.app.test_client()
+
+    def page(self, url=None, **params):
+        if url is None:
+            response = self.client.get(
+                f"{BASE_URL}/tweets", query_string=params
+            )
+        else:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        body = response.get_json()
+        tweet_ids = [tweet['tweet_id'] for tweet in body['tweets']]
+        links = {
+            rel: parse_qs(urlparse(link).query)
+            for rel, link in body['links'].items()
+        }
+        return tweet_ids, links, body['links']
+
+    def test_before_id_pages_older_tweets(self):
+        tweet_ids, links, urls = self.page(limit=3, fields='tweet_id')
+        self.assertEqual(tweet_ids, [1000, 999, 998])
+        self.assertEqual(links, {'next': {
+            'before_id': ['998'], 'limit': ['3'], 'fields': ['tweet_id']
+        }})
+        tweet_ids, links, _ = self.page(urls['next'])
+        self.assertEqual(tweet_ids, [997, 996, 995])
+        self.assertEqual(links['next']['before_id'], ['995'])
+        self.assertEqual(links['prev']['after_id'], ['997'])
+        tweet_ids, links, _ = self.page(before_id=3, limit=3)
+        self.assertEqual(tweet_ids, [2, 1])
+        self.assertEqual(set(links), {'prev'})
+
+    def test_after_id_pages_newer_tweets(self):
+        tweet_ids, links, _ = self.page(after_id=995, limit=3)
+        self.assertEqual(tweet_ids, [998, 997, 996])
+        self.assertEqual(links['next']['before_id'], ['996'])
+        self.assertEqual(links['prev']['after_id'], ['998'])
+        # the newest page has no prev link, and the oldest no next link
+        tweet_ids, links, _ = self.page(after_id=997, limit=3)
+        self.assertEqual(tweet_ids, [1000, 999, 998])
+        self.assertEqual(set(links), {'next'})
+        self.assertEqual(links['next']['before_id'], ['998'])
+        tweet_ids, links, _ = self.page(after_id=0, limit=3)
+        self.assertEqual(tweet_ids, [3, 2, 1])
+        self.assertEqual(set(links), {'prev'})
+
+    def test_links_keep_authors(self):
+        response = self.client.get(
+            f"{BASE_URL}/tweets", query_string={'limit': 2},
+            json={'author': ['author1']}
+        )
+        self.assertEqual(
+            [tweet['tweet_id'] for tweet in response.get_json()['tweets']],
+            [801, 601]
+        )
+        tweet_ids, links, urls = self.page(
+            response.get_json()['links']['next']
+        )
+        self.assertEqual(tweet_ids, [401, 201])
+        self.assertEqual(links['next']['author'], ['author1'])
+        tweet_ids, links, _ = self.page(urls['next'])
+        self.assertEqual(tweet_ids, [1])
+        self.assertEqual(set(links), {'prev'})
+
+    def test_limit_is_clamped(self):
+        self.app.config['TWEETS_MAX_PER_PAGE'] = 5
+        tweet_ids, links, _ = self.page(limit=50)
+        self.assertEqual(tweet_ids, [1000, 999, 998, 997, 996])
+        self.assertEqual(links['next']['limit'], ['5'])
+
+    def test_stream_is_valid_json(self):
+        self.app.config['TWEETS_STREAM_CHUNK_SIZE'] = 7
+        response = self.client.get(
+            f"{BASE_URL}/tweets", query_string={'stream': 'true'},
+            buffered=False
+        )
+        chunks = list(response.response)
+        response.close()
+        # the opening and closing brackets, and 143 chunks of tweets
+        self.assertEqual(len(chunks), 145)
+        tweets = json.loads(b''.join(chunks))['tweets']
+        self.assertEqual(
+            [tweet['tweet_id'] for tweet in tweets], list(range(1000, 0, -1))
+        )
+
+
+class TestTweetFields(PostgresTestCase):
+    tweet_count = 1000
+
+    def setUp(self):
+        super(TestTweetFields, self).setUp()
+        self.client = self.app.test_client()
+
+    def list_tweets(self, **params):
+        return self.client.get(f"{BASE_URL}/tweets", query_string=params)
+
+    def test_fieldsets_and_columns(self):
+        for fields, keys in (
+                (None, tweet_fieldsets['summary']),
+                ('full', tweet_fieldsets['full']),
+                ('author, tweet_text', ('author', 'tweet_text'))
+                ):
+            params = {'limit': 2}
+            if fields:
+                params['fields'] = fields
+            response = self.list_tweets(**params)
+            self.assertEqual(response.status_code, 200)
+            for tweet in response.get_json()['tweets']:
+                self.assertEqual(set(tweet), set(keys))
+
+    def test_unknown_column_is_rejected(self):
+        response = self.list_tweets(fields='author,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.get_data(as_text=True))
+        self.assertEqual(self.list_tweets(fields=',').status_code, 400)
+
+    def test_only_requested_columns_are_loaded(self):
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            if 'FROM "nba-ws-tweet"' in statement:
+                statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        self.addCleanup(
+            event.remove, db.engine, 'before_cursor_execute', record
+        )
+        for params in (
+                {'fields': 'author'}, {'fields': 'author', 'stream': 1}
+                ):
+            response = self.list_tweets(**params)
+            self.assertEqual(response.status_code, 200)
+            tweets = json.loads(response.get_data())['tweets']
+            self.assertEqual(set(tweets[0]), {'author'})
+            columns = statements.pop().split(' FROM ')[0]
+            # the primary key is always loaded, along with the cursor column
+            self.assertEqual(
+                set(re.findall(r'"nba-ws-tweet"\.(\w+)', columns)),
+                {'id', 'tweet_date', 'tweet_id', 'author'}
+            )
+
+
+class FakeRedis(object):
+    """Stands in for the hashes and pipelines used by the response cache."""
+    def __init__(self):
+        self.hashes = {}
+        self.expires = {}
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self):
+        return self
+
+    def hmset(self, key, mapping):
+        self.hashes[key] = {
+            field.encode('utf-8'): (
+                val if isinstance(val, bytes) else val.encode('utf-8')
+            ) for field, val in mapping.items()
+        }
+
+    def expire(self, key, seconds):
+        self.expires[key] = seconds
+
+    def execute(self):
+        pass
+
+
+class TestConditionalGet(PostgresTestCase):
+    tweet_count = 1000
+
+    def setUp(self):
+        super(TestConditionalGet, self).setUp()
+        self.client = self.app.test_client()
+        self.tweets_uri = f"{BASE_URL}/tweets?limit=5"
+
+    def write_tweet(self, tweet_id):
+        SearchTweet('token').write_to_db([{
+            'json_data': {
+                'id': tweet_id,
+                'user': {'screen_name': 'author1', 'id': 1},
+                'text': f'tweet {tweet_id}',
+                'created_at': 'Tue Jan 01 12:00:00 +0000 2019'
+            },
+            'search_params': {'q': 'from:author1'}
+        }])
+
+    def test_listing_sets_validators(self):
+        self.write_tweet(10 ** 12)
+        response = self.client.get(self.tweets_uri)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers['ETag'].startswith('"tweets-1-'))
+        self.assertIn('Last-Modified', response.headers)
+
+    def test_unchanged_listing_is_not_modified(self):
+        self.write_tweet(10 ** 12)
+        response = self.client.get(self.tweets_uri)
+        etag = response.headers['ETag']
+        not_modified = self.client.get(
+            self.tweets_uri, headers={'If-None-Match': etag}
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.get_data(), b'')
+        self.assertEqual(not_modified.headers['ETag'], etag)
+        not_modified = self.client.get(self.tweets_uri, headers={
+            'If-Modified-Since': response.headers['Last-Modified']
+        })
+        self.assertEqual(not_modified.status_code, 304)
+        # the ETag covers the query string
+        other_page = self.client.get(
+            f"{BASE_URL}/tweets?limit=6", headers={'If-None-Match': etag}
+        )
+        self.assertEqual(other_page.status_code, 200)
+
+    def test_etag_changes_after_tweet_write(self):
+        etag = self.client.get(self.tweets_uri).headers['ETag']
+        self.write_tweet(10 ** 12)
+        response = self.client.get(
+            self.tweets_uri, headers={'If-None-Match': etag}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+        tweets = response.get_json()['tweets']
+        self.assertEqual(tweets[0]['tweet_id'], 10 ** 12)
+
+    def test_etag_changes_after_search_field_writes(self):
+        list_uri = f"{BASE_URL}/search_field/all"
+        etags = [self.client.get(list_uri).headers['ETag']]
+        for author in ('wojespn', 'ShamsCharania'):
+            response = self.client.post(list_uri, data=json.dumps({
+                'search_field': {'q': {'author': author}}
+            }), content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+            etags.append(self.client.get(list_uri).headers['ETag'])
+        search_field_uri = response.get_json()['sf']['uri']
+        response = self.client.put(
+            search_field_uri,
+            data=json.dumps({'search_field': {'q': {'author': 'ZachLowe'}}}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 200)
+        etags.append(self.client.get(list_uri).headers['ETag'])
+        response = self.client.delete(search_field_uri)
+        self.assertEqual(response.status_code, 200)
+        etags.append(self.client.get(list_uri).headers['ETag'])
+        self.assertEqual(len(set(etags)), 5)
+
+    def test_responses_are_cached_in_redis(self):
+        self.app.config['RESPONSE_CACHE_TIMEOUT'] = 60
+        redis = FakeRedis()
+        with mock.patch(
+                'nba_ws.common.cache.get_redis', return_value=redis
+                ):
+            response = self.client.get(self.tweets_uri)
+            with mock.patch(
+                    'nba_ws.resources.tweet.TweetListAPI.get'
+                    ) as listing:
+                cached = self.client.get(self.tweets_uri)
+            listing.assert_not_called()
+            self.assertEqual(cached.get_data(), response.get_data())
+            self.assertEqual(cached.headers['ETag'], response.headers['ETag'])
+            self.assertEqual(list(redis.expires.values()), [60])
+            # a write changes the ETag, and so the cache key
+            self.write_tweet(10 ** 12)
+            fresh = self.client.get(self.tweets_uri)
+        self.assertNotEqual(fresh.get_data(), response.get_data())
+        self.assertEqual(len(redis.hashes), 2)
+
+    def test_version_is_bumped_once_per_write(self):
+        tweets = [
+            {
+                'json_data': {
+                    'id': 10 ** 12 + i,
+                    'user': {'screen_name': 'author1', 'id': 1},
+                    'text': f'tweet {i}',
+                    'created_at': 'Tue Jan 01 12:00:00 +0000 2019'
+                },
+                'search_params': {'q': 'from:author1'}
+            } for i in range(5, 0, -1)
+        ]
+        SearchTweet('token').write_to_db(tweets, chunk_size=2)
+        self.assertEqual(get_version('tweets')[0], 1)
+        # a write which only skips tweets leaves the version alone
+        SearchTweet('token').write_to_db(tweets, chunk_size=2)
+        self.assertEqual(get_version('tweets')[0], 1)
+
+        def fail(counts):
+            raise RuntimeError('progress failed')
+        more_tweets = [
+            dict(tweet, json_data=dict(
+                tweet['json_data'], id=tweet['json_data']['id'] + 10
+            )) for tweet in tweets
+        ]
+        with self.assertRaises(RuntimeError):
+            SearchTweet('token').write_to_db(
+                more_tweets, chunk_size=2, progress=fail
+            )
+        # the first chunk was committed before the failure
+        self.assertEqual(get_version('tweets')[0], 2)
+
+
+class TestTweetEvents(PostgresTestCase):
+    tweet_count = 1000
+
+    def events(self, last_event_id):
+        with self.app.test_client() as client:
+            response = client.get(
+                f"{BASE_URL}/tweets/events",
+                headers={'Last-Event-ID': last_event_id}
+            )
+            events = response.get_data(as_text=True).split('\n\n')[:-1]
+        return [
+            (
+                event.split('\n')[0][len('id: '):],
+                json.loads(event.split('\n')[2][len('data: '):])['tweets']
+            ) for event in events
+        ]
+
+    def write_tweet(self, tweet_id, connection=None):
+        tweet = {
+            'json_data': {
+                'id': tweet_id,
+                'user': {'screen_name': 'author1', 'id': 1},
+                'text': f'tweet {tweet_id}',
+                'created_at': 'Tue Jan 01 12:00:00 +0000 2019'
+            },
+            'search_params': {'q': 'from:author1'}
+        }
+        if connection is None:
+            SearchTweet('token').write_to_db([tweet])
+            return
+        connection.execute(
+            Tweet.__table__.insert(), SearchTweet('token').make_row(tweet)
+        )
+
+    def test_truncated_backlog_ends_stream(self):
+        self.app.config['SSE_BACKLOG_LIMIT'] = 250
+        self.app.config['SSE_EVENT_SIZE'] = 100
+        txid = db.session.query(Tweet.txid).filter_by(id=600).scalar()
+        events = self.events(f'{txid}-600')
+        self.assertEqual([id_ for id_, _ in events], [
+            f'{txid}-700', f'{txid}-800', f'{txid}-850'
+        ])
+        self.assertEqual(events[0][1][0], {
+            'tweet_id': 601, 'author': 'author1'
+        })
+
+    def test_event_id_waits_for_running_writers(self):
+        listening = db.engine.raw_connection()
+        listening.detach()
+        listening.connection.rollback()
+        listening.connection.autocommit = True
+        with listening.connection.cursor() as cursor:
+            cursor.execute(f'LISTEN {CHANNEL}')
+        listener = TweetListener(engine=None)
+        listener._thread = object()
+        # the test client reads the stream up to its first chunk
+        self.app.config['SSE_KEEPALIVE'] = 0.01
+        # writer a inserts first, but commits after writer b
+        connection = db.engine.connect()
+        writer_a = connection.begin()
+        try:
+            self.write_tweet(10 ** 12 + 1, connection)
+            with mock.patch(
+                    'nba_ws.resources.events.get_listener',
+                    return_value=listener
+                    ), self.app.test_client() as client:
+                response = client.get(
+                    f"{BASE_URL}/tweets/events", buffered=False
+                )
+                self.write_tweet(10 ** 12 + 2)
+                select.select([listening.connection], [], [], 10)
+                listening.connection.poll()
+                listener.dispatch(listening.connection.notifies.pop().payload)
+                event = next(
+                    chunk for chunk in response.response
+                    if not chunk.startswith(b':')
+                ).decode('utf-8')
+                response.close()
+            writer_a.commit()
+        finally:
+            connection.close()
+            listening.close()
+        id_ = event.split('\n')[0][len('id: '):]
+        self.assertIn('"tweet_id":1000000000002', event)
+        # the id of the event of writer b stops short of writer a
+        txid_a = db.session.query(Tweet.txid).filter_by(
+            tweet_id=10 ** 12 + 1
+        ).scalar()
+        self.assertLessEqual(event_id(id_)[0], txid_a)
+
+        # writer a is sent after reconnecting, along with writer b again
+        self.app.config['SSE_BACKLOG_LIMIT'] = 2
+        self.assertEqual(
+            [tweet['tweet_id'] for _, tweets in self.events(id_)
+             for tweet in tweets],
+            [10 ** 12 + 1, 10 ** 12 + 2]
+        )
+
+
+class TestSearchCursor(PostgresTestCase):
+    tweet_count = 1000
+
+    def setUp(self):
+        super(TestSearchCursor, self).setUp()
+        search_field = SearchField(
+            json.dumps({'q': {'author': 'author1'}}), 'author1'
+        )
+        db.session.add(search_field)
+        db.session.flush()
+        self.cursor = SearchCursor(search_field.id, since_id=10 ** 12)
+        db.session.add(self.cursor)
+        db.session.commit()
+
+    def tweets(self, count, error=None):
+        for i in range(count, 0, -1):
+            yield {
+                'json_data': {
+                    'id': 10 ** 12 + i,
+                    'user': {'screen_name': 'author1', 'id': 1},
+                    'text': f'tweet {i}',
+                    'created_at': 'Tue Jan 01 12:00:00 +0000 2019'
+                },
+                'search_params': {'q': 'from:author1'}
+            }
+        if error is not None:
+            raise error
+
+    def test_cursor_advances_with_last_chunk(self):
+        search_obj = SearchTweet('token')
+        search_obj.page_count = 2
+        with mock.patch.object(
+                db.session, 'commit', wraps=db.session.commit
+                ) as commit:
+            search_obj.write_to_db(
+                self.tweets(5), chunk_size=2, cursor=self.cursor
+            )
+        # one commit per chunk, the cursor is part of the last one
+        self.assertEqual(commit.call_count, 3)
+        db.session.expire_all()
+        cursor = SearchCursor.query.one()
+        self.assertEqual(cursor.since_id, 10 ** 12 + 5)
+        self.assertEqual(cursor.last_page_count, 2)
+        self.assertIsNotNone(cursor.last_run)
+
+    def test_failed_run_keeps_cursor(self):
+        with self.assertRaises(RuntimeError):
+            SearchTweet('token').write_to_db(
+                self.tweets(5, RuntimeError('Search API error')),
+                chunk_size=2, cursor=self.cursor
+            )
+        db.session.rollback()
+        self.assertEqual(
+            Tweet.query.filter(Tweet.tweet_id > 10 ** 12).count(), 4
+        )
+        self.assertEqual(SearchCursor.query.one().since_id, 10 ** 12)
+
+
+@unittest.skipUnless(
+    os.getenv('TEST_PG_DATABASE_URL'), 'TEST_PG_DATABASE_URL is not set'
+)
+class TestSearchCursorMigration(unittest.TestCase):
+    directory = os.path.join(os.path.dirname(__file__), 'migrations')
+
+    def setUp(self):
+        self.app = create_app(PostgresTestingConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.drop_all()
+        db.session.execute('DROP TABLE IF EXISTS alembic_version')
+        db.session.commit()
+        upgrade(directory=self.directory, revision='8483b620d52c')
+
+    def tearDown(self):
+        db.session.remove()
+        downgrade(directory=self.directory, revision='base')
+        db.session.execute('DROP TABLE alembic_version')
+        db.session.commit()
+        self.app_context.pop()
+
+    def test_cursors_are_backfilled_from_tweets(self):
+        db.session.execute(
+            """
+            INSERT INTO "nba-ws-search_field" (id, author, search_field)
+            VALUES (1, 'wojespn', '{"q": 1}'), (2, 'ShamsCharania', '{"q": 2}')
+            """
+        )
+        db.session.execute(
+            """
+            INSERT INTO "nba-ws-tweet" (tweet_id, author, datetime_added)
+            VALUES (5, 'wojespn', '2019-01-01'), (9, 'wojespn', '2019-01-02'),
+                (7, 'ZachLowe_NBA', '2019-01-03')
+            """
+        )
+        db.session.commit()
+
+        upgrade(directory=self.directory, revision='3f1c2a9d7b40')
+
+        cursors = db.session.execute(
+            'SELECT search_field_id, since_id '
+            'FROM "nba-ws-search_cursor"'
+        ).fetchall()
+        self.assertEqual([tuple(cursor) for cursor in cursors], [(1, 9)])
+
+
+class TestSearchRun(PostgresTestCase):
+    def test_search_params_are_stored_once_per_page(self):
+        pages = [{'q': 'from:author1', 'count': '100'}, {
+            'q': 'from:author1', 'count': '100', 'max_id': '1000000000001'
+        }]
+        tweets = [
+            {
+                'json_data': {
+                    'id': 10 ** 12 + i,
+                    'user': {'screen_name': 'author1', 'id': 1},
+                    'text': f'tweet {i}',
+                    'created_at': 'Tue Jan 01 12:00:00 +0000 2019'
+                },
+                'search_params': pages[i // 3]
+            } for i in range(6)
+        ]
+        search_obj = SearchTweet('token')
+        search_obj.page_count = 3
+
+        counts = search_obj.write_to_db(tweets, chunk_size=4)
+
+        self.assertEqual(counts['inserted'], 6)
+        run = SearchRun.query.one()
+        self.assertEqual(run.author, 'author1')
+        self.assertEqual(run.params, pages)
+        self.assertEqual(run.page_count, 3)
+        self.assertIsNotNone(run.finished_at)
+        tweet = Tweet.query.filter_by(tweet_id=10 ** 12 + 4).one()
+        self.assertEqual((tweet.search_run_id, tweet.search_page), (run.id, 1))
+        self.assertEqual(clean_tweet(tweet)['search_params'], pages[1])
+
+    def test_ledger_rolls_up_runs_per_author(self):
+        tweets = [
+            {
+                'json_data': {
+                    'id': 10 ** 12 + i,
+                    'user': {'screen_name': 'author1', 'id': 1},
+                    'text': f'tweet {i}',
+                    'created_at': 'Tue Jan 01 12:00:00 +0000 2019'
+                },
+                'search_params': {'q': 'from:author1'}
+            } for i in range(3)
+        ]
+        search_obj = SearchTweet('token')
+        search_obj.page_count = 2
+        search_obj.page_stats = [
+            {'seconds': 0.4, 'statuses': 3, 'remaining': 170},
+            {'seconds': 0.2, 'statuses': 0, 'remaining': 169},
+        ]
+        search_obj.request_seconds = 0.6
+
+        with ingest_cycle('manual', 'task-1', 1) as cycle_id:
+            search_obj.write_to_db(tweets, cycle_id=cycle_id)
+            search_obj.write_to_db(tweets, cycle_id=cycle_id)
+
+        run = SearchRun.query.filter_by(cycle_id=cycle_id).first()
+        self.assertEqual(run.empty_pages, 1)
+        self.assertEqual(run.max_request_seconds, 0.4)
+        self.assertEqual(run.rate_limit_remaining, 169)
+        response = self.app.test_client().get(
+            '/todo/api/v1.0/search/ledger?group_by=author'
+        )
+        self.assertEqual(response.status_code, 200)
+        rollup, = response.get_json()['ledger']
+        self.assertEqual(rollup['author'], 'author1')
+        self.assertEqual(rollup['runs'], 2)
+        self.assertEqual(rollup['pages'], 4)
+        self.assertEqual(rollup['empty_pages'], 2)
+        self.assertEqual((rollup['inserted'], rollup['skipped']), (3, 3))
+        self.assertEqual(rollup['avg_request_seconds'], 0.3)
+
+    def test_duplicate_tweets_are_counted_as_skipped(self):
+        def tweet(i):
+            return {
+                'json_data': {
+                    'id': 10 ** 12 + i,
+                    'user': {'screen_name': 'author1', 'id': 1},
+                    'text': f'tweet {i}',
+                    'created_at': 'Tue Jan 01 12:00:00 +0000 2019'
+                },
+                'search_params': {'q': 'from:author1'}
+            }
+        SearchTweet('token').write_to_db([tweet(4), tweet(2)])
+        progress = []
+        search_obj = SearchTweet('token')
+
+        # 4 and 2 are already stored, and 3 is repeated in the same chunk
+        counts = search_obj.write_to_db(
+            [tweet(i) for i in (5, 4, 3, 3, 2, 1)], chunk_size=2,
+            progress=progress.append
+        )
+
+        self.assertEqual((counts['inserted'], counts['skipped']), (3, 3))
+        self.assertEqual(progress, [
+            {'inserted': 1, 'skipped': 1},
+            {'inserted': 2, 'skipped': 2},
+            {'inserted': 3, 'skipped': 3},
+        ])
+        run = SearchRun.query.order_by(SearchRun.id.desc()).first()
+        self.assertEqual((run.inserted, run.skipped), (3, 3))
+        self.assertEqual(run.tweets_returned, 6)
+        self.assertEqual(
+            Tweet.query.filter(Tweet.tweet_id > 10 ** 12).count(), 5
+        )
+
+
 def search_suite():
     suite = unittest.TestSuite()
     suite.addTest(TestSearchAPI('test_search_get_all'))
@@ -193,6 +1865,206 @@ def search_suite():
     return suite
 
 
+def tasks_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestGetDataAsync('test_chord_writes_each_author_once'))
+    return suite
+
+
+def ratelimit_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestRateLimiter('test_budget_is_spent_then_reset'))
+    suite.addTest(TestRateLimiter('test_requests_are_paced_past_burst'))
+    suite.addTest(TestRateLimiter('test_wait_raises_past_max_wait'))
+    suite.addTest(TestRateLimiter('test_429_refreshes_budget_and_retries'))
+    suite.addTest(
+        TestRateLimiter('test_429_exhausts_budget_whatever_the_headers')
+    )
+    suite.addTest(TestRateLimiter('test_429_retries_are_capped'))
+    suite.addTest(
+        TestGetDataAsync('test_rate_limited_ingest_is_retried_after_reset')
+    )
+    return suite
+
+
+def auth_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestTokenProvider('test_token_is_reused_across_instances'))
+    suite.addTest(TestTokenProvider('test_refresh_keeps_rotated_token'))
+    suite.addTest(TestTokenProvider('test_request_is_retried_once_on_401'))
+    suite.addTest(TestTokenProvider('test_401_refreshes_token_once'))
+    return suite
+
+
+def client_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestTwitterSession('test_session_is_reused'))
+    suite.addTest(TestTwitterSession('test_session_is_recreated_after_fork'))
+    suite.addTest(TestTwitterSession('test_default_timeout_and_pool_size'))
+    suite.addTest(
+        TestTwitterSession('test_failed_search_raises_http_error')
+    )
+    return suite
+
+
+def export_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(
+        TestTweetExport('test_export_lines_round_trip_through_gzip')
+    )
+    return suite
+
+
+def events_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestTweetNotify('test_payloads_fit_in_notify'))
+    suite.addTest(
+        TestTweetNotify('test_listener_filters_subscriptions_by_author')
+    )
+    suite.addTest(TestTweetNotify('test_event_id_is_commit_order'))
+    suite.addTest(
+        TestTweetNotify('test_malformed_last_event_id_is_rejected')
+    )
+    suite.addTest(TestTweetEvents('test_truncated_backlog_ends_stream'))
+    suite.addTest(TestTweetEvents('test_event_id_waits_for_running_writers'))
+    return suite
+
+
+def replica_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(
+        TestReadReplica('test_reads_go_to_replica_and_writes_to_primary')
+    )
+    suite.addTest(
+        TestReadReplica('test_lagging_replica_falls_back_to_primary')
+    )
+    return suite
+
+
+def serving_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(
+        TestEngineOptions('test_pool_options_only_apply_to_postgres')
+    )
+    return suite
+
+
+def time_window_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestUtcDatetime('test_offset_is_converted_to_utc'))
+    suite.addTest(TestUtcDatetime('test_naive_is_unchanged'))
+    return suite
+
+
+def query_plan_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(
+        TestTweetQueryPlans('test_author_listing_uses_author_index')
+    )
+    suite.addTest(TestTweetQueryPlans('test_author_page_uses_author_index'))
+    suite.addTest(TestTweetQueryPlans('test_many_authors_listing_uses_index'))
+    suite.addTest(TestTweetQueryPlans('test_listing_page_uses_index'))
+    suite.addTest(
+        TestTweetQueryPlans('test_author_time_window_uses_index')
+    )
+    suite.addTest(TestTweetQueryPlans('test_time_window_uses_brin_index'))
+    suite.addTest(
+        TestTweetQueryPlans('test_time_window_prunes_partitions')
+    )
+    suite.addTest(TestTweetQueryPlans('test_partitions_created_ahead'))
+    return suite
+
+
+def text_search_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestTweetSearchRequest('test_query_is_required'))
+    suite.addTest(TestTweetSearchRequest('test_pages_past_cap_are_not_found'))
+    suite.addTest(TestTweetSearch('test_results_are_ranked'))
+    suite.addTest(TestTweetSearch('test_author_filter'))
+    suite.addTest(TestTweetSearch('test_results_are_capped'))
+    suite.addTest(TestTweetSearch('test_next_link_keeps_query_and_fields'))
+    suite.addTest(TestTweetSearch('test_next_link_keeps_authors'))
+    return suite
+
+
+def pagination_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestTweetList('test_page_links'))
+    suite.addTest(TestTweetList('test_links_keep_authors'))
+    suite.addTest(TestTweetList('test_stream_chunks_are_valid_json'))
+    suite.addTest(TestTweetList('test_conditional_get'))
+    suite.addTest(TestTweetList('test_fields'))
+    suite.addTest(TestTweetPagination('test_before_id_pages_older_tweets'))
+    suite.addTest(TestTweetPagination('test_after_id_pages_newer_tweets'))
+    suite.addTest(TestTweetPagination('test_links_keep_authors'))
+    suite.addTest(TestTweetPagination('test_limit_is_clamped'))
+    suite.addTest(TestTweetPagination('test_stream_is_valid_json'))
+    return suite
+
+
+def fields_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestTweetFields('test_fieldsets_and_columns'))
+    suite.addTest(TestTweetFields('test_unknown_column_is_rejected'))
+    suite.addTest(TestTweetFields('test_only_requested_columns_are_loaded'))
+    return suite
+
+
+def cache_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestConditionalGet('test_listing_sets_validators'))
+    suite.addTest(TestConditionalGet('test_unchanged_listing_is_not_modified'))
+    suite.addTest(TestConditionalGet('test_etag_changes_after_tweet_write'))
+    suite.addTest(
+        TestConditionalGet('test_etag_changes_after_search_field_writes')
+    )
+    suite.addTest(TestConditionalGet('test_responses_are_cached_in_redis'))
+    suite.addTest(TestConditionalGet('test_version_is_bumped_once_per_write'))
+    return suite
+
+
+def stats_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(
+        TestTweetActivity('test_record_activity_adds_to_buckets')
+    )
+    suite.addTest(
+        TestTweetActivity('test_since_and_until_are_rounded_to_bucket')
+    )
+    return suite
+
+
+def archive_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(
+        TestTweetArchive('test_archived_json_data_is_rehydrated')
+    )
+    return suite
+
+
+def search_cursor_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(TestGetDataAsync('test_since_id_falls_back_to_zero'))
+    suite.addTest(TestSearchCursor('test_cursor_advances_with_last_chunk'))
+    suite.addTest(TestSearchCursor('test_failed_run_keeps_cursor'))
+    suite.addTest(
+        TestSearchCursorMigration('test_cursors_are_backfilled_from_tweets')
+    )
+    return suite
+
+
+def search_run_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(
+        TestSearchRun('test_search_params_are_stored_once_per_page')
+    )
+    suite.addTest(TestSearchRun('test_ledger_rolls_up_runs_per_author'))
+    suite.addTest(
+        TestSearchRun('test_duplicate_tweets_are_counted_as_skipped')
+    )
+    return suite
+
+
 def final_suite(test_suites: Tuple):
     final_suite = unittest.TestSuite()
     final_suite.addTests(test_suites)
@@ -201,4 +2073,11 @@ def final_suite(test_suites: Tuple):
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
-    runner.run(final_suite((search_suite(),)))
+    runner.run(final_suite((
+        search_suite(), tasks_suite(), client_suite(), ratelimit_suite(),
+        auth_suite(), export_suite(), events_suite(), replica_suite(),
+        serving_suite(), time_window_suite(), query_plan_suite(),
+        text_search_suite(), pagination_suite(), fields_suite(),
+        cache_suite(), stats_suite(), archive_suite(), search_cursor_suite(),
+        search_run_suite()
+    )))